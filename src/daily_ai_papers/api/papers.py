@@ -1,14 +1,18 @@
 """Paper CRUD and search API endpoints."""
 
-from typing import Annotated
+import logging
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from daily_ai_papers.database import get_db
 from daily_ai_papers.models.paper import Paper
+from daily_ai_papers.profiling import timed_phase
 from daily_ai_papers.schemas.paper import (
     PaperDetail,
     PaperListItem,
@@ -16,11 +20,32 @@ from daily_ai_papers.schemas.paper import (
     SubmitPaperResponse,
 )
 from daily_ai_papers.services.submission import submit_papers
+from daily_ai_papers.services.translator import translate_text_stream
+from daily_ai_papers.tasks.parse_tasks import analyze_paper_abstracts, queue_full_analysis
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 DbSession = Annotated[AsyncSession, Depends(get_db)]
 
+_PAPER_LIST = TypeAdapter(list[PaperListItem])
+_PAPER_DETAIL = TypeAdapter(PaperDetail)
+
+
+def _json_response(adapter: TypeAdapter[Any], data: Any) -> Response:
+    """Validate ORM data against ``adapter`` and encode it, timing each phase.
+
+    Doing this in the handler (instead of via ``response_model``) lets the
+    Server-Timing header tell validation and serialisation apart; the
+    ``response_model`` is still declared on the route for the OpenAPI schema.
+    """
+    with timed_phase("validate"):
+        validated = adapter.validate_python(data, from_attributes=True)
+    with timed_phase("encode"):
+        body = adapter.dump_json(validated)
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("", response_model=list[PaperListItem])
 async def list_papers(
@@ -29,7 +54,7 @@ async def list_papers(
     page_size: int = Query(20, ge=1, le=100),
     category: str | None = None,
     status: str | None = None,
-) -> list[Paper]:
+) -> Response:
     """List papers with pagination and optional filters."""
     stmt = select(Paper).options(selectinload(Paper.authors))
 
@@ -42,7 +67,7 @@ async def list_papers(
     stmt = stmt.offset((page - 1) * page_size).limit(page_size)
 
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return _json_response(_PAPER_LIST, list(result.scalars().all()))
 
 
 @router.post("/submit", response_model=SubmitPaperResponse)
@@ -53,7 +78,8 @@ async def submit_paper(
     """Manually submit paper IDs to crawl and process.
 
     Accepts a list of source-specific IDs (e.g. arXiv IDs). Each paper is
-    fetched from the source API, deduplicated, and queued for parsing.
+    fetched from the source API, deduplicated, and queued for parsing. The
+    papers are saved even if the task queue is unavailable.
 
     Example request body::
 
@@ -67,13 +93,80 @@ async def submit_paper(
         paper_ids=request.paper_ids,
         db=db,
     )
+    queued = [r.paper_id for r in results if r.status == "queued" and r.paper_id is not None]
+    if queued:
+        try:
+            analyze_paper_abstracts.delay(queued)
+        except Exception:
+            logger.exception("Could not queue abstract analysis of papers %s", queued)
     return SubmitPaperResponse(total=len(results), results=results)
 
 
 @router.get("/{paper_id}", response_model=PaperDetail)
-async def get_paper(paper_id: int, db: DbSession) -> Paper:
-    """Get full paper details by ID."""
+async def get_paper(paper_id: int, db: DbSession) -> Response:
+    """Get full paper details by ID.
+
+    Viewing a paper that only has its abstract-based summary queues the
+    full-text analysis; the detail is returned without waiting for it, and
+    even if the task queue is unavailable.
+    """
     stmt = select(Paper).options(selectinload(Paper.authors)).where(Paper.id == paper_id)
     result = await db.execute(stmt)
     paper = result.scalar_one()
-    return paper
+    # Serialised first: a failed dispatch rolls back, which expires ``paper``.
+    response = _json_response(_PAPER_DETAIL, paper)
+    try:
+        await queue_full_analysis(db, paper_id)
+    except Exception:
+        logger.exception("Could not queue full-text analysis of paper %d", paper_id)
+    return response
+
+
+@router.post("/{paper_id}/analyze")
+async def analyze_paper(paper_id: int, db: DbSession) -> dict[str, str]:
+    """Request full-text analysis of a paper (e.g. when it is bookmarked).
+
+    Returns ``dispatched`` with the task ID, or the paper's current status
+    if full-text analysis is already queued or done. Unlike a page view,
+    this retries papers whose analysis failed.
+    """
+    result = await db.execute(select(Paper).where(Paper.id == paper_id))
+    paper = result.scalar_one_or_none()
+    if paper is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    if not paper.pdf_url:
+        raise HTTPException(status_code=409, detail="Paper has no PDF")
+    try:
+        task_id = await queue_full_analysis(db, paper_id, retry_failed=True)
+    except Exception:
+        logger.exception("Could not queue full-text analysis of paper %d", paper_id)
+        raise HTTPException(status_code=503, detail="Task queue unavailable") from None
+    if task_id is None:
+        await db.refresh(paper, ["status"])  # Possibly claimed by a concurrent request
+        return {"paper_id": str(paper_id), "status": paper.status}
+    return {"paper_id": str(paper_id), "status": "dispatched", "task_id": task_id}
+
+
+@router.get("/{paper_id}/translate/{language}", response_class=StreamingResponse)
+async def stream_translation(
+    paper_id: int,
+    language: str,
+    db: DbSession,
+    field: Literal["title", "abstract", "summary"] = "abstract",
+) -> StreamingResponse:
+    """Translate one text field of a paper, streaming the output as plain text.
+
+    Chunks are sent as soon as the LLM produces them, so clients can render
+    the translation progressively instead of waiting for the full response.
+    """
+    result = await db.execute(select(Paper).where(Paper.id == paper_id))
+    paper = result.scalar_one_or_none()
+    if paper is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    text = getattr(paper, field)
+    if not text:
+        raise HTTPException(status_code=404, detail=f"Paper has no {field}")
+
+    return StreamingResponse(
+        translate_text_stream(text, language), media_type="text/plain; charset=utf-8"
+    )
@@ -0,0 +1,76 @@
+"""LLM usage and cost API endpoints."""
+
+import time
+from datetime import UTC, datetime
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, HTTPException, Query
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.schemas.usage import UsageGroup, UsageRecordResponse, UsageSummaryResponse
+from daily_ai_papers.services.llm_usage import UsageLedger, get_usage_ledger
+
+router = APIRouter()
+
+GroupField = Literal["stage", "provider", "model"]
+
+
+def _ledger() -> UsageLedger:
+    ledger = get_usage_ledger()
+    if ledger is None:
+        raise HTTPException(status_code=404, detail="LLM usage ledger is disabled")
+    return ledger
+
+
+@router.get("/summary", response_model=UsageSummaryResponse)
+async def usage_summary(
+    hours: float = Query(24, gt=0, le=24 * 366),
+    group_by: Annotated[list[GroupField] | None, Query()] = None,
+) -> UsageSummaryResponse:
+    """Token usage, latency and estimated cost of LLM calls, grouped (costliest first).
+
+    ``group_by`` may be repeated (``?group_by=stage&group_by=model``); it
+    defaults to ``stage``.
+    """
+    since = time.time() - hours * 3600
+    fields = list(dict.fromkeys(group_by or ["stage"]))
+    summaries = await _ledger().summary(since, fields)
+    return UsageSummaryResponse(
+        since=datetime.fromtimestamp(since, UTC),
+        backend=settings.llm_usage_backend,
+        groups=[
+            UsageGroup(
+                **s.group,
+                calls=s.calls,
+                prompt_tokens=s.prompt_tokens,
+                completion_tokens=s.completion_tokens,
+                cache_read_tokens=s.cache_read_tokens,
+                cache_write_tokens=s.cache_write_tokens,
+                cost_usd=round(s.cost_usd, 6),
+                avg_latency_ms=round(s.avg_latency_ms, 1),
+                max_latency_ms=round(s.max_latency_ms, 1),
+            )
+            for s in summaries
+        ],
+    )
+
+
+@router.get("/recent", response_model=list[UsageRecordResponse])
+async def recent_usage(limit: int = Query(50, ge=1, le=1000)) -> list[UsageRecordResponse]:
+    """The most recent LLM calls, newest first."""
+    records = await _ledger().recent(limit)
+    return [
+        UsageRecordResponse(
+            created_at=datetime.fromtimestamp(r.created_at, UTC),
+            provider=r.provider,
+            model=r.model,
+            stage=r.stage,
+            prompt_tokens=r.prompt_tokens,
+            completion_tokens=r.completion_tokens,
+            cache_read_tokens=r.cache_read_tokens,
+            cache_write_tokens=r.cache_write_tokens,
+            latency_ms=round(r.latency_ms, 1),
+            cost_usd=r.cost_usd,
+        )
+        for r in records
+    ]
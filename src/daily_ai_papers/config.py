@@ -18,6 +18,84 @@ class Settings(BaseSettings):
     llm_base_url: str = ""  # Custom base URL for OpenAI-compatible APIs (e.g. Groq, OpenRouter)
     llm_model: str = "gpt-4o-mini"
     embedding_model: str = "text-embedding-3-small"
+    llm_timeout: float = 120.0  # Seconds per LLM request
+    llm_max_retries: int = 2  # Scheduler retries on timeouts / connection errors / 5xx
+    llm_max_connections: int = 20  # Connection pool size per provider client
+    llm_max_keepalive_connections: int = 10
+    llm_context_budget_tokens: int = 8000  # Paper-text tokens sent per extraction call
+    llm_prompt_caching: bool = True  # Mark paper context cacheable (Anthropic cache_control)
+    llm_extraction_mode: str = "budget"  # Over-budget papers: "budget" (abridge) or "map_reduce"
+    llm_chunk_tokens: int = 4000  # Map-reduce chunk size
+    llm_abstract_model: str = ""  # Cheaper model for the abstract-only pass; defaults to LLM_MODEL
+    llm_abstract_pack_size: int = 20  # Abstracts packed into one request by batch extraction
+
+    # LLM usage ledger
+    llm_usage_backend: str = "memory"  # "memory", "sqlite" or "" (disabled)
+    llm_usage_path: str = ".cache/llm_usage.sqlite3"
+    llm_usage_max_records: int = 10000  # Memory backend: most recent calls kept
+    llm_usage_retention_days: float = 30.0  # SQLite backend: older records are pruned
+    llm_prices: str = ""  # "model=input/output[/cached_input],..." USD per 1M tokens
+
+    # LLM request scheduling
+    llm_rate_limits: str = ""  # "provider:model=RPM/TPM,..."; unlisted models are unlimited
+    llm_concurrency_initial: int = 8  # Starting in-flight limit per provider/model (AIMD)
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 64
+    llm_batch_lane_share: float = 0.8  # Fraction of RPM/TPM usable by batch-priority calls
+    llm_rate_limit_retries: int = 5  # Retries after a 429/overloaded response
+    llm_scheduler_backend: str = "local"  # "local" or "redis" (share budgets across processes)
+    llm_scheduler_redis_url: str = ""  # Defaults to REDIS_URL
+
+    # LLM routing: hedged requests and failover, enabled by setting a fallback route
+    llm_fallback_provider: str = ""  # Defaults to LLM_PROVIDER (fallback to another model)
+    llm_fallback_model: str = ""  # Defaults to LLM_MODEL
+    llm_fallback_api_key: str = ""  # Defaults to LLM_API_KEY for the same provider
+    llm_fallback_base_url: str = ""
+    llm_hedge_enabled: bool = True  # Hedge interactive calls; batch calls only fail over
+    llm_hedge_quantile: float = 0.95  # Primary latency quantile that triggers a hedge
+    llm_hedge_min_delay: float = 2.0  # Seconds; also used until enough latencies are seen
+    llm_circuit_failure_threshold: int = 5  # Consecutive failures that open a route's circuit
+    llm_circuit_reset_seconds: float = 30.0  # Open time before a half-open probe
+
+    # Fake provider simulation (load and chaos testing)
+    fake_llm_first_token_ms: float = 0.0  # Mean (median for lognormal) time to first token
+    fake_llm_latency_distribution: str = "fixed"  # "fixed", "exponential" or "lognormal"
+    fake_llm_latency_sigma: float = 0.5  # Lognormal shape; larger means a heavier tail
+    fake_llm_tokens_per_second: float = 0.0  # 0 generates without pacing
+    fake_llm_rpm: int = 0  # Simulated provider request limit; excess gets 429 (0 = unlimited)
+    fake_llm_max_concurrency: int = 0  # Simulated capacity; excess gets 529 (0 = unlimited)
+    fake_llm_rate_limit_rate: float = 0.0  # Fraction of calls failing with a random 429
+    fake_llm_retry_after: float = 1.0  # Retry-After seconds on injected 429s
+    fake_llm_server_error_rate: float = 0.0  # Fraction of calls failing with a 500
+    fake_llm_timeout_rate: float = 0.0  # Fraction of calls timing out after LLM_TIMEOUT
+    fake_llm_seed: int | None = None  # Makes latencies and faults reproducible
+
+    # LLM response cache
+    llm_cache_backend: str = ""  # "", "sqlite" or "redis"; empty disables caching
+    llm_cache_path: str = ".cache/llm_cache.sqlite3"
+    llm_cache_redis_url: str = ""  # Defaults to REDIS_URL
+    llm_cache_ttl_seconds: int = 30 * 24 * 3600
+    llm_cache_max_entries: int = 100_000
+
+    # LLM batch mode (OpenAI Batch API / Anthropic Message Batches)
+    llm_batch_max_size: int = 10_000  # Requests per submitted batch
+    llm_batch_linger_seconds: float = 2.0  # Submit after no new request for this long
+    llm_batch_poll_interval: float = 30.0  # Seconds between batch status checks
+    llm_batch_fake_processing_seconds: float = 0.0  # Simulated turnaround of the local server
+    llm_batch_abstracts: bool = False  # Run the Celery abstract pass through the batch API
+
+    # Two-tier analysis: abstract pass after the crawl, full text on demand
+    analysis_priority_categories: str = ""  # Categories analyzed in full right after the crawl
+    analysis_queue_timeout: int = 3600  # Seconds in "downloading" before a paper is queued again
+
+    # Incremental reprocessing
+    pipeline_force_stages: str = ""  # Comma-separated stages to rerun regardless, or "all"
+
+    # Full-text storage
+    full_text_backend: str = "table"  # "table" (paper_texts rows) or "blob" (files)
+    full_text_blob_dir: str = ".cache/full_text"
+    full_text_zstd_level: int = 10
+    full_text_dictionary_path: str = ""  # Trained zstd dictionary (see text_store)
 
     # Crawler
     crawl_schedule_hour: int = 6
@@ -25,13 +103,45 @@ class Settings(BaseSettings):
     crawl_max_results: int = 100
     crawl_days_back: int = 1
 
+    # PDF download cache
+    pdf_cache_dir: str = ".cache/pdfs"
+    pdf_cache_max_bytes: int = 5 * 1024**3  # Least recently used PDFs are evicted above this
+    pdf_cache_revalidate_seconds: float = 7 * 24 * 3600  # Reuse without a conditional GET
+    pdf_max_bytes: int = 100 * 1024**2  # Larger downloads are aborted
+
+    # PDF text extraction (process pool)
+    pdf_workers: int = 0  # Extraction processes; 0 uses one per CPU core
+    pdf_worker_max_tasks: int = 50  # Replace a worker after this many tasks; 0 never recycles
+    pdf_worker_max_memory_mb: int = 2048  # Address-space limit per worker; 0 is unlimited
+    pdf_extract_timeout: float = 120.0  # Seconds per document, including queueing
+    pdf_parallel_min_pages: int = 64  # Split documents this long across workers; 0 disables
+
     # Translation
     translation_languages: str = "zh,ja,es"
+    translation_max_output_tokens: int = 8000  # Per call; more languages are split across calls
+    translation_chunk_tokens: int = 1500  # Longer texts are translated in parallel chunks; 0 = off
+    translation_memory_backend: str = ""  # "", "sqlite" or "redis"; empty disables the memory
+    translation_memory_path: str = ".cache/translation_memory.sqlite3"
+    translation_memory_segment: str = "sentence"  # "sentence" or "paragraph"
+    translation_memory_ttl_seconds: int = 180 * 24 * 3600
+    translation_memory_max_entries: int = 1_000_000
+
+    # Profiling
+    server_timing_enabled: bool = True
+    profile_token: str = ""  # Secret for the X-Profile-Token header; empty disables profiling
+    profile_interval_ms: float = 1.0  # Sampling interval of the on-demand profiler
+
+    # Metrics
+    worker_metrics_port: int = 9808  # Prometheus exporter port in Celery workers; 0 disables
 
     @property
     def crawl_category_list(self) -> list[str]:
         return [c.strip() for c in self.crawl_categories.split(",")]
 
+    @property
+    def analysis_priority_category_list(self) -> list[str]:
+        return [c.strip() for c in self.analysis_priority_categories.split(",") if c.strip()]
+
     @property
     def translation_language_list(self) -> list[str]:
         return [lang.strip() for lang in self.translation_languages.split(",")]
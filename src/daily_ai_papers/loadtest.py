@@ -0,0 +1,353 @@
+"""Offline load test: run the paper pipeline against the simulated LLM provider.
+
+    python -m daily_ai_papers.loadtest --papers 200 --concurrency 16 \\
+        --first-token-ms 800 --distribution lognormal --tokens-per-second 60 \\
+        --rpm 300 --rate-limit-rate 0.02 --server-error-rate 0.01 --seed 42
+
+Papers come from a synthetic crawler and are rendered to PDF with PyMuPDF, so
+every paper goes through crawl → parse (real text extraction) → analyze →
+translate with ``--concurrency`` papers in flight, which stands in for the
+worker pool size being sized. LLM calls go to ``LLM_PROVIDER=fake`` using the
+``FAKE_LLM_*`` settings (the flags below override them) and run in the batch
+scheduling lane like Celery tasks. The response cache is disabled so every
+call reaches the simulated provider.
+
+The report gives per-stage latency percentiles, failures by error type,
+throughput, and what the scheduler did about rate limiting.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import tempfile
+import textwrap
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import REGISTRY
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services.crawler.base import BaseCrawler, CrawledPaper
+from daily_ai_papers.services.fake_llm import reset_fake_llm
+from daily_ai_papers.services.llm_scheduler import Priority, llm_priority
+from daily_ai_papers.services.parser.metadata_extractor import extract_metadata
+from daily_ai_papers.services.parser.pdf_pool import extract_text
+from daily_ai_papers.services.translator import translate_text
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("crawl", "parse", "analyze", "translate")
+
+_WORDS = [
+    "attention",
+    "model",
+    "training",
+    "data",
+    "sequence",
+    "token",
+    "layer",
+    "encoder",
+    "decoder",
+    "gradient",
+    "benchmark",
+    "accuracy",
+    "baseline",
+    "transformer",
+    "representation",
+    "objective",
+    "inference",
+    "scaling",
+    "parameter",
+    "dataset",
+    "evaluation",
+    "retrieval",
+    "reasoning",
+    "alignment",
+    "loss",
+]
+_SECTIONS = (
+    ("Abstract", 0.05),
+    ("1 Introduction", 0.15),
+    ("2 Related Work", 0.15),
+    ("3 Method", 0.25),
+    ("4 Experiments", 0.2),
+    ("5 Conclusion", 0.05),
+    ("References", 0.15),
+)
+_LINES_PER_PAGE = 60
+_LINE_WIDTH = 100
+
+# Settings the command-line flags may override.
+_FAKE_FLAGS = {
+    "first_token_ms": "fake_llm_first_token_ms",
+    "distribution": "fake_llm_latency_distribution",
+    "sigma": "fake_llm_latency_sigma",
+    "tokens_per_second": "fake_llm_tokens_per_second",
+    "rpm": "fake_llm_rpm",
+    "max_concurrency": "fake_llm_max_concurrency",
+    "rate_limit_rate": "fake_llm_rate_limit_rate",
+    "server_error_rate": "fake_llm_server_error_rate",
+    "timeout_rate": "fake_llm_timeout_rate",
+    "seed": "fake_llm_seed",
+}
+
+
+class SyntheticCrawler(BaseCrawler):
+    """Crawler returning generated papers, with their full text, without network access."""
+
+    def __init__(self, paper_chars: int = 30_000, seed: int | None = None) -> None:
+        self.paper_chars = paper_chars
+        self._random = random.Random(seed)
+        self.texts: dict[str, str] = {}
+
+    def _paragraph(self, chars: int) -> str:
+        words: list[str] = []
+        length = 0
+        while length < chars:
+            sentence = " ".join(self._random.choices(_WORDS, k=12)).capitalize() + "."
+            words.append(sentence)
+            length += len(sentence) + 1
+        return " ".join(words)
+
+    def _paper(self, index: int) -> CrawledPaper:
+        source_id = f"load.{index:05d}"
+        title = f"Synthetic Paper {index}: {' '.join(self._random.choices(_WORDS, k=4)).title()}"
+        body = [title, "A. Author, B. Author"]
+        for heading, share in _SECTIONS:
+            body += [heading, self._paragraph(int(self.paper_chars * share))]
+        self.texts[source_id] = "\n".join(body)
+        return CrawledPaper(
+            source="synthetic",
+            source_id=source_id,
+            title=title,
+            abstract=body[3],
+            pdf_url=f"synthetic://{source_id}",
+            author_names=["A. Author", "B. Author"],
+        )
+
+    async def fetch_recent_papers(
+        self,
+        categories: list[str],
+        max_results: int = 100,
+        days_back: int = 1,
+    ) -> list[CrawledPaper]:
+        return [self._paper(i) for i in range(max_results)]
+
+    async def fetch_paper_by_id(self, paper_id: str) -> CrawledPaper | None:
+        return None
+
+    def render_pdf(self, paper: CrawledPaper) -> Path:
+        """Write the paper's text to a temporary PDF and return its path."""
+        import fitz  # PyMuPDF
+
+        lines: list[str] = []
+        for paragraph in self.texts[paper.source_id].splitlines():
+            lines += textwrap.wrap(paragraph, _LINE_WIDTH) or [""]
+        doc = fitz.open()
+        for start in range(0, len(lines), _LINES_PER_PAGE):
+            doc.insert_page(-1, text="\n".join(lines[start : start + _LINES_PER_PAGE]), fontsize=8)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(doc.tobytes())
+        doc.close()
+        return Path(tmp.name)
+
+
+@dataclass
+class StageStats:
+    durations: list[float] = field(default_factory=list)  # Successful runs, seconds
+    errors: Counter[str] = field(default_factory=Counter)  # Exception type -> count
+
+    def percentile(self, q: float) -> float:
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": len(self.durations),
+            "p50": round(self.percentile(0.5), 4),
+            "p95": round(self.percentile(0.95), 4),
+            "p99": round(self.percentile(0.99), 4),
+            "max": round(max(self.durations, default=0.0), 4),
+            "errors": dict(self.errors),
+        }
+
+
+@dataclass
+class LoadTestReport:
+    papers: int
+    concurrency: int
+    wall_seconds: float = 0.0
+    completed: int = 0
+    stages: dict[str, StageStats] = field(
+        default_factory=lambda: {stage: StageStats() for stage in STAGES}
+    )
+    rate_limited: int = 0  # Provider 429/529 responses seen by the scheduler
+    concurrency_limit: float = 0.0  # Adaptive in-flight limit at the end of the run
+
+    @property
+    def papers_per_minute(self) -> float:
+        return self.completed / self.wall_seconds * 60 if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "papers": self.papers,
+            "concurrency": self.concurrency,
+            "completed": self.completed,
+            "failed": self.papers - self.completed,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "papers_per_minute": round(self.papers_per_minute, 2),
+            "rate_limited": self.rate_limited,
+            "concurrency_limit": self.concurrency_limit,
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"papers: {self.completed}/{self.papers} completed "
+            f"in {self.wall_seconds:.1f}s ({self.papers_per_minute:.1f}/min) "
+            f"at concurrency {self.concurrency}",
+            f"rate limited: {self.rate_limited}, "
+            f"final LLM concurrency limit: {self.concurrency_limit:g}",
+            f"{'stage':<10} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  errors",
+        ]
+        for name, stats in self.stages.items():
+            errors = ", ".join(f"{k}={v}" for k, v in stats.errors.items()) or "-"
+            lines.append(
+                f"{name:<10} {len(stats.durations):>6} {stats.percentile(0.5):>8.3f} "
+                f"{stats.percentile(0.95):>8.3f} {stats.percentile(0.99):>8.3f} "
+                f"{max(stats.durations, default=0.0):>8.3f}  {errors}"
+            )
+        return "\n".join(lines)
+
+
+async def _timed(stats: StageStats, coro: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as exc:
+        stats.errors[type(exc).__name__] += 1
+        raise
+    stats.durations.append(time.perf_counter() - start)
+    return result
+
+
+async def _process(
+    crawler: SyntheticCrawler,
+    paper: CrawledPaper,
+    languages: list[str],
+    report: LoadTestReport,
+) -> None:
+    stages = report.stages
+    try:
+        text = await _timed(stages["parse"], _parse(crawler, paper))
+        meta = await _timed(stages["analyze"], extract_metadata(text))
+        await asyncio.gather(
+            *(_timed(stages["translate"], translate_text(meta.summary, lang)) for lang in languages)
+        )
+    except Exception as exc:
+        logger.debug("Paper %s failed: %r", paper.source_id, exc)
+        return
+    report.completed += 1
+
+
+async def _parse(crawler: SyntheticCrawler, paper: CrawledPaper) -> str:
+    path = await asyncio.to_thread(crawler.render_pdf, paper)
+    try:
+        return await extract_text(path)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def _sample(name: str) -> float:
+    labels = {"provider": "fake", "model": settings.llm_model}
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def run_load_test(
+    papers: int = 50,
+    concurrency: int = 8,
+    languages: list[str] | None = None,
+    *,
+    paper_chars: int = 30_000,
+    priority: Priority = "batch",
+) -> LoadTestReport:
+    """Push ``papers`` synthetic papers through the pipeline, ``concurrency`` at a time."""
+    settings.llm_provider = "fake"
+    settings.llm_cache_backend = ""
+    reset_fake_llm()
+    languages = ["zh"] if languages is None else languages
+    report = LoadTestReport(papers, concurrency)
+    crawler = SyntheticCrawler(paper_chars, seed=settings.fake_llm_seed)
+    rate_limited_before = _sample("llm_rate_limited_total")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(paper: CrawledPaper) -> None:
+        async with semaphore:
+            await _process(crawler, paper, languages, report)
+
+    start = time.perf_counter()
+    with llm_priority(priority):
+        crawled = await _timed(report.stages["crawl"], crawler.fetch_recent_papers([], papers))
+        await asyncio.gather(*(worker(paper) for paper in crawled))
+    report.wall_seconds = time.perf_counter() - start
+    report.rate_limited = int(_sample("llm_rate_limited_total") - rate_limited_before)
+    report.concurrency_limit = _sample("llm_concurrency_limit")
+    return report
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m daily_ai_papers.loadtest",
+        description="Run the paper pipeline against the simulated LLM provider.",
+    )
+    parser.add_argument("--papers", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8, help="papers in flight")
+    parser.add_argument("--languages", default="zh", help="comma-separated translation targets")
+    parser.add_argument("--paper-chars", type=int, default=30_000)
+    parser.add_argument("--priority", choices=["batch", "interactive"], default="batch")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    fake = parser.add_argument_group("fake provider (defaults from FAKE_LLM_* settings)")
+    fake.add_argument("--first-token-ms", type=float)
+    fake.add_argument("--distribution", choices=["fixed", "exponential", "lognormal"])
+    fake.add_argument("--sigma", type=float, help="lognormal shape")
+    fake.add_argument("--tokens-per-second", type=float)
+    fake.add_argument("--rpm", type=int, help="simulated provider requests/minute")
+    fake.add_argument("--max-concurrency", type=int, help="simulated provider capacity")
+    fake.add_argument("--rate-limit-rate", type=float)
+    fake.add_argument("--server-error-rate", type=float)
+    fake.add_argument("--timeout-rate", type=float)
+    fake.add_argument("--seed", type=int)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    for flag, setting in _FAKE_FLAGS.items():
+        value = getattr(args, flag)
+        if value is not None:
+            setattr(settings, setting, value)
+
+    languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()]
+    report = asyncio.run(
+        run_load_test(
+            args.papers,
+            args.concurrency,
+            languages,
+            paper_chars=args.paper_chars,
+            priority=args.priority,
+        )
+    )
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+    return 0 if report.completed == report.papers else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,56 @@
 """FastAPI application entry point."""
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+
+from daily_ai_papers.api import chat, papers, tasks, usage
+from daily_ai_papers.database import engine
+from daily_ai_papers.metrics import (
+    DbPoolCollector,
+    PrometheusMiddleware,
+    register_collector,
+    render_latest,
+)
+from daily_ai_papers.profiling import ServerTimingMiddleware, instrument_engine
+from daily_ai_papers.services.llm_client import close_llm_clients
+from daily_ai_papers.services.parser.pdf_pool import shutdown_pdf_pool
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    await close_llm_clients()
+    shutdown_pdf_pool()
+    await engine.dispose()
 
-from daily_ai_papers.api import chat, papers, tasks
 
 app = FastAPI(
     title="daily-ai-papers",
     description="Crawl, analyze, translate, display and chat with newest AI papers",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(PrometheusMiddleware)
+instrument_engine(engine.sync_engine)
+register_collector(DbPoolCollector(engine.sync_engine))
+
 app.include_router(papers.router, prefix="/api/v1/papers", tags=["papers"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["tasks"])
+app.include_router(usage.router, prefix="/api/v1/usage", tags=["usage"])
 
 
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus scrape endpoint."""
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
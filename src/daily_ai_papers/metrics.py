@@ -0,0 +1,377 @@
+"""Prometheus metrics shared by the API, Celery workers and pipeline services.
+
+All metric objects live here so every process exposes the same names. The API
+serves them on ``/metrics``; Celery workers start a standalone exporter (see
+``daily_ai_papers.tasks.signals``). Both honour ``PROMETHEUS_MULTIPROC_DIR``
+for multi-process deployments (uvicorn workers, Celery prefork pool).
+
+Counters are declared without the ``_total`` suffix; prometheus-client adds
+it when exposing them (``llm_errors`` is scraped as ``llm_errors_total``).
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+from typing import Any, cast
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# --- API ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+
+# --- Celery ---
+
+CELERY_TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time by task name and final state.",
+    ["task", "state"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+
+# --- Pipeline ---
+
+PIPELINE_STAGE_RUNS = Counter(
+    "pipeline_stage_runs",
+    "Pipeline stage decisions: run (inputs changed or forced) or skipped (unchanged).",
+    ["stage", "result"],
+)
+
+# --- Crawler / PDF ---
+
+CRAWLER_FETCH_SECONDS = Histogram(
+    "crawler_fetch_duration_seconds",
+    "Latency of paper source API requests.",
+    ["source", "operation"],
+)
+
+PDF_DOWNLOAD_SECONDS = Histogram(
+    "pdf_download_duration_seconds",
+    "Time spent downloading paper PDFs.",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+PDF_DOWNLOAD_BYTES = Histogram(
+    "pdf_download_size_bytes",
+    "Size of downloaded paper PDFs.",
+    buckets=(100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6, 50e6),
+)
+
+PDF_PAGES = Counter(
+    "pdf_pages",
+    "Pages of extracted PDFs, by whether partial extraction read or skipped them.",
+    ["result"],
+)
+
+PDF_CACHE_REQUESTS = Counter(
+    "pdf_cache_requests",
+    "PDF cache lookups by result (hit, revalidated or miss).",
+    ["result"],
+)
+
+# --- LLM ---
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "LLM completion latency.",
+    ["provider", "model"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+
+LLM_TOKENS = Counter(
+    "llm_tokens",
+    "LLM tokens consumed, by kind (prompt/completion/cache_read/cache_write).",
+    ["provider", "model", "kind"],
+)
+
+LLM_ERRORS = Counter(
+    "llm_errors",
+    "Failed LLM calls by exception type.",
+    ["provider", "model", "error"],
+)
+
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Latency until the first streamed token arrives.",
+    ["provider", "model"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5, 10),
+)
+
+LLM_TOKENS_PER_SECOND = Histogram(
+    "llm_stream_tokens_per_second",
+    "Generation throughput of streamed completions after the first token.",
+    ["provider", "model"],
+    buckets=(5, 10, 20, 40, 60, 80, 100, 150, 200, 400),
+)
+
+LLM_ROUTE_EVENTS = Counter(
+    "llm_route_events",
+    "Router events per route: hedge sent, failover, hedge/fallback won, circuit opened.",
+    ["route", "event"],
+)
+
+LLM_PACKED_ITEMS = Counter(
+    "llm_packed_items",
+    "Items of packed multi-item requests (abstracts, translation languages): "
+    "answered in the pack or retried individually.",
+    ["kind", "result"],
+)
+
+TRANSLATION_MEMORY_LOOKUPS = Counter(
+    "translation_memory_lookups",
+    "Translation memory lookups by result: exact hit, normalised hit or miss.",
+    ["result"],
+)
+
+LLM_CONTEXT_TOKENS = Histogram(
+    "llm_context_tokens",
+    "Tokens of paper text sent per LLM call after context budgeting, by stage.",
+    ["stage"],
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+)
+
+LLM_SCHEDULER_WAIT_SECONDS = Histogram(
+    "llm_scheduler_wait_seconds",
+    "Time LLM calls waited for rate budget and a concurrency slot.",
+    ["provider", "model", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 15, 30, 60),
+)
+
+LLM_RATE_LIMITED = Counter(
+    "llm_rate_limited",
+    "LLM calls rejected by the provider as rate limited or overloaded.",
+    ["provider", "model"],
+)
+
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "llm_concurrency_limit",
+    "Current adaptive (AIMD) in-flight request limit.",
+    ["provider", "model"],
+    multiprocess_mode="max",
+)
+
+LLM_STAGE_TOKENS = Counter(
+    "llm_stage_tokens",
+    "LLM tokens consumed per caller stage (extraction/translation/chat/other), by kind.",
+    ["stage", "kind"],
+)
+
+LLM_STAGE_SECONDS = Histogram(
+    "llm_stage_call_seconds",
+    "LLM call latency per caller stage.",
+    ["stage"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+
+LLM_COST = Counter(
+    "llm_cost_usd",
+    "Estimated LLM spend in USD from LLM_PRICES.",
+    ["provider", "model", "stage"],
+)
+
+LLM_CACHE_REQUESTS = Counter(
+    "llm_cache_requests",
+    "LLM completion cache lookups by result (hit/miss).",
+    ["result"],
+)
+
+
+def observe_llm_call(
+    provider: str,
+    model: str,
+    seconds: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+    *,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> None:
+    """Record latency and token usage for one successful LLM call.
+
+    ``prompt_tokens`` counts all input tokens; the cache counters say how many
+    of them were read from or written to the provider's prompt cache.
+    """
+    LLM_REQUEST_SECONDS.labels(provider, model).observe(seconds)
+    LLM_TOKENS.labels(provider, model, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(provider, model, "completion").inc(completion_tokens)
+    if cache_read_tokens:
+        LLM_TOKENS.labels(provider, model, "cache_read").inc(cache_read_tokens)
+    if cache_write_tokens:
+        LLM_TOKENS.labels(provider, model, "cache_write").inc(cache_write_tokens)
+
+
+def observe_llm_stream(
+    provider: str,
+    model: str,
+    *,
+    ttft: float,
+    generation_seconds: float,
+    completion_tokens: int,
+) -> None:
+    """Record time-to-first-token and throughput for one streamed completion."""
+    LLM_TIME_TO_FIRST_TOKEN.labels(provider, model).observe(ttft)
+    if generation_seconds > 0:
+        LLM_TOKENS_PER_SECOND.labels(provider, model).observe(
+            completion_tokens / generation_seconds
+        )
+
+
+# --- Collectors evaluated at scrape time ---
+
+
+class DbPoolCollector(Collector):
+    """Expose connection pool occupancy of a SQLAlchemy engine."""
+
+    def __init__(self, engine: Any) -> None:
+        self.engine = engine
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        pool = self.engine.pool
+        for name, attr, doc in (
+            ("db_pool_size", "size", "Configured pool size."),
+            ("db_pool_checked_out", "checkedout", "Connections currently in use."),
+            ("db_pool_checked_in", "checkedin", "Idle connections in the pool."),
+            ("db_pool_overflow", "overflow", "Connections opened beyond the pool size."),
+        ):
+            getter = getattr(pool, attr, None)
+            if getter is not None:
+                yield GaugeMetricFamily(name, doc, value=getter())
+
+
+class CeleryQueueCollector(Collector):
+    """Expose pending Celery messages per task name, read from the Redis broker.
+
+    Each message in the broker list is decoded to read its ``task`` header;
+    only the first ``scan_limit`` messages are inspected so a huge backlog
+    cannot make a scrape expensive (the total length is always exact).
+    """
+
+    def __init__(self, redis_url: str, queues: list[str], scan_limit: int = 1000) -> None:
+        self.redis_url = redis_url
+        self.queues = queues
+        self.scan_limit = scan_limit
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        import redis
+
+        length = GaugeMetricFamily(
+            "celery_queue_length", "Messages waiting in the broker queue.", labels=["queue"]
+        )
+        depth = GaugeMetricFamily(
+            "celery_queue_depth",
+            "Messages waiting in the broker queue per task name (sampled).",
+            labels=["queue", "task"],
+        )
+        try:
+            client = redis.Redis.from_url(self.redis_url, socket_timeout=2)
+            for queue in self.queues:
+                length.add_metric([queue], cast(int, client.llen(queue)))
+                counts: dict[str, int] = {}
+                messages = cast(list[bytes], client.lrange(queue, 0, self.scan_limit - 1))
+                for raw in messages:
+                    task = _task_name(raw)
+                    counts[task] = counts.get(task, 0) + 1
+                for task, count in counts.items():
+                    depth.add_metric([queue, task], count)
+        except Exception:
+            logger.warning("Could not read Celery queue depth from broker", exc_info=True)
+        yield length
+        yield depth
+
+
+def _task_name(raw: bytes) -> str:
+    try:
+        name: str = json.loads(raw)["headers"]["task"]
+    except (ValueError, KeyError, TypeError):
+        return "unknown"
+    return name
+
+
+# --- Exposition ---
+
+# Collectors that read live process state at scrape time; in multi-process
+# mode they are added to the per-scrape registry next to the aggregated files.
+_live_collectors: list[Collector] = []
+
+
+def register_collector(collector: Collector) -> None:
+    """Register a scrape-time collector with this process's exposition."""
+    REGISTRY.register(collector)
+    _live_collectors.append(collector)
+
+
+def _scrape_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    for collector in _live_collectors:
+        registry.register(collector)
+    return registry
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Return the current exposition payload and its content type."""
+    return generate_latest(_scrape_registry()), CONTENT_TYPE_LATEST
+
+
+def start_exporter(port: int) -> None:
+    """Serve metrics on ``port`` from a background thread (for non-HTTP processes)."""
+    from prometheus_client import start_http_server
+
+    start_http_server(port, registry=_scrape_registry())
+    logger.info("Prometheus exporter listening on :%d", port)
+
+
+class PrometheusMiddleware:
+    """Observe request latency labelled with the matched route template.
+
+    Using the template (``/api/v1/papers/{paper_id}``) rather than the raw
+    path keeps label cardinality bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], template, str(status)).observe(
+                time.perf_counter() - start
+            )
@@ -1,5 +1,12 @@
 """SQLAlchemy ORM models."""
 
-from daily_ai_papers.models.paper import Author, Paper, PaperAuthor
+from daily_ai_papers.models.paper import (
+    Author,
+    Paper,
+    PaperAuthor,
+    PaperChunkSummary,
+    PaperStage,
+    PaperText,
+)
 
-__all__ = ["Author", "Paper", "PaperAuthor"]
+__all__ = ["Author", "Paper", "PaperAuthor", "PaperChunkSummary", "PaperStage", "PaperText"]
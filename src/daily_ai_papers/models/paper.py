@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
@@ -32,8 +33,7 @@ class Paper(Base):
     published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     categories: Mapped[list[str] | None] = mapped_column(ARRAY(String))
 
-    # Extracted / analyzed fields
-    full_text: Mapped[str | None] = mapped_column(Text)
+    # Extracted / analyzed fields (full text lives compressed in PaperText)
     summary: Mapped[str | None] = mapped_column(Text)
     summary_zh: Mapped[str | None] = mapped_column(Text)
     contributions: Mapped[list[str] | None] = mapped_column(ARRAY(String))
@@ -53,6 +53,65 @@ class Paper(Base):
     authors: Mapped[list["Author"]] = relationship(
         secondary="paper_authors", back_populates="papers"
     )
+    # Never loaded implicitly; read through services.text_store.load_full_text.
+    text: Mapped["PaperText | None"] = relationship(
+        back_populates="paper", lazy="raise", cascade="all, delete-orphan"
+    )
+
+
+class PaperText(Base):
+    """Compressed extracted full text, kept out of the ``papers`` table.
+
+    ``data`` holds the compressed bytes, or is NULL when the blob backend
+    stored them under ``blob_key``.
+    """
+
+    __tablename__ = "paper_texts"
+
+    paper_id: Mapped[int] = mapped_column(
+        ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True
+    )
+    codec: Mapped[str] = mapped_column(String(16), nullable=False)  # "zstd" or "zlib"
+    dictionary_id: Mapped[int | None] = mapped_column(Integer)  # zstd dictionary, if used
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)  # Of the UTF-8 text
+    raw_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    stored_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes | None] = mapped_column(LargeBinary)
+    blob_key: Mapped[str | None] = mapped_column(Text)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    paper: Mapped[Paper] = relationship(back_populates="text")
+
+
+class PaperStage(Base):
+    """Fingerprint of the inputs a pipeline stage last processed for a paper."""
+
+    __tablename__ = "paper_stages"
+
+    paper_id: Mapped[int] = mapped_column(
+        ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True
+    )
+    stage: Mapped[str] = mapped_column(String(40), primary_key=True)  # e.g. "analyze"
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class PaperChunkSummary(Base):
+    """Notes on one chunk of a paper from map-reduce extraction, reused by chat."""
+
+    __tablename__ = "paper_chunk_summaries"
+
+    paper_id: Mapped[int] = mapped_column(
+        ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True
+    )
+    chunk_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sections: Mapped[str] = mapped_column(String(200), nullable=False)  # Comma-separated kinds
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
 
 
 class Author(Base):
@@ -0,0 +1,263 @@
+"""Per-request timing (Server-Timing headers) and on-demand sampling profiles.
+
+Every HTTP request gets a :class:`RequestTimings` collector bound to a context
+variable. SQLAlchemy cursor events add to the ``db`` phase, and handlers wrap
+their own hot sections with :func:`timed_phase` (e.g. ``validate``/``encode``).
+The totals are emitted as a ``Server-Timing`` response header.
+
+When a request carries ``X-Profile-Token`` matching ``settings.profile_token``,
+a sampling profiler runs for the duration of that request and the response body
+is replaced with the collapsed stacks ("folded" format), which can be fed
+directly into ``flamegraph.pl`` or https://www.speedscope.app.
+"""
+
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from daily_ai_papers.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+
+_current_timings: ContextVar["RequestTimings | None"] = ContextVar("request_timings", default=None)
+
+
+@dataclass
+class RequestTimings:
+    """Accumulated wall-clock time per phase for a single request."""
+
+    phases: dict[str, float] = field(default_factory=dict)  # phase -> seconds
+    db_queries: int = 0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header_value(self) -> str:
+        """Render the phases as a ``Server-Timing`` header value (durations in ms)."""
+        parts: list[str] = []
+        for name, seconds in self.phases.items():
+            metric = f"{name};dur={seconds * 1000:.2f}"
+            if name == "db":
+                metric += f';desc="{self.db_queries} queries"'
+            parts.append(metric)
+        return ", ".join(parts)
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """Time the enclosed block and add it to the current request's ``name`` phase.
+
+    A no-op outside of a request, so it is safe to use in shared code paths.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+# --- SQLAlchemy instrumentation ---
+
+
+def _before_cursor_execute(conn: Any, *_: Any) -> None:
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _record_query(start: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add("db", time.perf_counter() - start)
+        timings.db_queries += 1
+
+
+def _after_cursor_execute(conn: Any, *_: Any) -> None:
+    _record_query(conn.info["query_start_times"].pop())
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # A failed query never reaches after_cursor_execute; pop its start time
+    # here so it doesn't linger on the pooled connection.
+    conn = context.connection
+    starts = conn.info.get("query_start_times") if conn is not None else None
+    if starts:
+        _record_query(starts.pop())
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query timing listeners to a (sync) engine.
+
+    For an ``AsyncEngine`` pass ``engine.sync_engine``. Safe to call twice.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# --- Sampling profiler ---
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Minimal wall-clock sampling profiler for one thread.
+
+    A daemon thread snapshots the target thread's stack every ``interval``
+    seconds and counts identical stacks, producing collapsed-stack output.
+    Overhead is bounded by the interval and only paid while a profile is
+    running, which keeps it safe to trigger in production.
+
+    The sampler sees the whole thread, not a single task: when profiling the
+    event-loop thread, any requests served concurrently with the profiled one
+    show up in its stacks too. Profile against an otherwise idle worker for
+    a clean picture of one request.
+    """
+
+    def __init__(self, interval: float, thread_id: int | None = None) -> None:
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack: list[str] = []
+            current: FrameType | None = frame
+            while current is not None:
+                stack.append(_frame_label(current))
+                current = current.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Return samples in collapsed-stack format, one ``stack count`` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+# --- ASGI middleware ---
+
+
+def _profile_requested(scope: Scope) -> bool:
+    token = settings.profile_token
+    if not token:
+        return False
+    for name, value in scope.get("headers", []):
+        if name == PROFILE_HEADER:
+            return hmac.compare_digest(value, token.encode())
+    return False
+
+
+class ServerTimingMiddleware:
+    """Record per-phase timings and optionally profile a single request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiling = _profile_requested(scope)
+        if not settings.server_timing_enabled and not profiling:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+
+        if profiling:
+            try:
+                await self._profile(scope, receive, send, timings, start)
+            finally:
+                _current_timings.reset(token)
+            return
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timings.add("total", time.perf_counter() - start)
+                MutableHeaders(scope=message).append("Server-Timing", timings.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, timings: RequestTimings, start: float
+    ) -> None:
+        """Run the request under the sampler and respond with the folded stacks."""
+        status = 500
+
+        async def capture(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler = SamplingProfiler(settings.profile_interval_ms / 1000)
+        profiler.start()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            profiler.stop()
+        timings.add("total", time.perf_counter() - start)
+
+        body = profiler.folded().encode()
+        logger.info(
+            "Profiled %s %s: %d samples, status %d",
+            scope.get("method"),
+            scope.get("path"),
+            profiler.samples.total(),
+            status,
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-disposition", b'attachment; filename="profile.folded"'),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profile-original-status", str(status).encode()),
+                    (b"server-timing", timings.header_value().encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
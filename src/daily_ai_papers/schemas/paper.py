@@ -40,6 +40,8 @@ class PaperDetail(PaperListItem):
     summary: str | None = None
     summary_zh: str | None = None
     contributions: list[str] | None = None
+    methodology: str | None = None
+    results: str | None = None
     pdf_url: str | None = None
     created_at: datetime
     updated_at: datetime
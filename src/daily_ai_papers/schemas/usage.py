@@ -0,0 +1,40 @@
+"""LLM usage ledger schemas."""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class UsageGroup(BaseModel):
+    """Usage aggregated over one combination of the requested grouping fields."""
+
+    stage: str | None = None
+    provider: str | None = None
+    model: str | None = None
+    calls: int
+    prompt_tokens: int  # All input tokens, including cached ones
+    completion_tokens: int
+    cache_read_tokens: int
+    cache_write_tokens: int
+    cost_usd: float
+    avg_latency_ms: float
+    max_latency_ms: float
+
+
+class UsageSummaryResponse(BaseModel):
+    since: datetime
+    backend: str  # "memory" covers only the API process; "sqlite" the whole host
+    groups: list[UsageGroup]
+
+
+class UsageRecordResponse(BaseModel):
+    created_at: datetime
+    provider: str
+    model: str
+    stage: str
+    prompt_tokens: int
+    completion_tokens: int
+    cache_read_tokens: int
+    cache_write_tokens: int
+    latency_ms: float
+    cost_usd: float
@@ -0,0 +1,223 @@
+"""Two-tier paper analysis: abstract pass first, full text on demand.
+
+Tier 1 (:func:`analyze_abstract`) runs on every crawled paper and only needs
+its title and abstract, so the summary and keywords are available minutes
+after the crawl. Tier 2 (:func:`analyze_full_text`) downloads and extracts
+the PDF and fills contributions, methodology and results; it is claimed by
+:func:`claim_full_analysis` when a paper is viewed or analysis is
+requested through the API, and right after tier 1 for papers in
+``ANALYSIS_PRIORITY_CATEGORIES``.
+
+:func:`analyze_abstracts` runs tier 1 for many papers at once, packing
+several abstracts into each LLM request.
+
+Both tiers record stage fingerprints, so rerunning them on unchanged input
+makes no LLM call. With map-reduce extraction the chunk notes are stored in
+``paper_chunk_summaries`` (:func:`load_chunk_summaries`, e.g. for chat) and
+reused for unchanged chunks when the paper is analyzed again.
+
+Status flow: ``crawled`` → ``summarized`` (tier 1) → ``downloading``
+(tier 2 queued) → ``parsed`` → ``analyzed``.
+"""
+
+import logging
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.models.paper import Paper, PaperChunkSummary, PaperText
+from daily_ai_papers.services.fingerprint import needs_run, record_run
+from daily_ai_papers.services.parser import pdf_pool
+from daily_ai_papers.services.parser.metadata_extractor import (
+    ChunkSummary,
+    ExtractedMetadata,
+    abstract_fingerprint,
+    analysis_fingerprint,
+    extract_abstract_metadata,
+    extract_abstract_metadata_many,
+    extract_metadata,
+)
+from daily_ai_papers.services.parser.pdf_extractor import download_pdf
+from daily_ai_papers.services.parser.pdf_structure import (
+    PARTIAL_STOP_KINDS,
+    PaperDocument,
+    extraction_fingerprint,
+)
+from daily_ai_papers.services.text_store import load_full_text, save_full_text
+
+logger = logging.getLogger(__name__)
+
+# Statuses at or past the point where full-text analysis was queued.
+FULL_TEXT_STATUSES = frozenset({"downloading", "parsed", "analyzed", "embedded", "ready"})
+
+
+def is_priority(paper: Paper) -> bool:
+    """True if ``paper`` is in one of ``ANALYSIS_PRIORITY_CATEGORIES``."""
+    priority = settings.analysis_priority_category_list
+    return bool(priority) and any(c in priority for c in paper.categories or [])
+
+
+async def analyze_abstract(db: AsyncSession, paper: Paper) -> bool:
+    """Tier 1: fill ``summary`` and ``keywords`` from the title and abstract.
+
+    Returns False if the paper has no abstract or it was already analyzed
+    with the same prompt and model. The caller commits.
+    """
+    if not paper.abstract:
+        return False
+    current = abstract_fingerprint(paper.title, paper.abstract)
+    if not await needs_run(db, paper.id, "abstract", current):
+        return False
+    metadata = await extract_abstract_metadata(paper.title, paper.abstract)
+    _apply_abstract(paper, metadata)
+    await record_run(db, paper.id, "abstract", current)
+    return True
+
+
+async def analyze_abstracts(db: AsyncSession, papers: Sequence[Paper]) -> int:
+    """Tier 1 for many papers, packing their abstracts into shared requests.
+
+    Papers without an abstract or with unchanged input are skipped. Returns
+    the number of papers analyzed. The caller commits.
+    """
+    pending: dict[str, tuple[Paper, str]] = {}
+    for paper in papers:
+        if not paper.abstract:
+            continue
+        current = abstract_fingerprint(paper.title, paper.abstract)
+        if await needs_run(db, paper.id, "abstract", current):
+            pending[str(paper.id)] = (paper, current)
+    if not pending:
+        return 0
+    extracted = await extract_abstract_metadata_many(
+        {key: (paper.title, paper.abstract or "") for key, (paper, _) in pending.items()}
+    )
+    for key, (paper, current) in pending.items():
+        _apply_abstract(paper, extracted[key])
+        await record_run(db, paper.id, "abstract", current)
+    return len(pending)
+
+
+def _apply_abstract(paper: Paper, metadata: ExtractedMetadata) -> None:
+    # A full-text summary, if there already is one, is better than this.
+    if paper.status not in FULL_TEXT_STATUSES or not paper.summary:
+        paper.summary = metadata.summary
+        paper.keywords = metadata.keywords
+    if paper.status in ("pending", "crawled"):
+        paper.status = "summarized"
+
+
+async def claim_full_analysis(
+    db: AsyncSession, paper_id: int, *, retry_failed: bool = False
+) -> bool:
+    """Mark paper ``paper_id`` as queued for tier 2 unless it already is (or can't be).
+
+    This is a conditional UPDATE, so of several concurrent callers only one
+    gets True and dispatches the full-text task. Failed papers are only
+    claimed again with ``retry_failed``; papers left in ``downloading`` for
+    longer than ``ANALYSIS_QUEUE_TIMEOUT`` (a lost task) are claimed again.
+    The caller dispatches and then commits, or rolls back if dispatching
+    fails so the paper can be queued later. Loaded ``Paper`` objects are
+    not updated.
+    """
+    stale = datetime.now(UTC) - timedelta(seconds=settings.analysis_queue_timeout)
+    claimable = or_(
+        Paper.status.not_in([*FULL_TEXT_STATUSES, "failed"]),
+        and_(Paper.status == "downloading", Paper.updated_at < stale),
+    )
+    if retry_failed:
+        claimable = or_(claimable, Paper.status == "failed")
+    stmt = (
+        update(Paper)
+        .where(Paper.id == paper_id, Paper.pdf_url.is_not(None), claimable)
+        .values(status="downloading")
+        .execution_options(synchronize_session=False)
+    )
+    result = cast(CursorResult[Any], await db.execute(stmt))
+    return result.rowcount == 1
+
+
+async def analyze_full_text(db: AsyncSession, paper: Paper) -> bool:
+    """Tier 2: extract the PDF and analyze its full text.
+
+    Extraction is skipped when the cached PDF is unchanged and the LLM call
+    when the extracted text, prompt and model are. Returns True if the LLM
+    was called. The caller commits.
+
+    With ``LLM_EXTRACTION_MODE=budget`` only the leading sections can be
+    sent, so extraction stops at the references (or acknowledgements or
+    appendix) and the pages behind them are never read; the stored text
+    then ends there too.
+    """
+    if not paper.pdf_url:
+        raise ValueError(f"Paper {paper.id} has no PDF URL")
+    path = await download_pdf(paper.pdf_url)
+
+    partial = settings.llm_extraction_mode == "budget"
+    document: PaperDocument | None = None
+    # Cache objects are named by SHA-256
+    extraction = extraction_fingerprint(path.stem, PARTIAL_STOP_KINDS if partial else ())
+    stored: PaperText | None = None
+    if not await needs_run(db, paper.id, "extract", extraction):
+        stored = await db.get(PaperText, paper.id)
+    if stored is None:  # Changed, forced, or the text is missing
+        if partial:
+            document = await pdf_pool.extract_partial(path, stop_at=PARTIAL_STOP_KINDS)
+        else:
+            document = await pdf_pool.extract_document(path)
+        stored = await save_full_text(db, paper.id, document.text())
+        await record_run(db, paper.id, "extract", extraction)
+    paper.status = "parsed"
+
+    current = analysis_fingerprint(stored.sha256)
+    if not await needs_run(db, paper.id, "analyze", current):
+        paper.status = "analyzed"
+        return False
+    cached = {c.fingerprint: c.summary for c in await load_chunk_summaries(db, paper.id)}
+    if document is None:
+        text = await load_full_text(db, paper.id)
+        metadata = await extract_metadata(text or "", cached_chunks=cached)
+    else:
+        metadata = await extract_metadata(document, cached_chunks=cached)
+    if metadata.chunk_summaries:
+        await save_chunk_summaries(db, paper.id, metadata.chunk_summaries)
+    paper.summary = metadata.summary
+    paper.keywords = metadata.keywords
+    paper.contributions = metadata.contributions
+    paper.methodology = metadata.methodology
+    paper.results = metadata.results
+    paper.status = "analyzed"
+    await record_run(db, paper.id, "analyze", current)
+    logger.info("Full-text analysis of paper %d complete", paper.id)
+    return True
+
+
+async def load_chunk_summaries(db: AsyncSession, paper_id: int) -> list[PaperChunkSummary]:
+    """Return the stored map-reduce notes on ``paper_id``, in document order."""
+    result = await db.execute(
+        select(PaperChunkSummary)
+        .where(PaperChunkSummary.paper_id == paper_id)
+        .order_by(PaperChunkSummary.chunk_index)
+    )
+    return list(result.scalars().all())
+
+
+async def save_chunk_summaries(
+    db: AsyncSession, paper_id: int, summaries: Sequence[ChunkSummary]
+) -> None:
+    """Replace the stored map-reduce notes on ``paper_id``. The caller commits."""
+    await db.execute(delete(PaperChunkSummary).where(PaperChunkSummary.paper_id == paper_id))
+    for index, summary in enumerate(summaries):
+        db.add(
+            PaperChunkSummary(
+                paper_id=paper_id,
+                chunk_index=index,
+                sections=",".join(summary.sections),
+                fingerprint=summary.fingerprint,
+                summary=summary.summary,
+            )
+        )
@@ -7,6 +7,7 @@ from typing import Any
 import feedparser
 import httpx
 
+from daily_ai_papers.metrics import CRAWLER_FETCH_SECONDS
 from daily_ai_papers.services.crawler.base import BaseCrawler, CrawledPaper
 
 logger = logging.getLogger(__name__)
@@ -57,9 +58,10 @@ class ArxivCrawler(BaseCrawler):
             "sortOrder": "descending",
         }
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(ARXIV_API_URL, params=params)
-            response.raise_for_status()
+        with CRAWLER_FETCH_SECONDS.labels("arxiv", "recent").time():
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(ARXIV_API_URL, params=params)
+                response.raise_for_status()
 
         feed = feedparser.parse(response.text)
         cutoff = datetime.now(UTC) - timedelta(days=days_back)
@@ -81,9 +83,10 @@ class ArxivCrawler(BaseCrawler):
             "max_results": 1,
         }
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(ARXIV_API_URL, params=params)
-            response.raise_for_status()
+        with CRAWLER_FETCH_SECONDS.labels("arxiv", "by_id").time():
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(ARXIV_API_URL, params=params)
+                response.raise_for_status()
 
         feed = feedparser.parse(response.text)
         if not feed.entries:
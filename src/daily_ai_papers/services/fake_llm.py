@@ -0,0 +1,177 @@
+"""Simulated provider behaviour for ``LLM_PROVIDER=fake``.
+
+The fake provider's answers are canned (see ``llm_client._fake_complete``);
+this module makes *how* they arrive realistic enough for load and chaos
+testing:
+
+- **latency**: time to first token drawn from a ``fixed``, ``exponential``
+  or ``lognormal`` distribution around ``FAKE_LLM_FIRST_TOKEN_MS``, then
+  ``FAKE_LLM_TOKENS_PER_SECOND`` pacing for the rest of the answer;
+- **capacity**: ``FAKE_LLM_RPM`` and ``FAKE_LLM_MAX_CONCURRENCY`` reject
+  excess requests with 429 / 529 like a real provider;
+- **faults**: random 429s (with ``retry-after``), 5xx errors and timeouts at
+  the configured rates.
+
+Injected errors carry ``status_code`` and ``response.headers`` like the SDKs'
+``APIStatusError``, so the scheduler's backoff and the router's failover
+react to them exactly as they would in production.
+
+With ``FAKE_LLM_SEED`` set, every random draw is derived from the seed, the
+request content and how many times that request was sent before, so a run
+replays the same latencies and faults regardless of task interleaving. The
+send counts cover the most recent ``_MAX_TRACKED`` distinct requests, and
+:func:`reset_fake_llm` clears them so each load-test run starts from scratch.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+
+from daily_ai_papers.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WINDOW = 60.0
+_MAX_TRACKED = 10_000  # Distinct requests whose send counts are kept for seeded draws
+
+# Roughly one token per word, or per character for CJK scripts.
+_TOKEN_RE = re.compile(r"[\u3000-\u9fff\uac00-\ud7af]\s*|[^\s\u3000-\u9fff\uac00-\ud7af]+\s*|\s+")
+
+
+class FakeLLMError(Exception):
+    """Injected provider error shaped like the SDKs' ``APIStatusError``."""
+
+    def __init__(self, status_code: int, message: str, headers: dict[str, str] | None = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def split_tokens(text: str) -> list[str]:
+    """Split ``text`` into the chunks the fake provider streams."""
+    return _TOKEN_RE.findall(text)
+
+
+class FakeLLM:
+    """Latency, capacity and fault simulation shared by all fake calls in a process."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self._accepted: deque[float] = deque()
+        self._sent: OrderedDict[str, int] = OrderedDict()
+        self._random = random.Random()
+
+    def _rng(self, request: str) -> random.Random:
+        seed = settings.fake_llm_seed
+        if seed is None:
+            return self._random
+        digest = hashlib.sha256(request.encode()).hexdigest()
+        attempt = self._sent.pop(digest, 0)
+        self._sent[digest] = attempt + 1
+        if len(self._sent) > _MAX_TRACKED:
+            self._sent.popitem(last=False)
+        return random.Random(f"{seed}:{digest}:{attempt}")
+
+    def first_token_delay(self, rng: random.Random) -> float:
+        """Draw the time to first token in seconds."""
+        distribution = settings.fake_llm_latency_distribution
+        mean = settings.fake_llm_first_token_ms / 1000
+        if distribution == "fixed":
+            return mean
+        if distribution == "exponential":
+            return rng.expovariate(1 / mean) if mean > 0 else 0.0
+        if distribution == "lognormal":
+            # FAKE_LLM_FIRST_TOKEN_MS is the median; sigma sets the tail.
+            return mean * rng.lognormvariate(0.0, settings.fake_llm_latency_sigma)
+        raise ValueError(f"Unsupported fake LLM latency distribution: {distribution}")
+
+    def _admit(self) -> None:
+        """Apply the simulated RPM and concurrency capacity."""
+        now = time.monotonic()
+        while self._accepted and now - self._accepted[0] >= _WINDOW:
+            self._accepted.popleft()
+        rpm = settings.fake_llm_rpm
+        if rpm and len(self._accepted) >= rpm:
+            wait = _WINDOW - (now - self._accepted[0])
+            raise FakeLLMError(
+                429, "rate limit exceeded", {"retry-after-ms": str(int(wait * 1000))}
+            )
+        limit = settings.fake_llm_max_concurrency
+        if limit and self.in_flight >= limit:
+            raise FakeLLMError(529, "overloaded")
+        self._accepted.append(now)
+
+    async def _fault(self, rng: random.Random, first_token: float) -> None:
+        """Raise an injected fault, if the draw picks one."""
+        draw = rng.random()
+        threshold = settings.fake_llm_rate_limit_rate
+        if draw < threshold:
+            retry_after = settings.fake_llm_retry_after
+            raise FakeLLMError(429, "rate limit exceeded", {"retry-after": str(retry_after)})
+        threshold += settings.fake_llm_server_error_rate
+        if draw < threshold:
+            await asyncio.sleep(first_token)
+            raise FakeLLMError(500, "internal server error")
+        threshold += settings.fake_llm_timeout_rate
+        if draw < threshold:
+            await asyncio.sleep(settings.llm_timeout)
+            raise TimeoutError("Request timed out.")
+
+    async def stream(self, request: str, text: str) -> AsyncIterator[str]:
+        """Yield ``text`` token by token with simulated timing and faults.
+
+        ``request`` identifies the call (system prompt, context and prompt)
+        for seeded draws.
+        """
+        rng = self._rng(request)
+        self._admit()
+        self.in_flight += 1
+        try:
+            first_token = self.first_token_delay(rng)
+            await self._fault(rng, first_token)
+            await asyncio.sleep(first_token)
+            rate = settings.fake_llm_tokens_per_second
+            for i, token in enumerate(split_tokens(text)):
+                if rate and i:
+                    await asyncio.sleep(1 / rate)
+                yield token
+        finally:
+            self.in_flight -= 1
+
+    async def complete(self, request: str, text: str) -> int:
+        """Wait as long as generating ``text`` would take; return its token count."""
+        rng = self._rng(request)
+        self._admit()
+        self.in_flight += 1
+        try:
+            first_token = self.first_token_delay(rng)
+            await self._fault(rng, first_token)
+            tokens = len(split_tokens(text))
+            rate = settings.fake_llm_tokens_per_second
+            await asyncio.sleep(first_token + (max(0, tokens - 1) / rate if rate else 0.0))
+            return tokens
+        finally:
+            self.in_flight -= 1
+
+
+_fake_llm: FakeLLM | None = None
+
+
+def get_fake_llm() -> FakeLLM:
+    """Return the process-wide fake provider state."""
+    global _fake_llm
+    if _fake_llm is None:
+        _fake_llm = FakeLLM()
+    return _fake_llm
+
+
+def reset_fake_llm() -> None:
+    """Drop the process-wide fake provider state, e.g. between load-test runs."""
+    global _fake_llm
+    _fake_llm = None
@@ -0,0 +1,66 @@
+"""Input fingerprints for incremental reprocessing.
+
+Each pipeline stage records a fingerprint of what it consumed for a paper
+in ``paper_stages``: the PDF's content hash for extraction, the extracted
+text's hash plus the prompt templates and model for analysis, and so on.
+A rerun computes the fingerprint again and skips the stage when it matches,
+so re-running the pipeline only re-downloads, re-extracts or re-calls the
+LLM for papers whose inputs changed. Editing a prompt template or switching
+``LLM_MODEL`` changes the fingerprint and so reprocesses every affected
+paper; ``PIPELINE_FORCE_STAGES`` reruns stages unconditionally.
+
+Stage-specific fingerprints live next to the code they describe, e.g.
+``metadata_extractor.analysis_fingerprint``.
+"""
+
+import hashlib
+import json
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import PIPELINE_STAGE_RUNS
+from daily_ai_papers.models.paper import PaperStage
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*inputs: str | int | float | None) -> str:
+    """Hash the inputs of a stage into a stable 64-character fingerprint."""
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+
+
+def template_version(*templates: str) -> str:
+    """Short content hash of prompt templates, changing whenever they are edited."""
+    return hashlib.sha256("\0".join(templates).encode()).hexdigest()[:12]
+
+
+def is_forced(stage: str) -> bool:
+    """True if ``PIPELINE_FORCE_STAGES`` names ``stage`` (or its family) or ``all``."""
+    forced = {s.strip() for s in settings.pipeline_force_stages.split(",") if s.strip()}
+    return "all" in forced or stage in forced or stage.split(":")[0] in forced
+
+
+async def needs_run(db: AsyncSession, paper_id: int, stage: str, current: str) -> bool:
+    """Return True if ``stage`` must run for ``paper_id`` given its ``current`` fingerprint."""
+    row = await db.get(PaperStage, (paper_id, stage))
+    if row is not None and row.fingerprint == current and not is_forced(stage):
+        PIPELINE_STAGE_RUNS.labels(stage=stage.split(":")[0], result="skipped").inc()
+        logger.debug("Skipping %s for paper %d: inputs unchanged", stage, paper_id)
+        return False
+    PIPELINE_STAGE_RUNS.labels(stage=stage.split(":")[0], result="run").inc()
+    return True
+
+
+async def record_run(db: AsyncSession, paper_id: int, stage: str, current: str) -> None:
+    """Record that ``stage`` completed for ``paper_id`` with ``current`` inputs.
+
+    Call after the stage's outputs are written, in the same transaction, so
+    a failed stage is retried on the next run. The caller commits.
+    """
+    row = await db.get(PaperStage, (paper_id, stage))
+    if row is None:
+        db.add(PaperStage(paper_id=paper_id, stage=stage, fingerprint=current))
+    else:
+        row.fingerprint = current
@@ -0,0 +1,419 @@
+"""Offline batch mode for LLM calls (OpenAI Batch API / Anthropic Message Batches).
+
+Batch endpoints cost about half as much per token and don't count against
+per-minute rate limits, at the price of minutes-to-hours of latency. That is
+the right trade for the nightly pipeline.
+
+Usage — wrap the pipeline in :func:`batch_mode`; every ``llm_complete`` call
+made inside it (directly or via ``extract_metadata`` / ``translate_text``) is
+queued instead of sent, and awaits its result as usual::
+
+    async with batch_mode():
+        results = await asyncio.gather(*(extract_metadata(t) for t in texts))
+
+The Celery abstract pass (``analyze_paper_abstracts``) runs this way when
+``LLM_BATCH_ABSTRACTS`` is set.
+
+Queued requests are submitted when ``LLM_BATCH_MAX_SIZE`` is reached or after
+no new request arrived for ``LLM_BATCH_LINGER_SECONDS``. The batch is polled
+every ``LLM_BATCH_POLL_INTERVAL`` seconds and results are fanned back out to
+the waiting callers. With ``LLM_PROVIDER=fake`` a local stand-in batch server
+runs the same JSONL round trip offline.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import LLM_TOKENS
+from daily_ai_papers.services import llm_client
+from daily_ai_papers.services.llm_usage import current_stage, record_usage
+
+logger = logging.getLogger(__name__)
+
+_OPENAI_ENDPOINT = "/v1/chat/completions"
+_TERMINAL_OPENAI_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchError(RuntimeError):
+    """A batched request failed or was missing from the batch output."""
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    model: str
+    system: str
+    prompt: str
+    temperature: float
+    max_tokens: int
+    response_json: bool
+    context: str = ""
+
+
+@dataclass
+class BatchResult:
+    text: str | None = None
+    error: str | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+# --- JSONL encoding (OpenAI batch format, also spoken by the local server) ---
+
+
+def build_openai_jsonl(requests: list[BatchRequest]) -> bytes:
+    """Encode requests as an OpenAI batch input file."""
+    lines = []
+    for req in requests:
+        body = llm_client.openai_request_body(
+            req.model,
+            req.system,
+            req.prompt,
+            req.temperature,
+            req.max_tokens,
+            req.response_json,
+            context=req.context,
+        )
+        line = {"custom_id": req.custom_id, "method": "POST", "url": _OPENAI_ENDPOINT, "body": body}
+        lines.append(json.dumps(line, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def parse_openai_output(jsonl: str) -> dict[str, BatchResult]:
+    """Decode an OpenAI batch output (or error) file into results by custom_id."""
+    results: dict[str, BatchResult] = {}
+    for line in jsonl.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code", 200) != 200:
+            error = entry.get("error") or response.get("body", {}).get("error")
+            results[entry["custom_id"]] = BatchResult(error=json.dumps(error))
+            continue
+        body = response["body"]
+        usage = body.get("usage") or {}
+        results[entry["custom_id"]] = BatchResult(
+            text=body["choices"][0]["message"]["content"] or "",
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            cache_read_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+        )
+    return results
+
+
+# --- Backends ---
+
+
+class BatchBackend(ABC):
+    """Submit a batch, report completion and fetch results from one provider."""
+
+    provider: str
+
+    @abstractmethod
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        """Submit the requests and return the provider's batch ID."""
+        ...
+
+    @abstractmethod
+    async def is_done(self, batch_id: str) -> bool:
+        """Return True once the batch reached a terminal state."""
+        ...
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        """Return results keyed by custom_id."""
+        ...
+
+
+class OpenAIBatchBackend(BatchBackend):
+    provider = "openai"
+
+    def __init__(self) -> None:
+        api_key = llm_client._require_api_key("openai")
+        self._client = llm_client._get_client("openai", api_key, settings.llm_base_url)
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        upload = await self._client.files.create(
+            file=("batch.jsonl", build_openai_jsonl(requests)), purpose="batch"
+        )
+        batch = await self._client.batches.create(
+            input_file_id=upload.id, endpoint=_OPENAI_ENDPOINT, completion_window="24h"
+        )
+        return str(batch.id)
+
+    async def is_done(self, batch_id: str) -> bool:
+        batch = await self._client.batches.retrieve(batch_id)
+        return batch.status in _TERMINAL_OPENAI_STATES
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        batch = await self._client.batches.retrieve(batch_id)
+        results: dict[str, BatchResult] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self._client.files.content(file_id)
+                results.update(parse_openai_output(content.text))
+        return results
+
+
+class AnthropicBatchBackend(BatchBackend):
+    provider = "anthropic"
+
+    def __init__(self) -> None:
+        api_key = llm_client._require_api_key("anthropic")
+        self._client = llm_client._get_client("anthropic", api_key, settings.llm_base_url)
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch = await self._client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": req.custom_id,
+                    "params": llm_client.anthropic_request_body(
+                        req.model,
+                        req.system,
+                        req.prompt,
+                        req.temperature,
+                        req.max_tokens,
+                        context=req.context,
+                    ),
+                }
+                for req in requests
+            ]
+        )
+        return str(batch.id)
+
+    async def is_done(self, batch_id: str) -> bool:
+        batch = await self._client.messages.batches.retrieve(batch_id)
+        return bool(batch.processing_status == "ended")
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        results: dict[str, BatchResult] = {}
+        async for entry in await self._client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                usage = llm_client._anthropic_usage(message.usage)
+                results[entry.custom_id] = BatchResult(
+                    text=message.content[0].text,
+                    prompt_tokens=usage.prompt_tokens,
+                    completion_tokens=usage.completion_tokens,
+                    cache_read_tokens=usage.cache_read_tokens,
+                    cache_write_tokens=usage.cache_write_tokens,
+                )
+            else:
+                results[entry.custom_id] = BatchResult(error=entry.result.type)
+        return results
+
+
+class LocalBatchServer(BatchBackend):
+    """In-process stand-in for a provider batch endpoint.
+
+    Accepts the same JSONL input file as the OpenAI Batch API, answers each
+    line with the fake provider and produces an OpenAI-format output file
+    after ``processing_seconds``, so the whole submit/poll/fan-out path can
+    be exercised offline.
+    """
+
+    provider = "fake"
+
+    def __init__(self, processing_seconds: float = 0.0) -> None:
+        self.processing_seconds = processing_seconds
+        self._jobs: dict[str, tuple[float, str]] = {}  # batch_id -> (ready_at, output JSONL)
+        self._ids = itertools.count(1)
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        output_lines = []
+        for line in build_openai_jsonl(requests).decode().splitlines():
+            entry = json.loads(line)
+            body = entry["body"]
+            prompt = body["messages"][-1]["content"]
+            json_mode = body.get("response_format", {}).get("type") == "json_object"
+            text = llm_client._fake_complete(prompt, json_mode)
+            output = {
+                "custom_id": entry["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [{"message": {"role": "assistant", "content": text}}],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": 0},
+                    },
+                },
+                "error": None,
+            }
+            output_lines.append(json.dumps(output, ensure_ascii=False))
+        batch_id = f"batch_local_{next(self._ids)}"
+        ready_at = asyncio.get_running_loop().time() + self.processing_seconds
+        self._jobs[batch_id] = (ready_at, "\n".join(output_lines))
+        return batch_id
+
+    async def is_done(self, batch_id: str) -> bool:
+        ready_at, _ = self._jobs[batch_id]
+        return asyncio.get_running_loop().time() >= ready_at
+
+    async def results(self, batch_id: str) -> dict[str, BatchResult]:
+        _, output = self._jobs.pop(batch_id)
+        return parse_openai_output(output)
+
+
+def get_batch_backend(provider: str) -> BatchBackend:
+    if provider == "openai":
+        return OpenAIBatchBackend()
+    if provider == "anthropic":
+        return AnthropicBatchBackend()
+    if provider == "fake":
+        return LocalBatchServer(settings.llm_batch_fake_processing_seconds)
+    raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+# --- Collector ---
+
+
+@dataclass
+class _Pending:
+    request: BatchRequest
+    future: asyncio.Future[str] = field(repr=False)
+    stage: str = "other"  # Caller stage for usage accounting, captured when queued
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class LLMBatcher:
+    """Collect completion requests and resolve them from provider batches."""
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        *,
+        max_size: int | None = None,
+        linger_seconds: float | None = None,
+        poll_interval: float | None = None,
+    ) -> None:
+        self.backend = backend
+        self.max_size = max_size or settings.llm_batch_max_size
+        self.linger_seconds = (
+            settings.llm_batch_linger_seconds if linger_seconds is None else linger_seconds
+        )
+        self.poll_interval = (
+            settings.llm_batch_poll_interval if poll_interval is None else poll_interval
+        )
+        self._pending: list[_Pending] = []
+        self._ids = itertools.count(1)
+        self._linger: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    @property
+    def provider(self) -> str:
+        return self.backend.provider
+
+    async def complete(
+        self,
+        prompt: str,
+        *,
+        system: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        response_json: bool,
+        context: str = "",
+    ) -> str:
+        """Queue one request and wait for its batched result."""
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        request = BatchRequest(
+            f"req-{next(self._ids)}",
+            model,
+            system,
+            prompt,
+            temperature,
+            max_tokens,
+            response_json,
+            context,
+        )
+        self._pending.append(_Pending(request, future, current_stage()))
+
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        else:
+            if self._linger is not None:
+                self._linger.cancel()
+            self._linger = asyncio.get_running_loop().call_later(self.linger_seconds, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Submit everything queued so far as one batch (non-blocking)."""
+        if self._linger is not None:
+            self._linger.cancel()
+            self._linger = None
+        if not self._pending:
+            return
+        items, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(items))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def wait(self) -> None:
+        """Flush and wait for every submitted batch to resolve."""
+        self.flush()
+        while self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _run(self, items: list[_Pending]) -> None:
+        try:
+            batch_id = await self.backend.submit([item.request for item in items])
+            logger.info("Submitted %s batch %s (%d requests)", self.provider, batch_id, len(items))
+            while not await self.backend.is_done(batch_id):
+                await asyncio.sleep(self.poll_interval)
+            results = await self.backend.results(batch_id)
+        except Exception as exc:
+            logger.exception("%s batch failed", self.provider)
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        failed = 0
+        for item in items:
+            result = results.get(item.request.custom_id)
+            if item.future.done():
+                continue
+            if result is None or result.text is None:
+                failed += 1
+                reason = result.error if result is not None else "missing from batch output"
+                item.future.set_exception(BatchError(f"{item.request.custom_id}: {reason}"))
+                continue
+            model = item.request.model
+            LLM_TOKENS.labels(self.provider, model, "prompt").inc(result.prompt_tokens)
+            LLM_TOKENS.labels(self.provider, model, "completion").inc(result.completion_tokens)
+            LLM_TOKENS.labels(self.provider, model, "cache_read").inc(result.cache_read_tokens)
+            LLM_TOKENS.labels(self.provider, model, "cache_write").inc(result.cache_write_tokens)
+            await record_usage(
+                self.provider,
+                model,
+                time.perf_counter() - item.queued_at,
+                result.prompt_tokens,
+                result.completion_tokens,
+                cache_read_tokens=result.cache_read_tokens,
+                cache_write_tokens=result.cache_write_tokens,
+                stage=item.stage,
+            )
+            item.future.set_result(result.text)
+        logger.info("Batch %s resolved: %d ok, %d failed", batch_id, len(items) - failed, failed)
+
+
+@asynccontextmanager
+async def batch_mode(backend: BatchBackend | None = None) -> AsyncIterator[LLMBatcher]:
+    """Route ``llm_complete`` calls made inside the block through a batcher."""
+    batcher = LLMBatcher(backend or get_batch_backend(settings.llm_provider))
+    token = llm_client._active_batcher.set(batcher)
+    try:
+        yield batcher
+        await batcher.wait()
+    finally:
+        llm_client._active_batcher.reset(token)
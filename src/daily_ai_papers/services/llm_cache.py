@@ -0,0 +1,234 @@
+"""Persistent cache for deterministic LLM completions.
+
+Entries are keyed by a SHA-256 of everything that determines the output
+(provider, model, system prompt, prompt and sampling parameters), expire
+after ``LLM_CACHE_TTL_SECONDS`` and are evicted least-recently-used once
+more than ``LLM_CACHE_MAX_ENTRIES`` are stored. The SQLite backend checks
+its size every ``max_entries // 100`` writes (at most 1000), so it may
+briefly hold up to 1% more.
+
+Two backends are available, selected with ``LLM_CACHE_BACKEND``:
+
+- ``sqlite`` — a local file, shared by all processes on one host
+- ``redis`` — shared across hosts, using ``LLM_CACHE_REDIS_URL`` or ``REDIS_URL``
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from daily_ai_papers.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EVICT_EVERY = 1000
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    response_json: bool,
+    context: str = "",
+) -> str:
+    """Return a stable hash of all inputs that affect a completion."""
+    inputs: list[object] = [provider, model, system, prompt, temperature, max_tokens, response_json]
+    if context:
+        inputs.append(context)
+    payload = json.dumps(inputs, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache(ABC):
+    """Backend interface for the completion cache."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        """Return the cached completion, or None on a miss or expired entry."""
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """Store a completion, evicting least-recently-used entries if over capacity."""
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry."""
+        ...
+
+
+class SQLiteLLMCache(LLMCache):
+    """Cache stored in a local SQLite file (WAL mode, safe across processes)."""
+
+    def __init__(self, path: str | Path, ttl_seconds: int, max_entries: int) -> None:
+        super().__init__(ttl_seconds, max_entries)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Counting rows scans the table, so capacity is checked every N writes.
+        self._evict_every = max(1, min(_EVICT_EVERY, max_entries // 100))
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        result: str = value
+        return result
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._writes += 1
+            if self._writes % self._evict_every == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN"
+                " (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+
+class RedisLLMCache(LLMCache):
+    """Cache stored in Redis.
+
+    Values use native key expiry for the TTL; a sorted set of access times
+    tracks recency so the oldest entries can be trimmed past ``max_entries``.
+    """
+
+    def __init__(
+        self, url: str, ttl_seconds: int, max_entries: int, prefix: str = "llm-cache:"
+    ) -> None:
+        super().__init__(ttl_seconds, max_entries)
+        self.url = url
+        self.prefix = prefix
+        self._lru_key = f"{prefix}lru"
+        self._client: tuple[asyncio.AbstractEventLoop, Any] | None = None
+
+    def _connect(self) -> Any:
+        import redis.asyncio as aioredis
+
+        return aioredis.Redis.from_url(self.url)
+
+    @property
+    def _redis(self) -> Any:
+        """The client for the running loop, created on first use in each loop.
+
+        redis.asyncio connections belong to the loop that opened them, and
+        the cache outlives loops (``asyncio.run`` in scripts, tests). A
+        client left on a closed loop can't be closed here and is dropped.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client[0] is not loop:
+            self._client = (loop, self._connect())
+        return self._client[1]
+
+    async def get(self, key: str) -> str | None:
+        value = await self._redis.get(self.prefix + key)
+        if value is None:
+            await self._redis.zrem(self._lru_key, key)
+            return None
+        await self._redis.zadd(self._lru_key, {key: time.time()})
+        result: str = value.decode()
+        return result
+
+    async def set(self, key: str, value: str) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, value, ex=self.ttl_seconds)
+            pipe.zadd(self._lru_key, {key: time.time()})
+            pipe.zcard(self._lru_key)
+            *_, count = await pipe.execute()
+        excess = count - self.max_entries
+        if excess > 0:
+            oldest = await self._redis.zrange(self._lru_key, 0, excess - 1)
+            if oldest:
+                await self._redis.delete(*(self.prefix + k.decode() for k in oldest))
+                await self._redis.zrem(self._lru_key, *oldest)
+
+    async def clear(self) -> None:
+        keys = await self._redis.zrange(self._lru_key, 0, -1)
+        if keys:
+            await self._redis.delete(*(self.prefix + k.decode() for k in keys))
+        await self._redis.delete(self._lru_key)
+
+
+_cache: LLMCache | None = None
+_cache_backend: str = ""
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Return the configured cache backend, or None when caching is disabled."""
+    global _cache, _cache_backend
+    backend = settings.llm_cache_backend
+    if not backend:
+        return None
+    if _cache is not None and _cache_backend == backend:
+        return _cache
+
+    ttl = settings.llm_cache_ttl_seconds
+    max_entries = settings.llm_cache_max_entries
+    if backend == "sqlite":
+        _cache = SQLiteLLMCache(settings.llm_cache_path, ttl, max_entries)
+    elif backend == "redis":
+        _cache = RedisLLMCache(settings.llm_cache_redis_url or settings.redis_url, ttl, max_entries)
+    else:
+        raise ValueError(f"Unsupported LLM cache backend: {backend}")
+    _cache_backend = backend
+    return _cache
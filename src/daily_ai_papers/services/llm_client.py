@@ -1,13 +1,53 @@
 """Unified LLM client supporting OpenAI and Anthropic providers."""
 
+import asyncio
 import json
 import logging
-from typing import Any
+import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any
 
 from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import (
+    LLM_CACHE_REQUESTS,
+    LLM_ERRORS,
+    observe_llm_call,
+    observe_llm_stream,
+)
+from daily_ai_papers.services.fake_llm import get_fake_llm
+from daily_ai_papers.services.llm_cache import cache_key, get_llm_cache
+from daily_ai_papers.services.llm_scheduler import estimate_tokens, get_scheduler
+from daily_ai_papers.services.llm_usage import llm_stage, record_usage
+
+if TYPE_CHECKING:
+    from daily_ai_papers.services.llm_batch import LLMBatcher
 
 logger = logging.getLogger(__name__)
 
+_PROVIDERS = ("openai", "anthropic")
+
+# Pooled SDK clients keyed by (provider, base_url, api_key). Each entry remembers
+# the event loop it was created on: httpx connection pools are bound to their
+# loop, so a client is only reused on the loop that owns it.
+_clients: dict[tuple[str, str, str], tuple[asyncio.AbstractEventLoop, Any]] = {}
+
+# Set by llm_batch.batch_mode(); calls made inside it are queued for a batch.
+_active_batcher: ContextVar["LLMBatcher | None"] = ContextVar("llm_batcher", default=None)
+
+
+@dataclass
+class LLMUsage:
+    """Token counts reported by the provider for one completion."""
+
+    prompt_tokens: int = 0  # All input tokens, including cached ones
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0  # Input tokens served from the provider's prompt cache
+    cache_write_tokens: int = 0  # Input tokens written to the prompt cache (Anthropic)
+
 
 async def llm_complete(
     prompt: str,
@@ -17,9 +57,21 @@ async def llm_complete(
     temperature: float = 0.0,
     max_tokens: int = 2048,
     response_json: bool = False,
+    use_cache: bool = True,
+    context: str = "",
+    stage: str | None = None,
 ) -> str:
     """Send a prompt to the configured LLM provider and return the response text.
 
+    Deterministic calls (``temperature=0``) are served from the completion
+    cache when ``LLM_CACHE_BACKEND`` is configured.
+
+    Large inputs that repeat across calls (paper text, the text being
+    translated) should be passed as ``context`` rather than inlined in
+    ``prompt``: they are sent before the prompt as a stable prefix that the
+    provider can cache (Anthropic ``cache_control``, OpenAI automatic prefix
+    caching), so later calls over the same text are cheaper and faster.
+
     Args:
         prompt: The user message / prompt.
         system: Optional system message.
@@ -27,6 +79,10 @@ async def llm_complete(
         temperature: Sampling temperature.
         max_tokens: Maximum tokens in the response.
         response_json: If True, request JSON output mode (OpenAI only).
+        use_cache: Set to False to bypass the completion cache for this call.
+        context: Optional cacheable document block sent ahead of ``prompt``.
+        stage: Caller stage for usage accounting (see ``llm_usage``);
+            defaults to the enclosing ``llm_stage()`` block.
 
     Returns:
         The assistant's text response.
@@ -37,88 +93,571 @@ async def llm_complete(
     """
     provider = settings.llm_provider
     model = model or settings.llm_model
+    with llm_stage(stage) if stage else nullcontext():
+        return await _cached_complete(
+            provider,
+            model,
+            system,
+            prompt,
+            temperature,
+            max_tokens,
+            response_json,
+            use_cache,
+            context,
+        )
 
-    if provider == "fake":
-        return _fake_complete(prompt, response_json)
 
-    api_key = settings.llm_api_key
+async def _cached_complete(
+    provider: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    response_json: bool,
+    use_cache: bool,
+    context: str,
+) -> str:
+    cache = get_llm_cache() if use_cache and temperature == 0.0 else None
+    if cache is None:
+        return await _complete_or_batch(
+            provider, model, system, prompt, temperature, max_tokens, response_json, context=context
+        )
+
+    key = cache_key(
+        provider, model, system, prompt, temperature, max_tokens, response_json, context
+    )
+    try:
+        cached = await cache.get(key)
+    except Exception:
+        logger.warning("LLM cache lookup failed; calling provider", exc_info=True)
+        cached = None
+    if cached is not None:
+        LLM_CACHE_REQUESTS.labels("hit").inc()
+        return cached
+    LLM_CACHE_REQUESTS.labels("miss").inc()
+
+    text = await _complete_or_batch(
+        provider, model, system, prompt, temperature, max_tokens, response_json, context=context
+    )
+    try:
+        await cache.set(key, text)
+    except Exception:
+        logger.warning("LLM cache write failed", exc_info=True)
+    return text
+
+
+async def _complete_or_batch(
+    provider: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    response_json: bool,
+    *,
+    context: str = "",
+) -> str:
+    """Queue the call on the active batcher (see ``llm_batch``) or send it now.
+
+    With a fallback route configured, calls go through ``llm_router`` for
+    hedging and failover.
+    """
+    batcher = _active_batcher.get()
+    if batcher is not None and batcher.provider == provider:
+        return await batcher.complete(
+            prompt,
+            system=system,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_json=response_json,
+            context=context,
+        )
+    if settings.llm_fallback_provider or settings.llm_fallback_model:
+        from daily_ai_papers.services.llm_router import get_router
+
+        return await get_router().complete(
+            provider, model, system, prompt, temperature, max_tokens, response_json, context=context
+        )
+    return await _complete(
+        provider, model, system, prompt, temperature, max_tokens, response_json, context=context
+    )
+
+
+async def _complete(
+    provider: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    response_json: bool,
+    *,
+    context: str = "",
+    api_key: str | None = None,
+    base_url: str | None = None,
+) -> str:
+    """Dispatch one completion to ``provider`` through the scheduler and record its metrics.
+
+    ``api_key`` and ``base_url`` default to ``LLM_API_KEY`` / ``LLM_BASE_URL``;
+    the router passes its own for fallback routes.
+    """
+    api_key = "" if provider == "fake" else _require_api_key(provider, api_key)
+    base_url = settings.llm_base_url if base_url is None else base_url
+
+    async def send() -> tuple[str, int]:
+        start = time.perf_counter()
+        try:
+            if provider == "fake":
+                text, usage = await _fake_llm_complete(
+                    system, prompt, response_json, context=context
+                )
+            elif provider == "openai":
+                text, usage = await _openai_complete(
+                    api_key,
+                    base_url,
+                    model,
+                    system,
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    response_json,
+                    context=context,
+                )
+            else:
+                text, usage = await _anthropic_complete(
+                    api_key,
+                    base_url,
+                    model,
+                    system,
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    context=context,
+                )
+        except Exception as exc:
+            LLM_ERRORS.labels(provider, model, type(exc).__name__).inc()
+            raise
+
+        await _record(provider, model, time.perf_counter() - start, usage)
+        return text, usage.prompt_tokens + usage.completion_tokens
+
+    tokens = estimate_tokens(system) + estimate_tokens(context + prompt) + max_tokens
+    return await get_scheduler().run(provider, model, tokens, send)
+
+
+async def _record(
+    provider: str, model: str, seconds: float, usage: LLMUsage, stage: str | None = None
+) -> None:
+    """Export metrics for a completed call and add it to the usage ledger."""
+    counts = {
+        "cache_read_tokens": usage.cache_read_tokens,
+        "cache_write_tokens": usage.cache_write_tokens,
+    }
+    observe_llm_call(
+        provider, model, seconds, usage.prompt_tokens, usage.completion_tokens, **counts
+    )
+    await record_usage(
+        provider,
+        model,
+        seconds,
+        usage.prompt_tokens,
+        usage.completion_tokens,
+        **counts,
+        stage=stage,
+    )
+
+
+def _require_api_key(provider: str, api_key: str | None = None) -> str:
+    api_key = settings.llm_api_key if api_key is None else api_key
     if not api_key:
         raise RuntimeError(
             "LLM_API_KEY is not set. Configure it in .env or as an environment variable."
         )
+    if provider not in _PROVIDERS:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    return api_key
+
 
+async def llm_stream(
+    prompt: str,
+    *,
+    system: str = "",
+    model: str | None = None,
+    temperature: float = 0.0,
+    max_tokens: int = 2048,
+    use_cache: bool = True,
+    context: str = "",
+    stage: str | None = None,
+) -> AsyncIterator[str]:
+    """Stream the response text from the configured provider as it is generated.
+
+    Same arguments as :func:`llm_complete` (JSON mode excluded). A cached
+    completion is yielded as a single chunk; a fully streamed deterministic
+    completion is written back to the cache. Time to first token and
+    tokens/second are exported as metrics.
+
+    Raises:
+        ValueError: If the configured provider is not supported.
+        RuntimeError: If no API key is configured.
+    """
+    provider = settings.llm_provider
+    model = model or settings.llm_model
+
+    cache = get_llm_cache() if use_cache and temperature == 0.0 else None
+    key = cache_key(provider, model, system, prompt, temperature, max_tokens, False, context)
+    if cache is not None:
+        try:
+            cached = await cache.get(key)
+        except Exception:
+            logger.warning("LLM cache lookup failed; calling provider", exc_info=True)
+            cached = None
+        LLM_CACHE_REQUESTS.labels("hit" if cached is not None else "miss").inc()
+        if cached is not None:
+            yield cached
+            return
+
+    usage = LLMUsage()
+    if provider == "fake":
+        usage.prompt_tokens = estimate_tokens(system) + estimate_tokens(context + prompt)
+        chunks = get_fake_llm().stream(system + context + prompt, _fake_complete(prompt, False))
+    else:
+        api_key = _require_api_key(provider)
+        if provider == "openai":
+            chunks = _openai_stream(
+                api_key,
+                settings.llm_base_url,
+                model,
+                system,
+                prompt,
+                temperature,
+                max_tokens,
+                usage,
+                context=context,
+            )
+        else:
+            chunks = _anthropic_stream(
+                api_key,
+                settings.llm_base_url,
+                model,
+                system,
+                prompt,
+                temperature,
+                max_tokens,
+                usage,
+                context=context,
+            )
+
+    tokens = estimate_tokens(system) + estimate_tokens(context + prompt) + max_tokens
+    first_token_at: float | None = None
+    parts: list[str] = []
+    async with get_scheduler().slot(provider, model, tokens):
+        start = time.perf_counter()
+        try:
+            async for chunk in chunks:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(chunk)
+                yield chunk
+        except Exception as exc:
+            LLM_ERRORS.labels(provider, model, type(exc).__name__).inc()
+            raise
+
+    end = time.perf_counter()
+    completion_tokens = usage.completion_tokens or len(parts)
+    observe_llm_stream(
+        provider,
+        model,
+        ttft=(first_token_at or end) - start,
+        generation_seconds=end - (first_token_at or end),
+        completion_tokens=completion_tokens,
+    )
+    usage.completion_tokens = completion_tokens
+    await _record(provider, model, end - start, usage, stage)
+    if cache is not None:
+        try:
+            await cache.set(key, "".join(parts))
+        except Exception:
+            logger.warning("LLM cache write failed", exc_info=True)
+
+
+def _pool_limits(sdk_default: Any) -> Any:
+    """Build connection limits with the SDK's own ``Limits`` class.
+
+    The SDKs bundle their own httpx flavour, so the type is taken from the
+    SDK's default limits rather than imported from ``httpx`` directly.
+    """
+    return type(sdk_default)(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+    )
+
+
+def _get_client(provider: str, api_key: str, base_url: str = "") -> Any:
+    """Return the shared SDK client for this provider/endpoint/key, creating it once.
+
+    Clients are sized by ``LLM_MAX_CONNECTIONS`` / ``LLM_MAX_KEEPALIVE_CONNECTIONS``
+    and use ``LLM_TIMEOUT``. The SDKs' own retries are off: every call goes
+    through the scheduler, which handles rate limits and retries
+    (``LLM_MAX_RETRIES``) itself. Must be called from a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, base_url, api_key)
+    entry = _clients.get(key)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+
+    client: Any
     if provider == "openai":
-        return await _openai_complete(
-            api_key, model, system, prompt, temperature, max_tokens, response_json
+        import openai
+
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or None,
+            timeout=settings.llm_timeout,
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(
+                limits=_pool_limits(openai.DEFAULT_CONNECTION_LIMITS),
+                timeout=settings.llm_timeout,
+            ),
         )
     elif provider == "anthropic":
-        return await _anthropic_complete(api_key, model, system, prompt, temperature, max_tokens)
+        import anthropic
+
+        client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            base_url=base_url or None,
+            timeout=settings.llm_timeout,
+            max_retries=0,
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                limits=_pool_limits(anthropic.DEFAULT_CONNECTION_LIMITS),
+                timeout=settings.llm_timeout,
+            ),
+        )
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
+    _clients[key] = (loop, client)
+    logger.info("Created %s client (base_url=%s)", provider, base_url or "default")
+    return client
 
-async def _openai_complete(
-    api_key: str,
+
+async def close_llm_clients() -> None:
+    """Close pooled SDK clients; call on API shutdown and Celery worker shutdown.
+
+    Clients owned by the running loop are closed gracefully. Clients from a
+    loop that is no longer running can't be awaited here and are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    entries = list(_clients.values())
+    _clients.clear()
+    for owner, client in entries:
+        if owner is not loop:
+            continue
+        try:
+            await client.close()
+        except Exception:
+            logger.warning("Failed to close LLM client", exc_info=True)
+
+
+def openai_request_body(
     model: str,
     system: str,
     prompt: str,
     temperature: float,
     max_tokens: int,
     response_json: bool,
-) -> str:
-    from openai import AsyncOpenAI
-
-    client_kwargs: dict[str, Any] = {"api_key": api_key}
-    base_url = settings.llm_base_url
-    if base_url:
-        client_kwargs["base_url"] = base_url
+    *,
+    context: str = "",
+) -> dict[str, Any]:
+    """Build Chat Completions parameters (shared by live and batch calls).
 
-    client = AsyncOpenAI(**client_kwargs)
+    ``context`` goes first in the user message so that system prompt and
+    context form an identical prefix across calls, which OpenAI caches
+    automatically once it exceeds 1024 tokens.
+    """
     messages: list[dict[str, Any]] = []
     if system:
         messages.append({"role": "system", "content": system})
-    messages.append({"role": "user", "content": prompt})
+    content = f"{context}\n\n{prompt}" if context else prompt
+    messages.append({"role": "user", "content": content})
 
-    kwargs: dict[str, Any] = {
+    body: dict[str, Any] = {
         "model": model,
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens,
     }
     if response_json:
-        kwargs["response_format"] = {"type": "json_object"}
-
-    response = await client.chat.completions.create(**kwargs)
-    text = response.choices[0].message.content or ""
-    label = base_url or "OpenAI"
-    logger.info("%s %s responded with %d chars", label, model, len(text))
-    return text
+        body["response_format"] = {"type": "json_object"}
+    return body
 
 
-async def _anthropic_complete(
-    api_key: str,
+def anthropic_request_body(
     model: str,
     system: str,
     prompt: str,
     temperature: float,
     max_tokens: int,
-) -> str:
-    from anthropic import AsyncAnthropic
+    *,
+    context: str = "",
+) -> dict[str, Any]:
+    """Build Messages API parameters (shared by live and batch calls).
 
-    client = AsyncAnthropic(api_key=api_key)
-    kwargs: dict[str, Any] = {
+    ``context`` is sent as its own content block ahead of the prompt and,
+    with ``LLM_PROMPT_CACHING`` on, marked with an ephemeral ``cache_control``
+    breakpoint so the system prompt plus context are cached for later calls.
+    """
+    content: str | list[dict[str, Any]] = prompt
+    if context:
+        context_block: dict[str, Any] = {"type": "text", "text": context}
+        if settings.llm_prompt_caching:
+            context_block["cache_control"] = {"type": "ephemeral"}
+        content = [context_block, {"type": "text", "text": prompt}]
+    body: dict[str, Any] = {
         "model": model,
         "max_tokens": max_tokens,
         "temperature": temperature,
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": [{"role": "user", "content": content}],
     }
     if system:
-        kwargs["system"] = system
+        body["system"] = system
+    return body
+
 
+async def _openai_complete(
+    api_key: str,
+    base_url: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    response_json: bool,
+    *,
+    context: str = "",
+) -> tuple[str, LLMUsage]:
+    client = _get_client("openai", api_key, base_url)
+    kwargs = openai_request_body(
+        model, system, prompt, temperature, max_tokens, response_json, context=context
+    )
+    response = await client.chat.completions.create(**kwargs)
+    text = response.choices[0].message.content or ""
+    usage = _openai_usage(response.usage)
+    label = base_url or "OpenAI"
+    logger.info(
+        "%s %s responded with %d chars (%d prompt / %d cached / %d completion tokens)",
+        label,
+        model,
+        len(text),
+        usage.prompt_tokens,
+        usage.cache_read_tokens,
+        usage.completion_tokens,
+    )
+    return text, usage
+
+
+async def _anthropic_complete(
+    api_key: str,
+    base_url: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    *,
+    context: str = "",
+) -> tuple[str, LLMUsage]:
+    client = _get_client("anthropic", api_key, base_url)
+    kwargs = anthropic_request_body(model, system, prompt, temperature, max_tokens, context=context)
     response = await client.messages.create(**kwargs)
     text: str = response.content[0].text
-    logger.info("Anthropic %s responded with %d chars", model, len(text))
-    return text
+    usage = _anthropic_usage(response.usage)
+    logger.info(
+        "Anthropic %s responded with %d chars "
+        "(%d prompt / %d cache read / %d cache write / %d completion tokens)",
+        model,
+        len(text),
+        usage.prompt_tokens,
+        usage.cache_read_tokens,
+        usage.cache_write_tokens,
+        usage.completion_tokens,
+    )
+    return text, usage
+
+
+def _openai_usage(raw: Any) -> LLMUsage:
+    """Convert OpenAI usage, reading cached prompt tokens when reported."""
+    if raw is None:
+        return LLMUsage()
+    details = getattr(raw, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or 0
+    return LLMUsage(raw.prompt_tokens, raw.completion_tokens, cache_read_tokens=cached)
+
+
+def _copy_usage(source: LLMUsage, target: LLMUsage) -> None:
+    for f in fields(LLMUsage):
+        setattr(target, f.name, getattr(source, f.name))
+
+
+def _anthropic_usage(raw: Any) -> LLMUsage:
+    """Convert Anthropic usage; ``input_tokens`` excludes cache reads and writes."""
+    read = getattr(raw, "cache_read_input_tokens", None) or 0
+    write = getattr(raw, "cache_creation_input_tokens", None) or 0
+    return LLMUsage(
+        raw.input_tokens + read + write,
+        raw.output_tokens,
+        cache_read_tokens=read,
+        cache_write_tokens=write,
+    )
+
+
+async def _openai_stream(
+    api_key: str,
+    base_url: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    usage: LLMUsage,
+    *,
+    context: str = "",
+) -> AsyncIterator[str]:
+    client = _get_client("openai", api_key, base_url)
+    kwargs = openai_request_body(
+        model, system, prompt, temperature, max_tokens, False, context=context
+    )
+    stream = await client.chat.completions.create(
+        **kwargs, stream=True, stream_options={"include_usage": True}
+    )
+    async for chunk in stream:
+        if chunk.usage is not None:
+            _copy_usage(_openai_usage(chunk.usage), usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _anthropic_stream(
+    api_key: str,
+    base_url: str,
+    model: str,
+    system: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    usage: LLMUsage,
+    *,
+    context: str = "",
+) -> AsyncIterator[str]:
+    client = _get_client("anthropic", api_key, base_url)
+    kwargs = anthropic_request_body(model, system, prompt, temperature, max_tokens, context=context)
+    async with client.messages.stream(**kwargs) as stream:
+        async for text in stream.text_stream:
+            yield text
+        message = await stream.get_final_message()
+    _copy_usage(_anthropic_usage(message.usage), usage)
 
 
 def _fake_complete(prompt: str, response_json: bool) -> str:
@@ -130,6 +669,26 @@ def _fake_complete(prompt: str, response_json: bool) -> str:
     """
     prompt_lower = prompt.lower()
 
+    # Packed multi-paper abstract extraction: answer every paper in the prompt
+    if "metadata for each paper" in prompt_lower:
+        papers = json.loads(prompt[prompt.index("Papers:") + len("Papers:") :])
+        return json.dumps(
+            {
+                "papers": [
+                    {
+                        "id": paper["id"],
+                        "summary": f"This paper, {paper['title']}, is summarized offline.",
+                        "keywords": ["fake", "packed extraction"],
+                    }
+                    for paper in papers
+                ]
+            }
+        )
+
+    # Map-reduce chunk notes
+    if "concise notes" in prompt_lower:
+        return "The Transformer relies entirely on attention and reaches 28.4 BLEU on WMT 2014."
+
     # Metadata extraction prompt
     is_metadata_prompt = "extract structured metadata" in prompt_lower or (
         "contributions" in prompt_lower and "keywords" in prompt_lower
@@ -169,6 +728,24 @@ def _fake_complete(prompt: str, response_json: bool) -> str:
             }
         )
 
+    # Multi-language translation: one canned translation per listed language
+    if "into each of these languages" in prompt_lower:
+        listed = re.findall(r"^- (\S+): (.+)$", prompt, re.MULTILINE)
+        return json.dumps(
+            {code: _fake_complete(f"Translate into {name}", False) for code, name in listed},
+            ensure_ascii=False,
+        )
+
+    # Segment translation: the segment tagged with the language, one per segment
+    if "translate each academic paper segment" in prompt_lower:
+        name = re.search(r"into (.+?):\n", prompt)
+        start = prompt.index("[")
+        segments, _ = json.JSONDecoder().raw_decode(prompt[start:])
+        tag = name.group(1) if name else "?"
+        return json.dumps(
+            {"translations": [f"[{tag}] {segment}" for segment in segments]}, ensure_ascii=False
+        )
+
     # Translation prompt (Chinese)
     if "chinese" in prompt_lower or "中文" in prompt_lower:
         return "我们提出了一种新的网络架构——Transformer，完全基于注意力机制。"
@@ -187,6 +764,16 @@ def _fake_complete(prompt: str, response_json: bool) -> str:
     return "5"
 
 
+async def _fake_llm_complete(
+    system: str, prompt: str, response_json: bool, *, context: str = ""
+) -> tuple[str, LLMUsage]:
+    """Return the canned response after the simulated latency (see ``fake_llm``)."""
+    text = _fake_complete(prompt, response_json)
+    completion_tokens = await get_fake_llm().complete(system + context + prompt, text)
+    prompt_tokens = estimate_tokens(system) + estimate_tokens(context + prompt)
+    return text, LLMUsage(prompt_tokens, completion_tokens)
+
+
 def parse_json_response(text: str) -> dict[str, Any]:
     """Extract and parse JSON from an LLM response.
 
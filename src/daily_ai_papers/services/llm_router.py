@@ -0,0 +1,258 @@
+"""Hedged requests and failover between LLM providers.
+
+Enabled by configuring a fallback route (``LLM_FALLBACK_PROVIDER`` and/or
+``LLM_FALLBACK_MODEL``). Each call then:
+
+- goes to the primary route (``LLM_PROVIDER`` / ``LLM_MODEL``) first;
+- for interactive calls, sends a **hedged** duplicate to the fallback when
+  the primary is slower than its recent ``LLM_HEDGE_QUANTILE`` latency, and
+  returns whichever answer arrives first (the loser is cancelled);
+- **fails over** to the fallback when the primary times out, cannot be
+  reached, is rate limited (429) or returns a 5xx; other errors, such as a
+  400 for a bad request, would fail on every route and are raised at once;
+- skips routes whose **circuit breaker** is open: after
+  ``LLM_CIRCUIT_FAILURE_THRESHOLD`` consecutive transient failures a route
+  is not tried for ``LLM_CIRCUIT_RESET_SECONDS``, then a single probe call
+  decides whether it closes again.
+
+Batch-lane calls (Celery tasks) fail over but are never hedged, since a
+duplicate request doubles their cost for no user-visible gain.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import LLM_ROUTE_EVENTS
+from daily_ai_papers.services import llm_client
+from daily_ai_papers.services.llm_scheduler import current_priority, is_retryable
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_WINDOW = 200
+_MIN_SAMPLES = 20
+
+
+@dataclass(frozen=True)
+class Route:
+    provider: str
+    model: str
+    api_key: str
+    base_url: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+class LatencyTracker:
+    """Recent successful-call latencies of one route."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before sending a hedged request."""
+        floor = settings.llm_hedge_min_delay
+        if len(self._samples) < _MIN_SAMPLES:
+            return floor
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * settings.llm_hedge_quantile))
+        return max(floor, ordered[index])
+
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures → half-open probe after a cool-down."""
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= settings.llm_circuit_reset_seconds:
+            return "half_open"
+        return "open"
+
+    def available(self) -> bool:
+        """Return True if the route may be tried (closed, or half-open with no probe out)."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._probing)
+
+    def begin(self) -> None:
+        """Mark a call as started; in the half-open state it is the single probe."""
+        if self.state == "half_open":
+            self._probing = True
+
+    def cancel(self) -> None:
+        """A started call ended without a verdict (lost a hedge, or was a bad request)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; return True if this opened the circuit."""
+        self.failures += 1
+        was_probing, self._probing = self._probing, False
+        if was_probing or self.failures >= settings.llm_circuit_failure_threshold:
+            opened = self.opened_at is None or was_probing
+            self.opened_at = time.monotonic()
+            return opened
+        return False
+
+
+class LLMRouter:
+    """Route completions across a primary and a fallback provider/model."""
+
+    def __init__(self) -> None:
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latency: dict[str, LatencyTracker] = {}
+
+    def breaker(self, route: Route) -> CircuitBreaker:
+        return self._breakers.setdefault(route.name, CircuitBreaker())
+
+    def latency(self, route: Route) -> LatencyTracker:
+        return self._latency.setdefault(route.name, LatencyTracker())
+
+    def routes(self, provider: str, model: str) -> list[Route]:
+        """Return the primary route for this call followed by the fallback."""
+        primary = Route(provider, model, settings.llm_api_key, settings.llm_base_url)
+        fallback_provider = settings.llm_fallback_provider or provider
+        same_provider = fallback_provider == provider
+        fallback = Route(
+            fallback_provider,
+            settings.llm_fallback_model or model,
+            settings.llm_fallback_api_key or (settings.llm_api_key if same_provider else ""),
+            settings.llm_fallback_base_url or (settings.llm_base_url if same_provider else ""),
+        )
+        return [primary] if fallback == primary else [primary, fallback]
+
+    async def _attempt(
+        self,
+        route: Route,
+        system: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_json: bool,
+        context: str,
+    ) -> str:
+        breaker = self.breaker(route)
+        breaker.begin()
+        start = time.perf_counter()
+        try:
+            text = await llm_client._complete(
+                route.provider,
+                route.model,
+                system,
+                prompt,
+                temperature,
+                max_tokens,
+                response_json,
+                context=context,
+                api_key=route.api_key,
+                base_url=route.base_url,
+            )
+        except asyncio.CancelledError:
+            breaker.cancel()
+            raise
+        except Exception as exc:
+            if not is_retryable(exc):
+                breaker.cancel()  # the request was at fault, not the route
+                raise
+            if breaker.record_failure():
+                LLM_ROUTE_EVENTS.labels(route.name, "circuit_open").inc()
+                logger.warning("Circuit opened for LLM route %s", route.name)
+            raise
+        breaker.record_success()
+        self.latency(route).observe(time.perf_counter() - start)
+        return text
+
+    async def complete(
+        self,
+        provider: str,
+        model: str,
+        system: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_json: bool,
+        *,
+        context: str = "",
+    ) -> str:
+        """Return the first successful completion across the available routes.
+
+        Raises:
+            Exception: The primary route's error if every route failed, or
+                the first non-retryable error (e.g. a 400), without failover.
+        """
+        routes = self.routes(provider, model)
+        queue = [r for r in routes if self.breaker(r).available()] or routes
+        primary = queue[0]
+        hedge = settings.llm_hedge_enabled and current_priority() == "interactive"
+        errors: list[BaseException] = []
+        pending: dict[asyncio.Task[str], Route] = {}
+
+        def launch(event: str | None = None) -> None:
+            route = queue.pop(0)
+            if event is not None:
+                LLM_ROUTE_EVENTS.labels(route.name, event).inc()
+            task = asyncio.create_task(
+                self._attempt(
+                    route, system, prompt, temperature, max_tokens, response_json, context
+                )
+            )
+            pending[task] = route
+
+        launch()
+        timeout = self.latency(primary).hedge_delay() if hedge and queue else None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                timeout = None  # hedge at most once
+                if not done:
+                    launch("hedge")
+                    continue
+                for task in done:
+                    route = pending.pop(task)
+                    exc = task.exception()
+                    if exc is None:
+                        if route != primary:
+                            LLM_ROUTE_EVENTS.labels(route.name, "won").inc()
+                        return task.result()
+                    if not is_retryable(exc):
+                        raise exc
+                    errors.append(exc)
+                    logger.warning("LLM route %s failed: %r", route.name, exc)
+                    if queue and not pending:
+                        launch("failover")
+            raise errors[0]
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+_router: LLMRouter | None = None
+
+
+def get_router() -> LLMRouter:
+    """Return the process-wide router (breaker and latency state live here)."""
+    global _router
+    if _router is None:
+        _router = LLMRouter()
+    return _router
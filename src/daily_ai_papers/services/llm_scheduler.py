@@ -0,0 +1,523 @@
+"""Rate-limit-aware scheduling of LLM requests.
+
+Every provider call made by ``llm_client`` goes through :class:`LLMScheduler`,
+which keeps three things per (provider, model):
+
+- **Rate budgets** — requests/min and tokens/min from ``LLM_RATE_LIMITS``,
+  counted in fixed one-minute windows. With ``LLM_SCHEDULER_BACKEND=redis``
+  the counters live in Redis, so all API and worker processes share one quota.
+- **Adaptive concurrency** — an AIMD limit on in-flight requests: it grows by
+  one slot per "round" of successful calls and halves when the provider
+  answers 429/overloaded, so throughput settles just under the real quota.
+- **Retry-After blocks** — a rate-limited response blocks the whole
+  provider/model for the delay the provider asked for (also shared via Redis)
+  and the call is retried, up to ``LLM_RATE_LIMIT_RETRIES`` times.
+
+Other transient errors (timeouts, connection errors, 5xx) are retried with
+exponential backoff up to ``LLM_MAX_RETRIES`` times. The SDK clients are
+created with their own retries off, so every retry happens here, where it
+is visible to the budgets and the concurrency limit.
+
+Calls are assigned to a priority lane. ``interactive`` (the default, used by
+API requests) is always served first; ``batch`` (set for Celery tasks by
+``tasks.runner.run_async`` or explicitly with :func:`llm_priority`) may only
+use ``LLM_BATCH_LANE_SHARE`` of each budget, leaving headroom for users.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Literal, TypeVar
+
+import httpx
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import (
+    LLM_CONCURRENCY_LIMIT,
+    LLM_RATE_LIMITED,
+    LLM_SCHEDULER_WAIT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Priority = Literal["interactive", "batch"]
+
+_LANE_RANK: dict[str, int] = {"interactive": 0, "batch": 1}
+_RATE_LIMIT_STATUSES = {429, 503, 529}
+_DEFAULT_BACKOFF = 1.0
+_RETRY_BACKOFF = 0.5  # First delay before retrying a transient error; doubles each time
+_WINDOW = 60.0
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run LLM calls made inside the block in the given priority lane."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """Return the priority lane of the calling context."""
+    return _priority.get()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting."""
+    return len(text) // 4 + 1
+
+
+def parse_rate_limits(spec: str) -> dict[tuple[str, str], tuple[int, int]]:
+    """Parse ``"provider:model=RPM/TPM,..."`` into ``{(provider, model): (rpm, tpm)}``.
+
+    A limit of 0 means unlimited.
+
+    Raises:
+        ValueError: If an entry is malformed.
+    """
+    limits: dict[tuple[str, str], tuple[int, int]] = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            target, budget = entry.split("=")
+            provider, model = target.split(":", 1)
+            rpm, tpm = budget.split("/")
+            limits[(provider.strip(), model.strip())] = (int(rpm), int(tpm))
+        except ValueError:
+            raise ValueError(
+                f"Invalid LLM_RATE_LIMITS entry {entry!r}; expected provider:model=RPM/TPM"
+            ) from None
+    return limits
+
+
+def rate_limit_delay(exc: BaseException) -> float | None:
+    """Return how long to back off if ``exc`` is a rate-limit/overload error, else None.
+
+    Works with both SDKs' ``APIStatusError`` (``status_code`` plus the
+    ``response`` headers): ``retry-after-ms`` wins over ``retry-after``.
+    """
+    if getattr(exc, "status_code", None) not in _RATE_LIMIT_STATUSES:
+        return None
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue  # HTTP-date form; fall back to the default backoff
+    return _DEFAULT_BACKOFF
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for errors a retry (or another route) may not hit again.
+
+    That is timeouts, connection errors, 429 and 5xx; other 4xx errors
+    (bad request, context too long, authentication) fail every time.
+    """
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(exc, TimeoutError | ConnectionError | httpx.TransportError):
+        return True
+    # Both SDKs' APIConnectionError (and its APITimeoutError subclass).
+    return any(cls.__name__ == "APIConnectionError" for cls in type(exc).__mro__)
+
+
+# --- Rate budgets ---
+
+
+class RateBudget(ABC):
+    """Requests/min and tokens/min counters plus Retry-After blocks, per key."""
+
+    @abstractmethod
+    async def reserve(self, key: str, rpm: int, tpm: int, tokens: int) -> float:
+        """Take one request and ``tokens`` from the current window.
+
+        Returns 0 when granted, otherwise the seconds to wait before retrying.
+        """
+        ...
+
+    @abstractmethod
+    async def adjust(self, key: str, tokens: int, window: int) -> None:
+        """Correct the token count of ``window`` once actual usage is known.
+
+        ``window`` is the one the reservation was made in (see
+        :func:`current_window`); nothing changes once it is over.
+        """
+        ...
+
+    @abstractmethod
+    async def block(self, key: str, seconds: float) -> None:
+        """Refuse reservations for ``key`` for the next ``seconds``."""
+        ...
+
+
+def _window() -> tuple[int, float]:
+    """Return the current window number and the seconds left in it."""
+    now = time.time()
+    window = int(now // _WINDOW)
+    return window, (window + 1) * _WINDOW - now
+
+
+def current_window() -> int:
+    """Return the number of the current rate-budget window."""
+    return _window()[0]
+
+
+def _over_budget(used_requests: int, used_tokens: int, rpm: int, tpm: int, tokens: int) -> bool:
+    if rpm and used_requests + 1 > rpm:
+        return True
+    # A single request larger than the whole TPM budget still goes through
+    # on an empty window instead of waiting forever.
+    return bool(tpm and used_tokens and used_tokens + tokens > tpm)
+
+
+class LocalRateBudget(RateBudget):
+    """In-process budget, shared by all coroutines of one process."""
+
+    def __init__(self) -> None:
+        self._windows: dict[str, list[int]] = {}  # key -> [window, requests, tokens]
+        self._blocked_until: dict[str, float] = {}
+
+    async def reserve(self, key: str, rpm: int, tpm: int, tokens: int) -> float:
+        blocked = self._blocked_until.get(key, 0.0) - time.monotonic()
+        if blocked > 0:
+            return blocked
+        window, remaining = _window()
+        counts = self._windows.get(key)
+        if counts is None or counts[0] != window:
+            counts = self._windows[key] = [window, 0, 0]
+        if _over_budget(counts[1], counts[2], rpm, tpm, tokens):
+            return remaining
+        counts[1] += 1
+        counts[2] += tokens
+        return 0.0
+
+    async def adjust(self, key: str, tokens: int, window: int) -> None:
+        counts = self._windows.get(key)
+        if counts is not None and counts[0] == window:
+            counts[2] = max(0, counts[2] + tokens)
+
+    async def block(self, key: str, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        self._blocked_until[key] = max(self._blocked_until.get(key, 0.0), until)
+
+
+# KEYS: requests counter, tokens counter, block key.
+# ARGV: rpm, tpm, tokens, window TTL (s).
+# Returns -1 when granted, the block's remaining ms when blocked, or -2 when
+# the window's budget is spent.
+_RESERVE_SCRIPT = """
+local blocked = redis.call('PTTL', KEYS[3])
+if blocked > 0 then return blocked end
+local rpm, tpm, tokens = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local used_requests = tonumber(redis.call('GET', KEYS[1]) or '0')
+local used_tokens = tonumber(redis.call('GET', KEYS[2]) or '0')
+if rpm > 0 and used_requests + 1 > rpm then return -2 end
+if tpm > 0 and used_tokens > 0 and used_tokens + tokens > tpm then return -2 end
+redis.call('INCR', KEYS[1])
+redis.call('INCRBY', KEYS[2], tokens)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return -1
+"""
+
+
+# KEYS: tokens counter of the reservation's window. ARGV: token delta.
+# Only an existing counter is changed (so its TTL is kept), never below 0.
+_ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+if redis.call('INCRBY', KEYS[1], ARGV[1]) < 0 then redis.call('SET', KEYS[1], 0, 'KEEPTTL') end
+return 1
+"""
+
+
+class RedisRateBudget(RateBudget):
+    """Budget kept in Redis so every API and worker process shares one quota."""
+
+    def __init__(self, url: str, prefix: str = "llm-sched:") -> None:
+        self.url = url
+        self.prefix = prefix
+        self._client: tuple[asyncio.AbstractEventLoop, Any, Any, Any] | None = None
+
+    def _connect(self) -> Any:
+        import redis.asyncio as aioredis
+
+        return aioredis.Redis.from_url(self.url)
+
+    def _connection(self) -> tuple[Any, Any, Any]:
+        """The client and its (reserve, adjust) scripts for the running loop.
+
+        redis.asyncio connections belong to the loop that opened them, and
+        the scheduler outlives loops (``asyncio.run`` in scripts, tests), so
+        a client is created on first use in each loop, as in ``llm_cache``.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client[0] is not loop:
+            client = self._connect()
+            reserve = client.register_script(_RESERVE_SCRIPT)
+            self._client = (loop, client, reserve, client.register_script(_ADJUST_SCRIPT))
+        return self._client[1:]
+
+    @property
+    def _redis(self) -> Any:
+        return self._connection()[0]
+
+    def _keys(self, key: str, window: int) -> list[str]:
+        base = f"{self.prefix}{key}"
+        return [f"{base}:{window}:req", f"{base}:{window}:tok", f"{base}:block"]
+
+    async def reserve(self, key: str, rpm: int, tpm: int, tokens: int) -> float:
+        window, remaining = _window()
+        ttl = int(_WINDOW * 2)
+        _, script, _ = self._connection()
+        result = int(await script(keys=self._keys(key, window), args=[rpm, tpm, tokens, ttl]))
+        if result == -1:
+            return 0.0
+        if result == -2:
+            return remaining
+        return result / 1000
+
+    async def adjust(self, key: str, tokens: int, window: int) -> None:
+        if window != current_window():
+            return
+        *_, script = self._connection()
+        await script(keys=[self._keys(key, window)[1]], args=[tokens])
+
+    async def block(self, key: str, seconds: float) -> None:
+        block_key = self._keys(key, 0)[2]
+        ms = max(1, int(seconds * 1000))
+        # Keep the longer of an existing block and the new one.
+        if ms > int(await self._redis.pttl(block_key)):
+            await self._redis.set(block_key, 1, px=ms)
+
+
+# --- Adaptive concurrency ---
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests with priority-ordered waiters.
+
+    The limit grows by ``1/limit`` per success (about one slot per round of
+    requests) and is halved on overload, at most once per ``cooldown``
+    seconds so a burst of 429s from one round only counts once.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, cooldown: float = 1.0) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._last_decrease = float("-inf")
+
+    async def acquire(self, priority: Priority) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (_LANE_RANK[priority], next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # slot was handed over just before cancellation
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_overload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.limit = max(float(self.minimum), self.limit / 2)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+# --- Scheduler ---
+
+
+class LLMScheduler:
+    """Gate provider calls behind rate budgets and adaptive concurrency."""
+
+    def __init__(self, budget: RateBudget) -> None:
+        self.budget = budget
+        self.rate_limits = parse_rate_limits(settings.llm_rate_limits)
+        self._limiters: dict[tuple[str, str], AdaptiveConcurrency] = {}
+
+    def limiter(self, provider: str, model: str) -> AdaptiveConcurrency:
+        key = (provider, model)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = AdaptiveConcurrency(
+                settings.llm_concurrency_initial,
+                settings.llm_concurrency_min,
+                settings.llm_concurrency_max,
+            )
+        return limiter
+
+    def _limits(self, provider: str, model: str, priority: Priority) -> tuple[int, int]:
+        rpm, tpm = self.rate_limits.get((provider, model), (0, 0))
+        if priority == "batch":
+            share = settings.llm_batch_lane_share
+            rpm, tpm = (
+                max(1, int(rpm * share)) if rpm else 0,
+                max(1, int(tpm * share)) if tpm else 0,
+            )
+        return rpm, tpm
+
+    async def _reserve(self, provider: str, model: str, tokens: int, priority: Priority) -> int:
+        """Wait for budget; return the window it was reserved in."""
+        key = f"{provider}:{model}"
+        rpm, tpm = self._limits(provider, model, priority)
+        while True:
+            window = current_window()
+            delay = await self.budget.reserve(key, rpm, tpm, tokens)
+            if delay <= 0:
+                return window
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(
+        self, provider: str, model: str, tokens: int, priority: Priority | None = None
+    ) -> AsyncIterator[int]:
+        """Hold rate budget and a concurrency slot for one call (no retries).
+
+        Used directly for streamed completions; a rate-limit error raised in
+        the block shrinks the concurrency limit and blocks the provider/model
+        for the Retry-After delay before propagating. Yields the budget
+        window the call was reserved in.
+        """
+        priority = priority or _priority.get()
+        limiter = self.limiter(provider, model)
+        start = time.perf_counter()
+        window = await self._reserve(provider, model, tokens, priority)
+        await limiter.acquire(priority)
+        LLM_SCHEDULER_WAIT_SECONDS.labels(provider, model, priority).observe(
+            time.perf_counter() - start
+        )
+        try:
+            yield window
+        except Exception as exc:
+            delay = rate_limit_delay(exc)
+            if delay is not None:
+                limiter.on_overload()
+                LLM_RATE_LIMITED.labels(provider, model).inc()
+                await self.budget.block(f"{provider}:{model}", delay)
+            raise
+        else:
+            limiter.on_success()
+        finally:
+            limiter.release()
+            LLM_CONCURRENCY_LIMIT.labels(provider, model).set(limiter.limit)
+
+    async def run(
+        self,
+        provider: str,
+        model: str,
+        tokens: int,
+        call: Callable[[], Awaitable[tuple[T, int]]],
+        priority: Priority | None = None,
+    ) -> T:
+        """Run ``call`` once budget and a concurrency slot are available.
+
+        ``tokens`` is the estimated prompt + completion size; ``call`` returns
+        its result together with the tokens actually used (0 if unknown), which
+        corrects the budget. Rate-limited calls are retried after the
+        provider's Retry-After delay, up to ``LLM_RATE_LIMIT_RETRIES`` times,
+        and other transient errors with exponential backoff, up to
+        ``LLM_MAX_RETRIES`` times.
+        """
+        rate_limited = failed = 0
+        while True:
+            try:
+                async with self.slot(provider, model, tokens, priority) as window:
+                    result, used = await call()
+            except Exception as exc:
+                delay = rate_limit_delay(exc)
+                if delay is not None:
+                    rate_limited += 1
+                    if rate_limited > settings.llm_rate_limit_retries:
+                        raise
+                    logger.warning(
+                        "%s/%s rate limited; retrying in %.1fs (attempt %d)",
+                        provider,
+                        model,
+                        delay,
+                        rate_limited,
+                    )
+                    continue  # slot() blocked the budget, so the next reserve waits
+                failed += 1
+                if not is_retryable(exc) or failed > settings.llm_max_retries:
+                    raise
+                delay = _RETRY_BACKOFF * 2 ** (failed - 1)
+                logger.warning(
+                    "%s/%s failed (%r); retrying in %.1fs (attempt %d)",
+                    provider,
+                    model,
+                    exc,
+                    delay,
+                    failed,
+                )
+                await asyncio.sleep(delay)
+                continue
+            if used:
+                await self.budget.adjust(f"{provider}:{model}", used - tokens, window)
+            return result
+
+
+_scheduler: LLMScheduler | None = None
+_scheduler_backend: str = ""
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler for the configured backend."""
+    global _scheduler, _scheduler_backend
+    backend = settings.llm_scheduler_backend
+    if _scheduler is not None and _scheduler_backend == backend:
+        return _scheduler
+
+    if backend == "local":
+        budget: RateBudget = LocalRateBudget()
+    elif backend == "redis":
+        budget = RedisRateBudget(settings.llm_scheduler_redis_url or settings.redis_url)
+    else:
+        raise ValueError(f"Unsupported LLM scheduler backend: {backend}")
+    _scheduler = LLMScheduler(budget)
+    _scheduler_backend = backend
+    return _scheduler
@@ -0,0 +1,381 @@
+"""Per-call LLM usage ledger: tokens, latency and estimated cost by stage.
+
+Every completed provider call appends a :class:`UsageRecord` with its token
+counts (prompt, completion, prompt-cache reads/writes), latency, model and
+the **stage** that made it — ``extraction``, ``translation``, ``chat`` —
+taken from :func:`llm_stage` (``llm_complete``/``llm_stream`` also accept
+``stage=``). Calls outside any stage are recorded as ``other``.
+
+Cost is estimated from ``LLM_PRICES`` (``"model=input/output[/cached_input]"``
+in USD per million tokens); prompt-cache writes are billed as regular input.
+
+Records go to the backend selected with ``LLM_USAGE_BACKEND``:
+
+- ``memory`` — the last ``LLM_USAGE_MAX_RECORDS`` calls of this process
+- ``sqlite`` — a local file shared by the API and workers on one host,
+  pruned after ``LLM_USAGE_RETENTION_DAYS``
+- empty — disabled (stage metrics are still exported)
+"""
+
+import asyncio
+import functools
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import LLM_COST, LLM_STAGE_SECONDS, LLM_STAGE_TOKENS
+
+logger = logging.getLogger(__name__)
+
+GROUP_FIELDS = ("stage", "provider", "model")
+_TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "cache_read_tokens", "cache_write_tokens")
+_PRUNE_EVERY = 1000
+
+_stage: ContextVar[str] = ContextVar("llm_stage", default="other")
+
+
+@contextmanager
+def llm_stage(stage: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to ``stage``."""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def current_stage() -> str:
+    """Return the stage LLM calls from the calling context are attributed to."""
+    return _stage.get()
+
+
+@dataclass(frozen=True)
+class Price:
+    """USD per million tokens."""
+
+    input: float
+    output: float
+    cached_input: float
+
+
+@functools.lru_cache(maxsize=8)
+def parse_prices(spec: str) -> dict[str, Price]:
+    """Parse ``"model=input/output[/cached_input],..."`` into ``{model: Price}``.
+
+    Without a cached-input price, cache reads are billed at the input price.
+
+    Raises:
+        ValueError: If an entry is malformed.
+    """
+    prices: dict[str, Price] = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            model, rates = entry.split("=")
+            values = [float(v) for v in rates.split("/")]
+            if len(values) not in (2, 3):
+                raise ValueError
+            cached = values[2] if len(values) == 3 else values[0]
+            prices[model.strip()] = Price(values[0], values[1], cached)
+        except ValueError:
+            raise ValueError(
+                f"Invalid LLM_PRICES entry {entry!r}; expected model=input/output[/cached_input]"
+            ) from None
+    return prices
+
+
+@dataclass
+class UsageRecord:
+    """One completed LLM call."""
+
+    provider: str
+    model: str
+    stage: str
+    prompt_tokens: int  # All input tokens, including cached ones
+    completion_tokens: int
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    latency_ms: float = 0.0
+    cost_usd: float = 0.0
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class UsageSummary:
+    """Usage aggregated over the records sharing the same ``group`` values."""
+
+    group: dict[str, str]
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost_usd: float = 0.0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.total_latency_ms / self.calls if self.calls else 0.0
+
+
+def estimate_cost(model: str, prompt: int, completion: int, cache_read: int) -> float:
+    """Return the estimated USD cost of a call, or 0.0 if ``model`` has no price."""
+    price = parse_prices(settings.llm_prices).get(model)
+    if price is None:
+        return 0.0
+    uncached = prompt - cache_read
+    return (
+        uncached * price.input + cache_read * price.cached_input + completion * price.output
+    ) / 1e6
+
+
+def _check_group_by(group_by: Sequence[str]) -> None:
+    unknown = set(group_by) - set(GROUP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported usage grouping: {', '.join(sorted(unknown))}")
+
+
+def aggregate(records: Iterable[UsageRecord], group_by: Sequence[str]) -> list[UsageSummary]:
+    """Sum ``records`` per distinct combination of the ``group_by`` fields."""
+    _check_group_by(group_by)
+    groups: dict[tuple[str, ...], UsageSummary] = {}
+    for record in records:
+        values = tuple(getattr(record, name) for name in group_by)
+        summary = groups.get(values)
+        if summary is None:
+            summary = groups[values] = UsageSummary(dict(zip(group_by, values, strict=True)))
+        summary.calls += 1
+        for name in _TOKEN_FIELDS:
+            setattr(summary, name, getattr(summary, name) + getattr(record, name))
+        summary.cost_usd += record.cost_usd
+        summary.total_latency_ms += record.latency_ms
+        summary.max_latency_ms = max(summary.max_latency_ms, record.latency_ms)
+    return sorted(groups.values(), key=lambda s: s.cost_usd, reverse=True)
+
+
+class UsageLedger(ABC):
+    """Backend interface for the usage ledger."""
+
+    @abstractmethod
+    async def record(self, record: UsageRecord) -> None:
+        """Append one call."""
+        ...
+
+    @abstractmethod
+    async def summary(self, since: float, group_by: Sequence[str]) -> list[UsageSummary]:
+        """Aggregate calls made at or after ``since`` (epoch seconds), costliest first.
+
+        Raises:
+            ValueError: If ``group_by`` names a field outside :data:`GROUP_FIELDS`.
+        """
+        ...
+
+    @abstractmethod
+    async def recent(self, limit: int) -> list[UsageRecord]:
+        """Return the latest ``limit`` calls, newest first."""
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every record."""
+        ...
+
+
+class MemoryUsageLedger(UsageLedger):
+    """Ring buffer of this process's most recent calls."""
+
+    def __init__(self, max_records: int) -> None:
+        self._records: deque[UsageRecord] = deque(maxlen=max_records)
+
+    async def record(self, record: UsageRecord) -> None:
+        self._records.append(record)
+
+    async def summary(self, since: float, group_by: Sequence[str]) -> list[UsageSummary]:
+        return aggregate((r for r in self._records if r.created_at >= since), group_by)
+
+    async def recent(self, limit: int) -> list[UsageRecord]:
+        return list(reversed(self._records))[:limit]
+
+    async def clear(self) -> None:
+        self._records.clear()
+
+
+class SQLiteUsageLedger(UsageLedger):
+    """Ledger stored in a local SQLite file (WAL mode, safe across processes)."""
+
+    _COLUMNS = (
+        "created_at",
+        "provider",
+        "model",
+        "stage",
+        *_TOKEN_FIELDS,
+        "latency_ms",
+        "cost_usd",
+    )
+
+    def __init__(self, path: str | Path, retention_days: float) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_days * 86400
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_usage ("
+            " created_at REAL NOT NULL, provider TEXT NOT NULL, model TEXT NOT NULL,"
+            " stage TEXT NOT NULL, prompt_tokens INTEGER NOT NULL,"
+            " completion_tokens INTEGER NOT NULL, cache_read_tokens INTEGER NOT NULL,"
+            " cache_write_tokens INTEGER NOT NULL, latency_ms REAL NOT NULL,"
+            " cost_usd REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_usage_created ON llm_usage (created_at)"
+        )
+
+    def _record(self, record: UsageRecord) -> None:
+        values = asdict(record)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO llm_usage ({', '.join(self._COLUMNS)})"
+                f" VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                [values[c] for c in self._COLUMNS],
+            )
+            self._inserts += 1
+            if self._inserts % _PRUNE_EVERY == 0:
+                cutoff = time.time() - self.retention_seconds
+                self._conn.execute("DELETE FROM llm_usage WHERE created_at < ?", (cutoff,))
+
+    def _summary(self, since: float, group_by: Sequence[str]) -> list[UsageSummary]:
+        _check_group_by(group_by)  # also keeps the column names below safe to interpolate
+        keys = ", ".join(group_by)
+        sums = ", ".join(f"SUM({name})" for name in _TOKEN_FIELDS)
+        query = (
+            f"SELECT {keys + ', ' if keys else ''}COUNT(*), {sums},"
+            " SUM(cost_usd), SUM(latency_ms), MAX(latency_ms)"
+            " FROM llm_usage WHERE created_at >= ?"
+            f"{' GROUP BY ' + keys if keys else ''} ORDER BY SUM(cost_usd) DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, (since,)).fetchall()
+        summaries: list[UsageSummary] = []
+        for row in rows:
+            group = dict(zip(group_by, row[: len(group_by)], strict=True))
+            calls, prompt, completion, cache_read, cache_write, cost, total, peak = row[
+                len(group_by) :
+            ]
+            if not calls:
+                continue
+            summaries.append(
+                UsageSummary(
+                    group, calls, prompt, completion, cache_read, cache_write, cost, total, peak
+                )
+            )
+        return summaries
+
+    def _recent(self, limit: int) -> list[UsageRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM llm_usage"
+                " ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [UsageRecord(**dict(zip(self._COLUMNS, row, strict=True))) for row in rows]
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_usage")
+
+    async def record(self, record: UsageRecord) -> None:
+        await asyncio.to_thread(self._record, record)
+
+    async def summary(self, since: float, group_by: Sequence[str]) -> list[UsageSummary]:
+        return await asyncio.to_thread(self._summary, since, group_by)
+
+    async def recent(self, limit: int) -> list[UsageRecord]:
+        return await asyncio.to_thread(self._recent, limit)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+
+_ledger: UsageLedger | None = None
+_ledger_backend: str = ""
+
+
+def get_usage_ledger() -> UsageLedger | None:
+    """Return the configured ledger backend, or None when the ledger is disabled."""
+    global _ledger, _ledger_backend
+    backend = settings.llm_usage_backend
+    if not backend:
+        return None
+    if _ledger is not None and _ledger_backend == backend:
+        return _ledger
+
+    if backend == "memory":
+        _ledger = MemoryUsageLedger(settings.llm_usage_max_records)
+    elif backend == "sqlite":
+        _ledger = SQLiteUsageLedger(settings.llm_usage_path, settings.llm_usage_retention_days)
+    else:
+        raise ValueError(f"Unsupported LLM usage backend: {backend}")
+    _ledger_backend = backend
+    return _ledger
+
+
+async def record_usage(
+    provider: str,
+    model: str,
+    seconds: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+    *,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+    stage: str | None = None,
+) -> None:
+    """Export stage metrics for one call and append it to the ledger.
+
+    ``stage`` defaults to :func:`current_stage`. Ledger failures are logged,
+    never raised: accounting must not fail a call.
+    """
+    stage = stage or current_stage()
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, cache_read_tokens)
+    LLM_STAGE_SECONDS.labels(stage).observe(seconds)
+    for kind, count in (
+        ("prompt", prompt_tokens),
+        ("completion", completion_tokens),
+        ("cache_read", cache_read_tokens),
+        ("cache_write", cache_write_tokens),
+    ):
+        LLM_STAGE_TOKENS.labels(stage, kind).inc(count)
+    LLM_COST.labels(provider, model, stage).inc(cost)
+
+    record = UsageRecord(
+        provider,
+        model,
+        stage,
+        prompt_tokens,
+        completion_tokens,
+        cache_read_tokens,
+        cache_write_tokens,
+        latency_ms=seconds * 1000,
+        cost_usd=cost,
+    )
+    try:
+        ledger = get_usage_ledger()
+        if ledger is not None:
+            await ledger.record(record)
+    except Exception:
+        logger.warning("Failed to record LLM usage", exc_info=True)
@@ -0,0 +1,246 @@
+"""Fit paper text into an LLM token budget, keeping the most useful sections.
+
+Instead of cutting the paper after a fixed number of characters (which keeps
+the front matter and drops the conclusions), the text is split into sections
+at recognisable headings and sections are taken in order of value — abstract,
+introduction, conclusion, results, discussion, method, everything else —
+until the budget is spent. References, acknowledgements and appendices are
+never sent. The selected sections are emitted in their original order.
+
+:func:`chunk_sections` instead splits the whole paper (minus references and
+appendices) into token-bounded chunks of consecutive sections, for
+map-reduce extraction that covers every section of a long paper.
+
+Sections come either from :func:`split_sections` on flat text or from the
+structured PDF extractor (``pdf_structure``), which detects headings from
+font information and has already removed running headers and footers.
+"""
+
+import logging
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from daily_ai_papers.services.tokenizer import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# Smallest remainder worth filling with a truncated section.
+_MIN_PARTIAL_TOKENS = 64
+
+# (kind, priority, heading keywords); lower priority is selected first.
+_SECTION_KINDS: list[tuple[str, int, tuple[str, ...]]] = [
+    ("abstract", 0, ("abstract",)),
+    ("introduction", 1, ("introduction",)),
+    ("conclusion", 2, ("conclusion", "concluding", "summary")),
+    ("results", 3, ("result", "experiment", "evaluation", "benchmark")),
+    ("discussion", 4, ("discussion", "analysis", "limitation", "future work")),
+    ("method", 5, ("method", "approach", "model", "architecture", "framework")),
+    ("related", 7, ("related work", "background", "preliminar")),
+    ("references", -1, ("reference", "bibliography")),
+    ("acknowledgments", -1, ("acknowledg",)),
+    ("appendix", -1, ("appendix", "supplementary")),
+]
+_OTHER_PRIORITY = 6
+
+# Optional "1", "1.", "IV." numbering, then a capitalised title on its own line.
+_HEADING_RE = re.compile(r"^(?:(\d+|[IVX]+)\.?\s+)?([A-Z][A-Za-z&,\- ]{1,60})$")
+_MAX_HEADING_WORDS = 6
+_MINOR_WORDS = {"and", "of", "for", "the", "on", "in", "&"}
+
+
+@dataclass
+class Section:
+    heading: str
+    kind: str
+    priority: int
+    text: str
+    page: int = 0  # First page (0-based), when known
+
+
+@dataclass
+class BudgetedText:
+    """Paper text selected to fit a token budget."""
+
+    text: str
+    tokens: int
+    sections: list[str] = field(default_factory=list)  # kinds included, in document order
+    truncated: bool = False  # True if anything was dropped or cut
+
+
+@dataclass
+class Chunk:
+    """Consecutive sections (or parts of one long section) that fit one LLM call."""
+
+    text: str
+    tokens: int
+    sections: list[str] = field(default_factory=list)  # kinds included, in document order
+
+
+def classify_heading(heading: str) -> tuple[str, int]:
+    """Return the (kind, priority) of a section titled ``heading``."""
+    lowered = heading.lower()
+    for kind, priority, keywords in _SECTION_KINDS:
+        if any(keyword in lowered for keyword in keywords):
+            return kind, priority
+    return "other", _OTHER_PRIORITY
+
+
+def detect_heading(line: str, *, emphasized: bool = False) -> tuple[str, int] | None:
+    """Return (kind, priority) if ``line`` looks like a section heading.
+
+    Numbered lines ("3 Model Architecture") are headings whatever their
+    title; unnumbered ones must be in title case and start with a known
+    section name, which keeps wrapped body lines from being mistaken for
+    headings. For ``emphasized`` lines (set in a larger or bold font) title
+    case is enough, since the font already sets them apart from body text.
+    """
+    match = _HEADING_RE.match(line.strip())
+    if match is None:
+        return None
+    number, title = match.groups()
+    if len(title.split()) > _MAX_HEADING_WORDS:
+        return None
+    kind, priority = classify_heading(title)
+    if number is None:
+        if not all(w[0].isupper() or w in _MINOR_WORDS for w in title.split()):
+            return None
+        if emphasized:
+            return kind, priority
+        lowered = title.lower()
+        starts_with_name = any(
+            lowered.startswith(keyword)
+            for name, _, keywords in _SECTION_KINDS
+            if name == kind
+            for keyword in keywords
+        )
+        if not starts_with_name:
+            return None
+    return kind, priority
+
+
+def split_sections(text: str) -> list[Section]:
+    """Split paper text at detected section headings.
+
+    Text before the first heading (title, authors and often an unlabelled
+    abstract) becomes a ``front`` section ranked like the abstract.
+    """
+    sections: list[Section] = []
+    current = Section("", "front", 0, "")
+    lines: list[str] = []
+    for line in text.splitlines():
+        detected = detect_heading(line)
+        if detected is None:
+            lines.append(line)
+            continue
+        current.text = "\n".join(lines).strip()
+        if current.text:
+            sections.append(current)
+        current = Section(line.strip(), *detected, text="")
+        lines = [line.strip()]
+    current.text = "\n".join(lines).strip()
+    if current.text:
+        sections.append(current)
+    return sections
+
+
+def _split_long(text: str, max_tokens: int, model: str) -> list[str]:
+    """Split an oversized section at line breaks, cutting single overlong lines."""
+    parts: list[str] = []
+    current: list[str] = []
+    used = 0
+    for line in text.splitlines():
+        while count_tokens(line, model) > max_tokens:
+            head = truncate_to_tokens(line, max_tokens, model)
+            if not head or not line.startswith(head):  # Never drop or repeat text
+                head = line[: max(1, len(head))]
+            parts.append(head)
+            line = line[len(head) :].lstrip()
+        tokens = count_tokens(line, model)
+        if current and used + tokens > max_tokens:
+            parts.append("\n".join(current))
+            current, used = [], 0
+        current.append(line)
+        used += tokens
+    if current:
+        parts.append("\n".join(current))
+    return [p for p in parts if p.strip()]
+
+
+def chunk_sections(text: str | Sequence[Section], max_tokens: int, model: str) -> list[Chunk]:
+    """Split a paper into chunks of at most ``max_tokens`` tokens, in document order.
+
+    Consecutive sections are packed into a chunk while they fit; a section
+    larger than ``max_tokens`` is split at line breaks over several chunks.
+    References, acknowledgements and appendices are left out.
+    """
+    sections = split_sections(text) if isinstance(text, str) else list(text)
+    pieces: list[tuple[str, str, int]] = []  # (kind, text, tokens)
+    for section in sections:
+        if section.priority < 0 or not section.text.strip():
+            continue
+        tokens = count_tokens(section.text, model)
+        if tokens <= max_tokens:
+            pieces.append((section.kind, section.text, tokens))
+        else:
+            for part in _split_long(section.text, max_tokens, model):
+                pieces.append((section.kind, part, count_tokens(part, model)))
+
+    chunks: list[Chunk] = []
+    for kind, piece, tokens in pieces:
+        if chunks and chunks[-1].tokens + tokens <= max_tokens:
+            last = chunks[-1]
+            last.text = f"{last.text}\n\n{piece}"
+            last.tokens += tokens
+            if last.sections[-1] != kind:
+                last.sections.append(kind)
+        else:
+            chunks.append(Chunk(piece, tokens, [kind]))
+    return chunks
+
+
+def fit_to_budget(text: str | Sequence[Section], budget_tokens: int, model: str) -> BudgetedText:
+    """Select the highest-value sections of ``text`` that fit in ``budget_tokens``.
+
+    ``text`` may also be pre-split sections; those are never sent whole, so
+    references and appendices are dropped even when everything would fit.
+    """
+    if isinstance(text, str):
+        total = count_tokens(text, model)
+        if total <= budget_tokens:
+            return BudgetedText(text, total, ["full"], truncated=False)
+        sections = split_sections(text)
+    else:
+        sections = list(text)
+        kept = [s for s in sections if s.priority >= 0]
+        joined = "\n\n".join(s.text for s in kept)
+        total = count_tokens(joined, model)
+        if total <= budget_tokens:
+            dropped = len(kept) < len(sections)
+            return BudgetedText(joined, total, [s.kind for s in kept], truncated=dropped)
+
+    ranked = sorted(
+        (i for i, s in enumerate(sections) if s.priority >= 0),
+        key=lambda i: (sections[i].priority, i),
+    )
+
+    chosen: dict[int, str] = {}
+    remaining = budget_tokens
+    for i in ranked:
+        tokens = count_tokens(sections[i].text, model)
+        if tokens <= remaining:
+            chosen[i] = sections[i].text
+            remaining -= tokens
+        elif remaining >= _MIN_PARTIAL_TOKENS:
+            chosen[i] = truncate_to_tokens(sections[i].text, remaining, model)
+            remaining = 0
+        if remaining < _MIN_PARTIAL_TOKENS:
+            break
+
+    selected = "\n\n".join(chosen[i] for i in sorted(chosen))
+    return BudgetedText(
+        text=selected,
+        tokens=count_tokens(selected, model),
+        sections=[sections[i].kind for i in sorted(chosen)],
+        truncated=True,
+    )
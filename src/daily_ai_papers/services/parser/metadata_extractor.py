@@ -1,18 +1,49 @@
-"""LLM-based metadata extraction from paper text."""
+"""LLM-based metadata extraction from paper text.
 
+Analysis runs in two tiers: :func:`extract_abstract_metadata` fills the
+summary and keywords from the title and abstract alone, with the cheaper
+``LLM_ABSTRACT_MODEL``, so papers are browsable right after the crawl;
+:func:`extract_metadata` analyzes the full text for contributions,
+methodology and results once somebody actually opens the paper.
+
+:func:`extract_abstract_metadata_many` packs many abstracts into each
+request, since for abstracts the instructions and the round trip dominate.
+
+With ``LLM_EXTRACTION_MODE=map_reduce``, papers longer than the context
+budget are not abridged: they are split into chunks that are summarized
+concurrently, and a final call extracts the metadata from the chunk notes.
+The notes are returned with the metadata so callers can store them.
+"""
+
+import asyncio
+import hashlib
+import json
 import logging
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
+from typing import Any
 
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import LLM_CONTEXT_TOKENS, LLM_PACKED_ITEMS
+from daily_ai_papers.services.fingerprint import fingerprint, template_version
 from daily_ai_papers.services.llm_client import llm_complete, parse_json_response
+from daily_ai_papers.services.parser.context_budget import Chunk, chunk_sections, fit_to_budget
+from daily_ai_papers.services.parser.pdf_structure import PaperDocument
 
 logger = logging.getLogger(__name__)
 
-_MAX_TEXT_CHARS = 12_000  # truncate very long papers to stay within context limits
-
 SYSTEM_PROMPT = "You are a research paper analyst. Always respond in valid JSON."
 
+# The paper text is sent as a cacheable context block ahead of the instructions.
+PAPER_CONTEXT = """\
+Paper text (long papers are abridged to their key sections):
+---
+{text}
+---
+"""
+
 EXTRACTION_PROMPT = """\
-Given the following paper text, extract structured metadata.
+Given the paper text above, extract structured metadata.
 
 Return a JSON object with exactly these fields:
 - "summary": A concise 3-5 sentence summary of the paper
@@ -21,14 +52,87 @@ Return a JSON object with exactly these fields:
 - "methodology": A brief description of the approach/method used
 - "results": Key findings or results
 
-Paper text (possibly truncated):
+Respond ONLY with the JSON object, no extra text.
+"""
+
+# Map-reduce: each chunk is summarized into notes, then the notes are reduced.
+CHUNK_CONTEXT = """\
+Part of a research paper:
 ---
 {text}
 ---
+"""
+
+CHUNK_PROMPT = """\
+Summarize the part of the paper above as concise notes for an analyst who
+will read the notes on every part, but not the paper itself. Cover:
+- claims and contributions stated in this part
+- methods, datasets and experimental settings described
+- quantitative results (keep the exact numbers) and conclusions
+
+Write at most 200 words. Do not add anything that is not in the text.
+"""
+
+REDUCE_CONTEXT = """\
+Notes on each part of a research paper, in document order:
+---
+{notes}
+---
+"""
+
+REDUCE_PROMPT = """\
+Given the notes on the paper above, extract structured metadata for the whole paper.
+
+Return a JSON object with exactly these fields:
+- "summary": A concise 3-5 sentence summary of the paper
+- "contributions": A list of the paper's main contributions (2-5 items)
+- "keywords": A list of relevant keywords (5-10 items)
+- "methodology": A brief description of the approach/method used
+- "results": Key findings or results
 
 Respond ONLY with the JSON object, no extra text.
 """
 
+_CHUNK_SUMMARY_TOKENS = 400
+
+ABSTRACT_CONTEXT = """\
+Paper title and abstract:
+---
+{title}
+
+{abstract}
+---
+"""
+
+ABSTRACT_PROMPT = """\
+Given the title and abstract above, extract structured metadata.
+
+Return a JSON object with exactly these fields:
+- "summary": A concise 2-3 sentence summary of the paper
+- "keywords": A list of relevant keywords (5-10 items)
+
+Respond ONLY with the JSON object, no extra text.
+"""
+
+PACKED_ABSTRACT_PROMPT = """\
+Below is a JSON array of papers, each with an "id", a "title" and an "abstract".
+Extract structured metadata for each paper independently.
+
+Return a JSON object with a single field "papers": an array with one object
+per input paper, in any order, with exactly these fields:
+- "id": The paper's "id", copied verbatim
+- "summary": A concise 2-3 sentence summary of the paper
+- "keywords": A list of relevant keywords (5-10 items)
+
+Respond ONLY with the JSON object, no extra text.
+
+Papers:
+{papers}
+"""
+
+# Completion tokens reserved per paper in a packed request.
+_PACKED_TOKENS_PER_PAPER = 300
+
 
 @dataclass
 class ExtractedMetadata:
@@ -37,20 +141,275 @@ class ExtractedMetadata:
     keywords: list[str] = field(default_factory=list)
     methodology: str = ""
     results: str = ""
+    # Map-reduce only: the notes on each chunk, in document order
+    chunk_summaries: list["ChunkSummary"] = field(default_factory=list)
+
 
+@dataclass
+class ChunkSummary:
+    """Notes on one chunk of a paper, reusable while ``fingerprint`` matches."""
+
+    fingerprint: str
+    sections: list[str]  # Section kinds in the chunk
+    summary: str
+
+
+def analysis_fingerprint(text_sha256: str) -> str:
+    """Fingerprint of the ``analyze`` stage for a paper's extracted text.
+
+    Changes with the text, the prompt templates, the model, the context
+    budget and the extraction mode, so editing a prompt or switching models
+    reanalyzes every paper.
+    """
+    return fingerprint(
+        "analyze",
+        text_sha256,
+        template_version(
+            SYSTEM_PROMPT,
+            PAPER_CONTEXT,
+            EXTRACTION_PROMPT,
+            CHUNK_CONTEXT,
+            CHUNK_PROMPT,
+            REDUCE_CONTEXT,
+            REDUCE_PROMPT,
+        ),
+        settings.llm_provider,
+        settings.llm_model,
+        settings.llm_context_budget_tokens,
+        settings.llm_extraction_mode,
+        settings.llm_chunk_tokens,
+    )
+
+
+def chunk_fingerprint(text: str) -> str:
+    """Fingerprint of the notes on one chunk: its text, the prompt and the model."""
+    return fingerprint(
+        "chunk",
+        hashlib.sha256(text.encode()).hexdigest(),
+        template_version(SYSTEM_PROMPT, CHUNK_CONTEXT, CHUNK_PROMPT),
+        settings.llm_provider,
+        settings.llm_model,
+    )
+
+
+def abstract_fingerprint(title: str, abstract: str) -> str:
+    """Fingerprint of the ``abstract`` stage (tier 1) for a paper.
+
+    Covers both the single-paper and the packed prompt, since either may
+    produce a paper's abstract metadata.
+    """
+    return fingerprint(
+        "abstract",
+        title,
+        abstract,
+        template_version(SYSTEM_PROMPT, ABSTRACT_CONTEXT, ABSTRACT_PROMPT, PACKED_ABSTRACT_PROMPT),
+        settings.llm_provider,
+        settings.llm_abstract_model or settings.llm_model,
+    )
+
+
+async def extract_abstract_metadata(title: str, abstract: str) -> ExtractedMetadata:
+    """Extract a summary and keywords from a paper's title and abstract.
+
+    Uses ``LLM_ABSTRACT_MODEL`` (default ``LLM_MODEL``). Contributions,
+    methodology and results are left empty for the full-text pass.
+    """
+    logger.info("Extracting abstract metadata via LLM (%d chars)", len(abstract))
+    raw = await llm_complete(
+        ABSTRACT_PROMPT,
+        system=SYSTEM_PROMPT,
+        model=settings.llm_abstract_model or None,
+        max_tokens=512,
+        response_json=True,
+        context=ABSTRACT_CONTEXT.format(title=title, abstract=abstract),
+        stage="abstract",
+    )
+    data = parse_json_response(raw)
+    return ExtractedMetadata(summary=data.get("summary", ""), keywords=data.get("keywords", []))
+
+
+def _packed_items(raw: str, ids: set[str]) -> dict[str, ExtractedMetadata]:
+    """Validate a packed response, keeping only well-formed items for requested IDs."""
+    try:
+        items = parse_json_response(raw).get("papers")
+    except (ValueError, AttributeError):
+        return {}
+    results: dict[str, ExtractedMetadata] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        paper_id, summary, keywords = item.get("id"), item.get("summary"), item.get("keywords")
+        if (
+            str(paper_id) in ids
+            and str(paper_id) not in results
+            and isinstance(summary, str)
+            and summary.strip()
+            and isinstance(keywords, list)
+            and all(isinstance(k, str) for k in keywords)
+        ):
+            results[str(paper_id)] = ExtractedMetadata(summary=summary, keywords=keywords)
+    return results
+
+
+async def _extract_pack(pack: dict[str, tuple[str, str]]) -> dict[str, ExtractedMetadata]:
+    papers: list[dict[str, Any]] = [
+        {"id": paper_id, "title": title, "abstract": abstract}
+        for paper_id, (title, abstract) in pack.items()
+    ]
+    raw = await llm_complete(
+        PACKED_ABSTRACT_PROMPT.format(papers=json.dumps(papers, ensure_ascii=False, indent=1)),
+        system=SYSTEM_PROMPT,
+        model=settings.llm_abstract_model or None,
+        max_tokens=_PACKED_TOKENS_PER_PAPER * len(pack),
+        response_json=True,
+        stage="abstract",
+    )
+    results = _packed_items(raw, set(pack))
+    LLM_PACKED_ITEMS.labels("abstract", "packed").inc(len(results))
+
+    missing = [paper_id for paper_id in pack if paper_id not in results]
+    if missing:
+        logger.warning(
+            "Packed response covered %d of %d papers; extracting %d individually",
+            len(results),
+            len(pack),
+            len(missing),
+        )
+        LLM_PACKED_ITEMS.labels("abstract", "fallback").inc(len(missing))
+        singles = await asyncio.gather(*(extract_abstract_metadata(*pack[i]) for i in missing))
+        results.update(zip(missing, singles, strict=True))
+    return results
+
+
+async def extract_abstract_metadata_many(
+    papers: Mapping[str, tuple[str, str]], *, pack_size: int | None = None
+) -> dict[str, ExtractedMetadata]:
+    """Extract summaries and keywords for many papers, several per request.
 
-async def extract_metadata(paper_text: str) -> ExtractedMetadata:
-    """Use an LLM to extract structured metadata from paper text."""
-    truncated = paper_text[:_MAX_TEXT_CHARS]
-    prompt = EXTRACTION_PROMPT.format(text=truncated)
+    ``papers`` maps an ID to ``(title, abstract)``. Papers are sent in packs
+    of ``pack_size`` (default ``LLM_ABSTRACT_PACK_SIZE``) as one JSON-mode
+    request each; the packs run concurrently under the LLM scheduler. Items
+    missing from a response, or malformed, are extracted one at a time with
+    :func:`extract_abstract_metadata`; errors of the request itself (after the
+    client's retries) propagate rather than multiplying into per-paper calls.
+    """
+    size = max(1, pack_size or settings.llm_abstract_pack_size)
+    items = list(papers.items())
+    packs = [dict(items[i : i + size]) for i in range(0, len(items), size)]
+    logger.info("Extracting abstract metadata for %d papers in %d packs", len(items), len(packs))
+    results: dict[str, ExtractedMetadata] = {}
+    for pack_results in await asyncio.gather(*(_extract_pack(pack) for pack in packs)):
+        results.update(pack_results)
+    return results
 
+
+async def summarize_chunks(
+    chunks: Sequence[Chunk], cached: Mapping[str, str] | None = None
+) -> list[ChunkSummary]:
+    """Summarize ``chunks`` concurrently (the map step), in document order.
+
+    ``cached`` maps chunk fingerprints to notes from an earlier run; those
+    chunks are not sent again. Concurrency is bounded by the LLM scheduler.
+    """
+    cached = cached or {}
+
+    async def summarize(chunk: Chunk) -> ChunkSummary:
+        key = chunk_fingerprint(chunk.text)
+        if key in cached:
+            return ChunkSummary(key, chunk.sections, cached[key])
+        notes = await llm_complete(
+            CHUNK_PROMPT,
+            system=SYSTEM_PROMPT,
+            max_tokens=_CHUNK_SUMMARY_TOKENS,
+            context=CHUNK_CONTEXT.format(text=chunk.text),
+            stage="extraction_map",
+        )
+        return ChunkSummary(key, chunk.sections, notes.strip())
+
+    return list(await asyncio.gather(*(summarize(chunk) for chunk in chunks)))
+
+
+async def _map_reduce(chunks: list[Chunk], cached: Mapping[str, str] | None) -> ExtractedMetadata:
+    summaries = await summarize_chunks(chunks, cached)
+    notes = "\n\n".join(
+        f"[Part {i} of {len(summaries)}: {', '.join(s.sections)}]\n{s.summary}"
+        for i, s in enumerate(summaries, 1)
+    )
     logger.info(
-        "Extracting metadata via LLM (%d chars input, truncated=%s)",
+        "Reducing notes on %d chunks (%d reused) via LLM",
+        len(summaries),
+        sum(1 for s in summaries if cached and s.fingerprint in cached),
+    )
+    raw = await llm_complete(
+        REDUCE_PROMPT,
+        system=SYSTEM_PROMPT,
+        response_json=True,
+        context=REDUCE_CONTEXT.format(notes=notes),
+        stage="extraction",
+    )
+    data = parse_json_response(raw)
+    return ExtractedMetadata(
+        summary=data.get("summary", ""),
+        contributions=data.get("contributions", []),
+        keywords=data.get("keywords", []),
+        methodology=data.get("methodology", ""),
+        results=data.get("results", ""),
+        chunk_summaries=summaries,
+    )
+
+
+async def extract_metadata(
+    paper: str | PaperDocument,
+    *,
+    budget_tokens: int | None = None,
+    cached_chunks: Mapping[str, str] | None = None,
+) -> ExtractedMetadata:
+    """Use an LLM to extract structured metadata from paper text.
+
+    ``paper`` is flat text or a structured document from ``pdf_structure``;
+    the latter never sends references or appendices. Papers longer than
+    ``budget_tokens`` (default ``LLM_CONTEXT_BUDGET_TOKENS``) are reduced to
+    their highest-value sections first, or with ``LLM_EXTRACTION_MODE=
+    map_reduce`` summarized chunk by chunk (reusing ``cached_chunks``, see
+    :func:`summarize_chunks`) and extracted from the notes.
+    """
+    mode = settings.llm_extraction_mode
+    if mode not in ("budget", "map_reduce"):
+        raise ValueError(f"Unsupported extraction mode: {mode}")
+    budget = budget_tokens or settings.llm_context_budget_tokens
+    source = paper.sections if isinstance(paper, PaperDocument) else paper
+    paper_text = paper.text() if isinstance(paper, PaperDocument) else paper
+
+    if mode == "map_reduce":
+        chunks = chunk_sections(source, settings.llm_chunk_tokens, settings.llm_model)
+        if sum(c.tokens for c in chunks) > budget:
+            LLM_CONTEXT_TOKENS.labels("metadata").observe(sum(c.tokens for c in chunks))
+            logger.info(
+                "Extracting metadata via map-reduce (%d chars input, %d chunks)",
+                len(paper_text),
+                len(chunks),
+            )
+            return await _map_reduce(chunks, cached_chunks)
+
+    context = fit_to_budget(source, budget, settings.llm_model)
+    paper_context = PAPER_CONTEXT.format(text=context.text)
+
+    LLM_CONTEXT_TOKENS.labels("metadata").observe(context.tokens)
+    logger.info(
+        "Extracting metadata via LLM (%d chars input, %d tokens sent, truncated=%s, sections=%s)",
         len(paper_text),
-        len(paper_text) > _MAX_TEXT_CHARS,
+        context.tokens,
+        context.truncated,
+        ",".join(context.sections),
     )
 
-    raw = await llm_complete(prompt, system=SYSTEM_PROMPT, response_json=True)
+    raw = await llm_complete(
+        EXTRACTION_PROMPT,
+        system=SYSTEM_PROMPT,
+        response_json=True,
+        context=paper_context,
+        stage="extraction",
+    )
     data = parse_json_response(raw)
 
     return ExtractedMetadata(
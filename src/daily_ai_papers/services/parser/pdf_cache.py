@@ -0,0 +1,208 @@
+"""Content-addressed on-disk cache for downloaded PDFs.
+
+PDFs are stored once per SHA-256 of their content under
+``PDF_CACHE_DIR/objects/<aa>/<sha256>.pdf``; a SQLite index maps each URL to
+its object together with the ``ETag`` / ``Last-Modified`` validators from
+the response. Lookups within ``PDF_CACHE_REVALIDATE_SECONDS`` of the last
+fetch are served from disk without a request; older entries are revalidated
+with a conditional GET, so an unchanged PDF costs one 304 rather than a
+download. When the objects exceed ``PDF_CACHE_MAX_BYTES`` the least recently
+used are evicted.
+
+The index is a local SQLite file (WAL mode), so processes on one host share
+the cache. Object writes go through a temporary file and an atomic rename,
+so readers never see a partial PDF.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from daily_ai_papers.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Index row for one cached URL."""
+
+    url: str
+    sha256: str
+    size: int
+    etag: str
+    last_modified: str
+    fetched_at: float  # Last download or successful revalidation (epoch seconds)
+
+
+class ObjectWriter:
+    """Stream a download into the cache, hashing it as it is written.
+
+    Use as a context manager; :meth:`commit` moves the completed file into
+    place. Anything not committed is deleted on exit.
+    """
+
+    def __init__(self, cache: "PDFCache") -> None:
+        self._cache = cache
+        self._hash = hashlib.sha256()
+        self.size = 0
+        fd, name = tempfile.mkstemp(suffix=".part", dir=cache.tmp_dir)
+        self._tmp = Path(name)
+        self._file: IO[bytes] = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> tuple[str, Path]:
+        """Finish the write; return the content hash and its object path."""
+        self._file.close()
+        sha256 = self._hash.hexdigest()
+        target = self._cache.object_path(sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self._tmp, target)
+        return sha256, target
+
+    def __enter__(self) -> "ObjectWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class PDFCache:
+    """URL → content-addressed PDF store with validators and an LRU byte budget."""
+
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.root / "index.sqlite3", check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pdf_cache ("
+            " url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER NOT NULL,"
+            " etag TEXT NOT NULL, last_modified TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_pdf_cache_sha ON pdf_cache (sha256)")
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / "objects" / sha256[:2] / f"{sha256}.pdf"
+
+    def writer(self) -> ObjectWriter:
+        return ObjectWriter(self)
+
+    def _lookup(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, sha256, size, etag, last_modified, fetched_at"
+                " FROM pdf_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            entry = CacheEntry(*row)
+            if not self.object_path(entry.sha256).exists():
+                # Evicted by another process or removed by hand: treat as a miss.
+                self._conn.execute("DELETE FROM pdf_cache WHERE url = ?", (url,))
+                return None
+            self._conn.execute(
+                "UPDATE pdf_cache SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return entry
+
+    def _touch(self, url: str) -> None:
+        """Record a successful revalidation (304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pdf_cache SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def _store(self, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pdf_cache"
+                " (url, sha256, size, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.url,
+                    entry.sha256,
+                    entry.size,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.fetched_at,
+                    entry.fetched_at,
+                ),
+            )
+            self._evict(keep=entry.sha256)
+
+    def _evict(self, keep: str) -> None:
+        """Delete least recently used objects until the store fits ``max_bytes``."""
+        rows = self._conn.execute(
+            "SELECT sha256, MAX(size), MAX(accessed_at) AS last FROM pdf_cache"
+            " GROUP BY sha256 ORDER BY last"
+        ).fetchall()
+        total = sum(size for _, size, _ in rows)
+        for sha256, size, _ in rows:
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            self._conn.execute("DELETE FROM pdf_cache WHERE sha256 = ?", (sha256,))
+            self.object_path(sha256).unlink(missing_ok=True)
+            total -= size
+            logger.debug("Evicted cached PDF %s (%d bytes)", sha256, size)
+
+    def _total_bytes(self) -> int:
+        with self._lock:
+            rows = self._conn.execute("SELECT MAX(size) FROM pdf_cache GROUP BY sha256").fetchall()
+        return sum(size for (size,) in rows)
+
+    async def lookup(self, url: str) -> CacheEntry | None:
+        """Return the index entry for ``url`` if its object is on disk."""
+        return await asyncio.to_thread(self._lookup, url)
+
+    async def touch(self, url: str) -> None:
+        await asyncio.to_thread(self._touch, url)
+
+    async def store(self, entry: CacheEntry) -> None:
+        """Index a committed object and evict over-budget objects."""
+        await asyncio.to_thread(self._store, entry)
+
+    async def total_bytes(self) -> int:
+        return await asyncio.to_thread(self._total_bytes)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True if ``entry`` may be used without revalidating."""
+        return time.time() - entry.fetched_at < settings.pdf_cache_revalidate_seconds
+
+
+_cache: PDFCache | None = None
+
+
+def get_pdf_cache() -> PDFCache:
+    """Return the process-wide PDF cache for ``PDF_CACHE_DIR``."""
+    global _cache
+    root = Path(settings.pdf_cache_dir)
+    if _cache is None or _cache.root != root:
+        _cache = PDFCache(root, settings.pdf_cache_max_bytes)
+    _cache.max_bytes = settings.pdf_cache_max_bytes
+    return _cache
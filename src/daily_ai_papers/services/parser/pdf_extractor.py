@@ -1,36 +1,142 @@
 """PDF download and text extraction."""
 
 import logging
-import tempfile
+import mmap
+import os
+import time
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
 
 import httpx
 
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import PDF_CACHE_REQUESTS, PDF_DOWNLOAD_BYTES, PDF_DOWNLOAD_SECONDS
+from daily_ai_papers.services.parser.pdf_cache import CacheEntry, get_pdf_cache
+
 logger = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 64 * 1024
+
+# A file path, or PDF bytes already in memory.
+PDFSource = str | Path | bytes | bytearray | memoryview
+
 
 async def download_pdf(url: str) -> Path:
-    """Download a PDF from a URL to a temporary file."""
-    async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
-        response = await client.get(url)
-        response.raise_for_status()
+    """Download a PDF through the on-disk cache and return its cached path.
+
+    The body is streamed to disk in chunks and hashed on the way, so memory
+    use is flat regardless of size; downloads over ``PDF_MAX_BYTES`` are
+    aborted with ``ValueError``. A cached copy is returned without a request
+    while fresh, and revalidated with ``ETag`` / ``Last-Modified`` after
+    that. The returned file belongs to the cache: read it, don't delete it.
+    """
+    cache = get_pdf_cache()
+    entry = await cache.lookup(url)
+    if entry is not None and cache.is_fresh(entry):
+        PDF_CACHE_REQUESTS.labels(result="hit").inc()
+        return cache.object_path(entry.sha256)
+
+    headers: dict[str, str] = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    limit = settings.pdf_max_bytes
+    with PDF_DOWNLOAD_SECONDS.time():
+        async with (
+            httpx.AsyncClient(timeout=60, follow_redirects=True) as client,
+            client.stream("GET", url, headers=headers) as response,
+        ):
+            if entry is not None and response.status_code == 304:
+                await cache.touch(url)
+                PDF_CACHE_REQUESTS.labels(result="revalidated").inc()
+                return cache.object_path(entry.sha256)
+            response.raise_for_status()
+
+            declared = int(response.headers.get("Content-Length") or 0)
+            if declared > limit:
+                raise ValueError(f"PDF exceeds {limit} bytes: {url} ({declared} bytes)")
+            with cache.writer() as writer:
+                async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                    writer.write(chunk)
+                    if writer.size > limit:
+                        raise ValueError(f"PDF exceeds {limit} bytes: {url}")
+                sha256, path = writer.commit()
 
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        tmp.write(response.content)
-    return Path(tmp.name)
+    PDF_CACHE_REQUESTS.labels(result="miss").inc()
+    PDF_DOWNLOAD_BYTES.observe(writer.size)
+    await cache.store(
+        CacheEntry(
+            url=url,
+            sha256=sha256,
+            size=writer.size,
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+            fetched_at=time.time(),
+        )
+    )
+    return path
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extract full text from a PDF file using PyMuPDF."""
+@contextmanager
+def open_pdf(source: PDFSource) -> Iterator[Any]:
+    """Open a PDF from a path or an in-memory buffer as a PyMuPDF document.
+
+    Buffers are handed to PyMuPDF as they are. Files are memory-mapped
+    rather than read, so the page cache backs the document and large cached
+    PDFs are not copied into the process.
+    """
     import fitz  # PyMuPDF — lazy import to keep download_pdf usable without it
 
-    doc = fitz.open(str(pdf_path))
-    text_parts: list[str] = []
+    if isinstance(source, bytes | bytearray | memoryview):
+        with fitz.open(stream=source, filetype="pdf") as doc:
+            yield doc
+        return
+
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Empty PDF file: {source}")
+        with (
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+            memoryview(mapped) as view,
+            fitz.open(stream=view, filetype="pdf") as doc,
+        ):
+            yield doc
+
+
+def iter_pages(source: PDFSource) -> Generator[str, None, None]:
+    """Yield the text of each page, reading a page only when it is requested.
+
+    Closing the generator early (or breaking out of the loop) closes the
+    document without touching the remaining pages.
+    """
+    with open_pdf(source) as doc:
+        for page in doc:
+            yield page.get_text()
+
 
-    for page in doc:
-        text_parts.append(page.get_text())
+def extract_text_from_pdf(source: PDFSource, *, max_chars: int | None = None) -> str:
+    """Extract text from a PDF file or in-memory PDF bytes using PyMuPDF.
 
-    doc.close()
-    full_text = "\n".join(text_parts)
-    logger.info("Extracted %d characters from %s", len(full_text), pdf_path.name)
+    With ``max_chars``, pages are read only until that much text is
+    collected; the last page read is kept whole.
+    """
+    parts: list[str] = []
+    chars = 0
+    pages = iter_pages(source)
+    try:
+        for text in pages:
+            parts.append(text)
+            chars += len(text) + 1
+            if max_chars is not None and chars > max_chars:
+                break
+    finally:
+        pages.close()
+    full_text = "\n".join(parts)
+    name = Path(source).name if isinstance(source, str | Path) else "memory"
+    logger.info("Extracted %d characters from %s", len(full_text), name)
     return full_text
@@ -0,0 +1,315 @@
+"""Process-pool PDF text extraction.
+
+PyMuPDF text extraction is CPU-bound and holds the GIL, so running it on the
+event loop (or in a thread) stalls every other coroutine in the process.
+:func:`extract_text` and :func:`extract_document` (structured, see
+``pdf_structure``) run it in a pool of worker processes instead:
+
+- the pool has ``PDF_WORKERS`` processes (default: one per core), and each
+  is replaced after ``PDF_WORKER_MAX_TASKS`` tasks so leaked memory from
+  malformed documents doesn't accumulate;
+- documents with at least ``PDF_PARALLEL_MIN_PAGES`` pages are split into
+  page ranges extracted by several workers at once;
+- each document has a ``PDF_EXTRACT_TIMEOUT`` deadline (``TimeoutError``),
+  checked by an alarm in the worker and enforced by the parent, which kills
+  the workers if a call into MuPDF doesn't return in time;
+- each worker has a data-segment limit of ``PDF_WORKER_MAX_MEMORY_MB``
+  (``MemoryError``). Memory-mapped PDFs don't count towards it.
+
+Settings are read in the parent and passed to the workers explicitly, since
+spawned workers don't see runtime changes to ``settings``.
+
+Daemonic processes can't start children, and Celery's default prefork pool
+runs tasks in daemonic processes, so there extraction falls back to a
+thread of the calling process (without the pool's memory limit).
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable, Collection, Iterator
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Any, TypeVar
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import PDF_PAGES
+from daily_ai_papers.services.parser.pdf_extractor import download_pdf, open_pdf
+from daily_ai_papers.services.parser.pdf_structure import (
+    PARTIAL_SAMPLE_PAGES,
+    PARTIAL_STOP_KINDS,
+    PaperDocument,
+    build_document,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MIN_CHUNK_PAGES = 8
+# How long the parent waits past the deadline for the worker's own alarm.
+_DEADLINE_GRACE = 1.0
+
+
+def _init_worker(max_memory_mb: int) -> None:
+    """Apply the per-worker memory limit (POSIX only).
+
+    RLIMIT_DATA (heap and private mappings, Linux 4.7+) rather than
+    RLIMIT_AS, so the read-only mapping of a large PDF doesn't count.
+    """
+    if max_memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return
+    limit = max_memory_mb * 1024 * 1024
+    which = getattr(resource, "RLIMIT_DATA", resource.RLIMIT_AS)
+    resource.setrlimit(which, (limit, limit))
+
+
+def _on_deadline(signum: int, frame: FrameType | None) -> None:
+    raise TimeoutError("PDF extraction deadline exceeded")
+
+
+@contextmanager
+def _deadline(deadline: float) -> Iterator[None]:
+    """Raise ``TimeoutError`` in this worker if ``deadline`` passes."""
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise TimeoutError("PDF extraction deadline exceeded")
+    # Signal handlers can only be installed in the main thread (not in the
+    # thread fallback for daemonic processes).
+    use_alarm = (
+        hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_deadline)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        yield
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _extract_pages(
+    path: str, start: int, stop: int | None, deadline: float, parallel_min_pages: int
+) -> tuple[int, str | None]:
+    """Worker: extract pages ``start:stop`` of ``path`` before ``deadline``.
+
+    With ``stop=None`` the whole document is extracted unless it has at least
+    ``parallel_min_pages`` pages, in which case only the page count is
+    returned so the parent can fan the document out.
+    """
+    with _deadline(deadline), open_pdf(path) as doc:
+        page_count = doc.page_count
+        if stop is None:
+            if parallel_min_pages and page_count >= parallel_min_pages:
+                return page_count, None
+            stop = page_count
+        return page_count, "\n".join(doc[i].get_text() for i in range(start, stop))
+
+
+def _extract_document(path: str, deadline: float, options: dict[str, Any]) -> PaperDocument:
+    """Worker: build the structured document for ``path`` before ``deadline``."""
+    with _deadline(deadline), open_pdf(path) as doc:
+        return build_document(doc, **options)
+
+
+class PDFExtractionPool:
+    """Async front end to a process pool of PDF text extractors."""
+
+    def __init__(self, workers: int, max_tasks_per_worker: int, max_memory_mb: int) -> None:
+        self.workers = workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_memory_mb = max_memory_mb
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                max_tasks_per_child=self.max_tasks_per_worker or None,
+                initializer=_init_worker,
+                initargs=(self.max_memory_mb,),
+            )
+        return self._executor
+
+    async def _submit(self, deadline: float, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in a worker, which must finish by ``deadline``.
+
+        ``fn`` arms its own alarm for ``deadline`` (:func:`_deadline`), but
+        that can't interrupt a long call into MuPDF, so if the result is
+        still late the parent kills the workers and starts a fresh pool.
+        """
+        timeout = max(0.0, deadline - time.time()) + _DEADLINE_GRACE
+        if multiprocessing.current_process().daemon:
+            # A thread can't be killed; it runs on, but the caller stops waiting.
+            return await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        future = loop.run_in_executor(executor, fn, *args)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            if not future.cancelled():  # Not the worker's own TimeoutError
+                raise
+            logger.warning("PDF extraction worker missed its deadline; killing the pool")
+            self._discard(executor, kill=True)
+            raise TimeoutError("PDF extraction deadline exceeded") from None
+        except BrokenProcessPool:
+            # A worker died (crash, OOM or _discard); start a fresh pool for later calls.
+            logger.warning("PDF extraction worker died; restarting the pool")
+            self._discard(executor)
+            raise
+
+    async def _run(
+        self, path: Path, start: int, stop: int | None, deadline: float
+    ) -> tuple[int, str | None]:
+        min_pages = settings.pdf_parallel_min_pages
+        return await self._submit(
+            deadline, _extract_pages, str(path), start, stop, deadline, min_pages
+        )
+
+    async def extract_text(self, path: Path) -> str:
+        """Extract the full text of the PDF at ``path`` in the pool."""
+        deadline = time.time() + settings.pdf_extract_timeout
+        page_count, text = await self._run(path, 0, None, deadline)
+        if text is None:
+            chunk = max(_MIN_CHUNK_PAGES, math.ceil(page_count / self.workers))
+            parts = await asyncio.gather(
+                *(
+                    self._run(path, start, min(start + chunk, page_count), deadline)
+                    for start in range(0, page_count, chunk)
+                )
+            )
+            text = "\n".join(part or "" for _, part in parts)
+        logger.info("Extracted %d characters from %s (%d pages)", len(text), path.name, page_count)
+        return text
+
+    async def extract_document(self, path: Path) -> PaperDocument:
+        """Extract the PDF at ``path`` into typed sections in the pool.
+
+        Running-head detection needs every page, so documents are not split.
+        """
+        deadline = time.time() + settings.pdf_extract_timeout
+        return await self._submit(deadline, _extract_document, str(path), deadline, {})
+
+    async def extract_partial(
+        self,
+        path: Path,
+        *,
+        stop_at: Collection[str] = PARTIAL_STOP_KINDS,
+        max_chars: int | None = None,
+        max_tokens: int | None = None,
+    ) -> PaperDocument:
+        """Extract sections of the PDF at ``path`` up to a stop section or budget.
+
+        See :func:`pdf_structure.extract_partial`; pages past the stop point
+        are never read.
+        """
+        deadline = time.time() + settings.pdf_extract_timeout
+        options = {
+            "sample_pages": PARTIAL_SAMPLE_PAGES,
+            "stop_at": tuple(stop_at),
+            "max_chars": max_chars,
+            "max_tokens": max_tokens,
+            "model": settings.llm_model,
+        }
+        document = await self._submit(deadline, _extract_document, str(path), deadline, options)
+        PDF_PAGES.labels(result="read").inc(document.pages_read)
+        PDF_PAGES.labels(result="skipped").inc(document.page_count - document.pages_read)
+        return document
+
+    def _discard(
+        self, executor: concurrent.futures.ProcessPoolExecutor, kill: bool = False
+    ) -> None:
+        """Shut down ``executor`` (killing its workers if asked) if it is still the pool.
+
+        Other calls on a killed pool fail with ``BrokenProcessPool`` and come
+        here too, possibly after a later call has started a fresh pool; that
+        one is left alone.
+        """
+        if executor is not self._executor:
+            return
+        self._executor = None
+        # ProcessPoolExecutor has no public handle on its workers. Reading
+        # _processes is deliberate; test_parent_kills_workers_past_deadline
+        # covers it.
+        processes = list((executor._processes or {}).values()) if kill else []
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_pool: PDFExtractionPool | None = None
+
+
+def get_pdf_pool() -> PDFExtractionPool:
+    """Return the process-wide extraction pool, sized from the current settings."""
+    global _pool
+    config = (
+        settings.pdf_workers or os.cpu_count() or 1,
+        settings.pdf_worker_max_tasks,
+        settings.pdf_worker_max_memory_mb,
+    )
+    if _pool is None or (_pool.workers, _pool.max_tasks_per_worker, _pool.max_memory_mb) != config:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = PDFExtractionPool(*config)
+    return _pool
+
+
+async def extract_text(pdf_path: Path) -> str:
+    """Extract the full text of a PDF without blocking the event loop."""
+    return await get_pdf_pool().extract_text(pdf_path)
+
+
+async def extract_document(pdf_path: Path) -> PaperDocument:
+    """Extract a PDF into typed sections without blocking the event loop."""
+    return await get_pdf_pool().extract_document(pdf_path)
+
+
+async def extract_partial(
+    pdf_path: Path,
+    *,
+    stop_at: Collection[str] = PARTIAL_STOP_KINDS,
+    max_chars: int | None = None,
+    max_tokens: int | None = None,
+) -> PaperDocument:
+    """Extract a PDF's leading sections without blocking the event loop."""
+    return await get_pdf_pool().extract_partial(
+        pdf_path, stop_at=stop_at, max_chars=max_chars, max_tokens=max_tokens
+    )
+
+
+async def download_and_extract(url: str) -> str:
+    """Fetch a PDF into the download cache and extract its text in the pool.
+
+    The body is streamed straight into its cache object and workers map that
+    file, so the PDF is never buffered in this process or copied to a
+    temporary file.
+    """
+    return await extract_text(await download_pdf(url))
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the extraction workers; call on API and Celery worker shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -0,0 +1,351 @@
+"""Section-aware structured text extraction from PDFs.
+
+:func:`extract_text_from_pdf` returns the page text as PyMuPDF lays it out,
+including running headers, footers and page numbers, with two-column pages
+read across both columns. :func:`extract_document` uses PyMuPDF's block and
+font information instead:
+
+- two-column pages are read column by column;
+- lines in the top and bottom margins that repeat across pages (running
+  heads, page numbers, conference footers) are dropped;
+- headings are detected from font size and weight as well as their text,
+  and classified with the same section kinds as ``context_budget``;
+- lines of a block are reflowed into one paragraph, joining hyphenated words.
+
+The result is a :class:`PaperDocument` whose sections downstream stages can
+select by kind, e.g. ``doc.text({"abstract", "introduction", "conclusion"})``.
+"""
+
+import logging
+import re
+from collections import Counter
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services.fingerprint import fingerprint
+from daily_ai_papers.services.parser.context_budget import Section, detect_heading
+from daily_ai_papers.services.parser.pdf_extractor import PDFSource, open_pdf
+from daily_ai_papers.services.tokenizer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Share of the page height at the top and bottom searched for running heads.
+_MARGIN = 0.08
+# Margin lines repeating on at least this share of pages are running heads.
+_REPEAT_SHARE = 0.5
+# Lines at least this much larger than body text count as emphasized.
+_HEADING_SIZE_RATIO = 1.15
+_BOLD_FLAG = 16
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?#(?:\s*(?:of|/)\s*#)?$")
+# Bump when a change to extraction alters its output, to re-extract stored papers.
+EXTRACTOR_VERSION = 1
+# Pages sampled for running heads in partial extraction.
+PARTIAL_SAMPLE_PAGES = 4
+# Partial extraction stops at the first of these sections by default.
+PARTIAL_STOP_KINDS = ("references", "acknowledgments", "appendix")
+
+
+@dataclass
+class PaperDocument:
+    """A paper's text split into typed sections, front matter first."""
+
+    title: str
+    sections: list[Section] = field(default_factory=list)
+    page_count: int = 0
+    pages_read: int = 0
+    complete: bool = True  # False if extraction stopped before the end
+
+    @property
+    def kinds(self) -> list[str]:
+        return [s.kind for s in self.sections]
+
+    def section(self, kind: str) -> Section | None:
+        """Return the first section of ``kind``, if any."""
+        return next((s for s in self.sections if s.kind == kind), None)
+
+    def text(self, kinds: Collection[str] | None = None) -> str:
+        """Join the sections of the given kinds (all by default) in document order."""
+        return "\n\n".join(s.text for s in self.sections if kinds is None or s.kind in kinds)
+
+
+@dataclass
+class _Line:
+    text: str
+    size: float
+    bold: bool
+    top: float
+    bottom: float
+    page: int
+    block: int  # Index of the text block on its page
+
+
+def _reading_order(blocks: list[dict[str, Any]], width: float) -> list[dict[str, Any]]:
+    """Order text blocks column by column on two-column pages.
+
+    Full-width blocks above the columns (title, abstract) come first and
+    those below them (footnotes, wide figures) last.
+    """
+    mid, tolerance = width / 2, width * 0.02
+    left = [b for b in blocks if b["bbox"][2] <= mid + tolerance]
+    right = [b for b in blocks if b["bbox"][0] >= mid - tolerance]
+    if len(left) < 2 or len(right) < 2:
+        return sorted(blocks, key=lambda b: (b["bbox"][1], b["bbox"][0]))
+    columns_top = min(b["bbox"][1] for b in left + right)
+
+    def key(block: dict[str, Any]) -> tuple[int, int, float]:
+        x0, y0, x1, _ = block["bbox"]
+        if x1 <= mid + tolerance:
+            return 1, 0, y0
+        if x0 >= mid - tolerance:
+            return 1, 1, y0
+        return (0 if y0 < columns_top else 2), 0, y0
+
+    return sorted(blocks, key=key)
+
+
+def _page_lines(page: Any, index: int) -> list[_Line]:
+    blocks = [b for b in page.get_text("dict")["blocks"] if b.get("type") == 0]
+    lines: list[_Line] = []
+    for number, block in enumerate(_reading_order(blocks, page.rect.width)):
+        for line in block["lines"]:
+            spans = [s for s in line["spans"] if s["text"].strip()]
+            if not spans:
+                continue
+            lines.append(
+                _Line(
+                    text=" ".join("".join(s["text"] for s in line["spans"]).split()),
+                    size=max(s["size"] for s in spans),
+                    bold=all(s["flags"] & _BOLD_FLAG or "Bold" in s["font"] for s in spans),
+                    top=line["bbox"][1] / page.rect.height,
+                    bottom=line["bbox"][3] / page.rect.height,
+                    page=index,
+                    block=number,
+                )
+            )
+    return lines
+
+
+def _margin_key(line: _Line) -> str | None:
+    """Digit-insensitive key for a line in the page margins, else None."""
+    if line.bottom > _MARGIN and line.top < 1 - _MARGIN:
+        return None
+    return re.sub(r"\d+", "#", line.text.lower())
+
+
+def _running_heads(lines: list[_Line], page_count: int) -> set[str]:
+    """Margin keys repeated across pages, plus bare page numbers."""
+    pages_by_key: dict[str, set[int]] = {}
+    for line in lines:
+        key = _margin_key(line)
+        if key is not None:
+            pages_by_key.setdefault(key, set()).add(line.page)
+    threshold = max(2, page_count * _REPEAT_SHARE)
+    return {
+        key
+        for key, pages in pages_by_key.items()
+        if len(pages) >= threshold or _PAGE_NUMBER_RE.match(key)
+    }
+
+
+def _body_size(lines: list[_Line]) -> float:
+    sizes: Counter[float] = Counter()
+    for line in lines:
+        sizes[round(line.size, 1)] += len(line.text)
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def _title(first_page: list[_Line], body_size: float) -> tuple[str, set[int]]:
+    """The largest text on the first page, and the indexes of its lines.
+
+    Without a larger font the first line is taken as the title.
+    """
+    if not first_page:
+        return "", set()
+    largest = max(line.size for line in first_page)
+    if largest < body_size * _HEADING_SIZE_RATIO:
+        return first_page[0].text, {0}
+    indexes = [i for i, line in enumerate(first_page) if line.size >= largest - 0.5]
+    return " ".join(first_page[i].text for i in indexes), set(indexes)
+
+
+def _paragraphs(lines: list[_Line]) -> str:
+    """Reflow lines into one paragraph per block, joining hyphenated words."""
+    paragraphs: list[str] = []
+    current = ""
+    block: tuple[int, int] | None = None
+    for line in lines:
+        if (line.page, line.block) != block and current:
+            paragraphs.append(current)
+            current = ""
+        block = (line.page, line.block)
+        if current.endswith("-") and line.text[:1].islower():
+            current = current[:-1] + line.text
+        else:
+            current = f"{current} {line.text}" if current else line.text
+    if current:
+        paragraphs.append(current)
+    return "\n".join(paragraphs)
+
+
+class SectionReader:
+    """Read a document's sections lazily, one page at a time.
+
+    Running heads, body font size and the title are taken from the first
+    ``sample_pages`` pages (all pages by default); later pages are only
+    read as iteration reaches them. Iteration stops early, leaving the rest
+    of the document unread, when a heading of a ``stop_at`` kind is reached
+    (that section is not yielded) or once the text read exceeds
+    ``max_chars`` or ``max_tokens``.
+    """
+
+    def __init__(
+        self,
+        doc: Any,
+        *,
+        sample_pages: int | None = None,
+        stop_at: Collection[str] = (),
+        max_chars: int | None = None,
+        max_tokens: int | None = None,
+        model: str = "",
+    ) -> None:
+        self._doc = doc
+        self.page_count: int = doc.page_count
+        self._stop_at = stop_at
+        self._max_chars = max_chars
+        self._max_tokens = max_tokens
+        self._model = model or settings.llm_model
+        self.complete = True  # False once iteration stopped early
+
+        sampled = min(self.page_count, sample_pages or self.page_count)
+        self._pages = {i: _page_lines(doc[i], i) for i in range(sampled)}
+        self.pages_read = sampled
+        self._running = _running_heads(
+            [line for lines in self._pages.values() for line in lines], sampled
+        )
+        self._body_size = _body_size(
+            [line for i in self._pages for line in self._strip(self._pages[i])]
+        )
+        self.title, self._title_lines = _title(self._strip(self._pages.get(0, [])), self._body_size)
+
+    def _strip(self, lines: list[_Line]) -> list[_Line]:
+        return [line for line in lines if _margin_key(line) not in self._running]
+
+    def _lines(self, index: int) -> list[_Line]:
+        if index in self._pages:
+            return self._strip(self._pages.pop(index))
+        self.pages_read = max(self.pages_read, index + 1)
+        return self._strip(_page_lines(self._doc[index], index))
+
+    def _over_budget(self, chars: int, tokens: int) -> bool:
+        return (self._max_chars is not None and chars > self._max_chars) or (
+            self._max_tokens is not None and tokens > self._max_tokens
+        )
+
+    def __iter__(self) -> Iterator[Section]:
+        current = Section("", "front", 0, "")
+        members: list[_Line] = []
+        chars = tokens = 0
+        for index in range(self.page_count):
+            lines = self._lines(index)
+            for i, line in enumerate(lines):
+                emphasized = line.bold or line.size >= self._body_size * _HEADING_SIZE_RATIO
+                is_title = index == 0 and i in self._title_lines
+                detected = None if is_title else detect_heading(line.text, emphasized=emphasized)
+                if detected is None:
+                    members.append(line)
+                    continue
+                current.text = _paragraphs(members)
+                if current.text:
+                    yield current
+                if detected[0] in self._stop_at:
+                    self.complete = False
+                    return
+                current = Section(line.text, *detected, text="", page=line.page)
+                # Keep the heading as its own paragraph at the top of the section.
+                members = [_Line(line.text, line.size, line.bold, 0, 0, line.page, -1)]
+            if self._max_chars is not None or self._max_tokens is not None:
+                page_text = "\n".join(line.text for line in lines)
+                chars += len(page_text)
+                if self._max_tokens is not None:
+                    tokens += count_tokens(page_text, self._model)
+                if self._over_budget(chars, tokens) and index + 1 < self.page_count:
+                    self.complete = False
+                    break
+        current.text = _paragraphs(members)
+        if current.text:
+            yield current
+
+
+def build_document(doc: Any, **options: Any) -> PaperDocument:
+    """Build a :class:`PaperDocument` from an open PyMuPDF document.
+
+    ``options`` are passed to :class:`SectionReader`; with stop conditions
+    the result may be partial (``complete=False``).
+    """
+    reader = SectionReader(doc, **options)
+    sections = list(reader)
+    return PaperDocument(
+        title=reader.title,
+        sections=sections,
+        page_count=reader.page_count,
+        pages_read=reader.pages_read,
+        complete=reader.complete,
+    )
+
+
+def extraction_fingerprint(pdf_sha256: str, stop_at: Collection[str] = ()) -> str:
+    """Fingerprint of the ``extract`` stage: the PDF's content and the extractor.
+
+    ``stop_at`` is the stop sections of a partial extraction (none for a
+    whole document), so switching between the two extracts again.
+    """
+    return fingerprint("extract", pdf_sha256, EXTRACTOR_VERSION, *stop_at)
+
+
+def extract_document(source: PDFSource) -> PaperDocument:
+    """Extract a PDF file or in-memory PDF into typed sections."""
+    with open_pdf(source) as doc:
+        document = build_document(doc)
+    logger.info(
+        "Extracted %d sections (%s) from %d pages",
+        len(document.sections),
+        ",".join(document.kinds),
+        document.page_count,
+    )
+    return document
+
+
+def extract_partial(
+    source: PDFSource,
+    *,
+    stop_at: Collection[str] = PARTIAL_STOP_KINDS,
+    max_chars: int | None = None,
+    max_tokens: int | None = None,
+    model: str = "",
+) -> PaperDocument:
+    """Extract sections only until ``stop_at`` or a size budget is reached.
+
+    Meant for analysis passes that need the abstract, introduction and
+    conclusion but not the references and appendices behind them: pages
+    after the stop point are never read. Running heads are detected from
+    the first pages only.
+    """
+    with open_pdf(source) as doc:
+        document = build_document(
+            doc,
+            sample_pages=PARTIAL_SAMPLE_PAGES,
+            stop_at=stop_at,
+            max_chars=max_chars,
+            max_tokens=max_tokens,
+            model=model,
+        )
+    logger.info(
+        "Extracted %d sections (%s) from %d of %d pages",
+        len(document.sections),
+        ",".join(document.kinds),
+        document.pages_read,
+        document.page_count,
+    )
+    return document
@@ -0,0 +1,193 @@
+"""Compressed storage for extracted paper full text.
+
+Full text is the largest field of a paper and is only read by parsing,
+chunking and chat, so it is kept out of the ``papers`` table: each paper's
+text is compressed into a ``paper_texts`` row, and with
+``FULL_TEXT_BACKEND=blob`` the compressed bytes go to content-addressed files
+under ``FULL_TEXT_BLOB_DIR`` and the row keeps only the key. Nothing
+decompresses the text until :func:`load_full_text` is called.
+
+Compression uses zstd when ``zstandard`` is installed
+(``pip install daily-ai-papers[compression]``), optionally with a dictionary
+trained on paper text (:func:`train_dictionary`, ``FULL_TEXT_DICTIONARY_PATH``),
+which helps most on short texts. Without ``zstandard`` zlib is used. The
+codec and dictionary ID are stored per row, so either can change later
+without rewriting old rows.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.models.paper import PaperText
+
+logger = logging.getLogger(__name__)
+
+_ZLIB_LEVEL = 9
+_DEFAULT_DICTIONARY_SIZE = 112_640  # zstd's default (110 KiB)
+
+
+def _zstd() -> Any:
+    """Return the ``zstandard`` module, or None if it isn't installed."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class TextCodec:
+    """Compress and decompress paper text with zstd (or zlib as a fallback)."""
+
+    def __init__(self, level: int, dictionary: bytes | None = None) -> None:
+        self.level = level
+        self._zstd = _zstd()
+        self._dictionary: Any = None
+        if dictionary is not None:
+            if self._zstd is None:
+                raise RuntimeError("FULL_TEXT_DICTIONARY_PATH requires the zstandard package")
+            self._dictionary = self._zstd.ZstdCompressionDict(dictionary)
+            self._dictionary.precompute_compress(level=level)
+
+    @property
+    def codec(self) -> str:
+        return "zlib" if self._zstd is None else "zstd"
+
+    @property
+    def dictionary_id(self) -> int | None:
+        return None if self._dictionary is None else int(self._dictionary.dict_id())
+
+    def compress(self, text: str) -> bytes:
+        raw = text.encode()
+        if self._zstd is None:
+            return zlib.compress(raw, _ZLIB_LEVEL)
+        compressor = self._zstd.ZstdCompressor(level=self.level, dict_data=self._dictionary)
+        return bytes(compressor.compress(raw))
+
+    def decompress(self, codec: str, data: bytes, dictionary_id: int | None = None) -> str:
+        if codec == "zlib":
+            return zlib.decompress(data).decode()
+        if codec != "zstd":
+            raise ValueError(f"Unsupported full-text codec: {codec}")
+        if self._zstd is None:
+            raise RuntimeError("Full text is zstd-compressed; install the zstandard package")
+        if dictionary_id is None:
+            decompressor = self._zstd.ZstdDecompressor()
+        elif dictionary_id == self.dictionary_id:
+            decompressor = self._zstd.ZstdDecompressor(dict_data=self._dictionary)
+        else:
+            raise RuntimeError(
+                f"Full text needs zstd dictionary {dictionary_id}, "
+                f"but FULL_TEXT_DICTIONARY_PATH provides {self.dictionary_id}"
+            )
+        return bytes(decompressor.decompress(data)).decode()
+
+
+def train_dictionary(samples: Iterable[str], size: int = _DEFAULT_DICTIONARY_SIZE) -> bytes:
+    """Train a zstd dictionary on sample paper texts.
+
+    Save the result to a file and point ``FULL_TEXT_DICTIONARY_PATH`` at it.
+    A few thousand papers are plenty.
+    """
+    zstd = _zstd()
+    if zstd is None:
+        raise RuntimeError("Training a dictionary requires the zstandard package")
+    return bytes(zstd.train_dictionary(size, [s.encode() for s in samples]).as_bytes())
+
+
+_codec: TextCodec | None = None
+_codec_config: tuple[int, str] | None = None
+
+
+def get_codec() -> TextCodec:
+    """Return the process-wide codec for the current settings."""
+    global _codec, _codec_config
+    config = (settings.full_text_zstd_level, settings.full_text_dictionary_path)
+    if _codec is None or _codec_config != config:
+        path = settings.full_text_dictionary_path
+        dictionary = Path(path).read_bytes() if path else None
+        _codec = TextCodec(settings.full_text_zstd_level, dictionary)
+        _codec_config = config
+        if _codec.codec == "zlib":
+            logger.info("zstandard not installed; compressing full text with zlib")
+    return _codec
+
+
+def _blob_path(key: str) -> Path:
+    return Path(settings.full_text_blob_dir) / key
+
+
+def _write_blob(key: str, data: bytes) -> None:
+    path = _blob_path(key)
+    if path.exists():  # Content-addressed: the same bytes are already there
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
+
+
+async def save_full_text(db: AsyncSession, paper_id: int, text: str) -> PaperText:
+    """Compress and store ``text`` as the full text of ``paper_id``.
+
+    The row is added to ``db``; the caller commits.
+    """
+    backend = settings.full_text_backend
+    if backend not in ("table", "blob"):
+        raise ValueError(f"Unsupported full-text backend: {backend}")
+    codec = get_codec()
+    data = await asyncio.to_thread(codec.compress, text)
+    sha256 = hashlib.sha256(text.encode()).hexdigest()
+
+    row = await db.get(PaperText, paper_id)
+    if row is None:
+        row = PaperText(paper_id=paper_id)
+        db.add(row)
+    row.codec = codec.codec
+    row.dictionary_id = codec.dictionary_id
+    row.sha256 = sha256
+    row.raw_size = len(text.encode())
+    row.stored_size = len(data)
+    if backend == "blob":
+        key = f"{sha256[:2]}/{sha256}.{codec.codec}"
+        if codec.dictionary_id is not None:
+            key = f"{sha256[:2]}/{sha256}.{codec.dictionary_id}.{codec.codec}"
+        await asyncio.to_thread(_write_blob, key, data)
+        row.data, row.blob_key = None, key
+    else:
+        row.data, row.blob_key = data, None
+    logger.debug(
+        "Stored full text of paper %d: %d -> %d bytes (%s)",
+        paper_id,
+        row.raw_size,
+        row.stored_size,
+        row.codec,
+    )
+    return row
+
+
+async def load_full_text(db: AsyncSession, paper_id: int) -> str | None:
+    """Return the decompressed full text of ``paper_id``, or None if not stored."""
+    row = await db.get(PaperText, paper_id)
+    if row is None:
+        return None
+    if row.data is not None:
+        data = row.data
+    elif row.blob_key is not None:
+        data = await asyncio.to_thread(_blob_path(row.blob_key).read_bytes)
+    else:
+        return None
+    return await asyncio.to_thread(get_codec().decompress, row.codec, data, row.dictionary_id)
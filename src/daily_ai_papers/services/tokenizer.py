@@ -0,0 +1,111 @@
+"""Token counting for prompt budgeting.
+
+Uses ``tiktoken`` when it is installed (``pip install daily-ai-papers[tokenizer]``)
+for OpenAI-style models. Other models, and environments without ``tiktoken``
+or its encoding files, fall back to a character-based estimate: about four
+characters per token for Latin text and one token per CJK character.
+Counts are cached by a digest of the text (not the text itself, so long-lived
+processes don't keep whole papers alive), so re-counting the same section
+across calls is free.
+"""
+
+import functools
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_CJK_RE = re.compile(r"[\u3000-\u9fff\uac00-\ud7af]")
+_CHARS_PER_TOKEN = 4.0
+_CHARS_PER_TOKEN_CLAUDE = 3.5
+_FALLBACK_ENCODING = "o200k_base"
+_COUNT_CACHE_SIZE = 4096
+
+_counts: OrderedDict[tuple[bytes, str], int] = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=32)
+def _encoding(model: str) -> Any:
+    """Return the tiktoken encoding for ``model``, or None to use the estimate."""
+    if model.startswith("claude"):
+        return None
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(_FALLBACK_ENCODING)
+    except Exception:
+        # Encoding files are downloaded on first use; offline hosts estimate instead.
+        logger.warning("tiktoken encoding unavailable for %s; estimating tokens", model)
+        return None
+
+
+def _chars_per_token(model: str) -> float:
+    return _CHARS_PER_TOKEN_CLAUDE if model.startswith("claude") else _CHARS_PER_TOKEN
+
+
+def _estimate(text: str, model: str) -> int:
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + round((len(text) - cjk) / _chars_per_token(model))
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Return the number of tokens ``text`` occupies for ``model``."""
+    key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), model)
+    with _counts_lock:
+        count = _counts.get(key)
+        if count is not None:
+            _counts.move_to_end(key)
+            return count
+    encoding = _encoding(model)
+    if encoding is None:
+        count = _estimate(text, model)
+    else:
+        count = len(encoding.encode(text, disallowed_special=()))
+    with _counts_lock:
+        _counts[key] = count
+        if len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+
+def clear_token_cache() -> None:
+    """Forget cached token counts (e.g. after the tokenizer changes)."""
+    with _counts_lock:
+        _counts.clear()
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Return the longest prefix of ``text`` that fits in ``max_tokens``.
+
+    The result is always an exact prefix: ``text.startswith(result)``.
+
+    Without an exact tokenizer the cut is made at the last whitespace before
+    the estimated character offset.
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is not None:
+        # Token bytes concatenate to the UTF-8 bytes of ``text``, so this is a
+        # byte prefix; dropping a multibyte character cut at the end makes it
+        # an exact character prefix (decode() would add U+FFFD instead).
+        tokens = encoding.encode(text, disallowed_special=())[:max_tokens]
+        return bytes(encoding.decode_bytes(tokens)).decode(errors="ignore")
+
+    end = int(max_tokens * _chars_per_token(model))
+    while end > 0 and _estimate(text[:end], model) > max_tokens:
+        end = int(end * 0.9)
+    cut = text.rfind(" ", 0, end)
+    return text[: cut if cut > end // 2 else end].rstrip()
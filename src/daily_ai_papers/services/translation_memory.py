@@ -0,0 +1,148 @@
+"""Segment-level translation memory.
+
+Academic text repeats itself: boilerplate sentences, recurring terminology,
+and the same abstract translated again when a paper is reprocessed. With
+``TRANSLATION_MEMORY_BACKEND`` set, ``translator.translate_text`` splits the
+text into sentences (or paragraphs, ``TRANSLATION_MEMORY_SEGMENT``), looks
+each one up per (segment, language, model), sends only the misses to the
+LLM and reassembles the result in order.
+
+A segment hits either exactly or after normalisation (Unicode NFKC,
+whitespace collapsed, case folded), so reflowed or re-extracted text still
+matches. Entries live in the same stores as the completion cache
+(``llm_cache``): a local SQLite file or Redis, with a TTL and LRU eviction.
+Like the completion cache it is optional: if it can't be read, the text is
+translated without it, and a failed write only loses the new entries.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import TRANSLATION_MEMORY_LOOKUPS
+from daily_ai_papers.services.llm_cache import LLMCache, RedisLLMCache, SQLiteLLMCache
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_RE = re.compile(r"\s*\n\s*\n\s*")
+# A sentence ends at . ! or ? followed by whitespace and a capital, digit or opening bracket.
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_ABBREVIATIONS = ("e.g.", "i.e.", "et al.", "fig.", "eq.", "vs.", "cf.", "sec.", "tab.", "no.")
+_INITIAL_RE = re.compile(r"(?:^|\s)[A-Z]\.$")
+
+
+def _sentence_breaks(paragraph: str) -> list[tuple[int, int]]:
+    breaks = []
+    for match in _SENTENCE_END_RE.finditer(paragraph):
+        before = paragraph[: match.start()]
+        if before.lower().endswith(_ABBREVIATIONS) or _INITIAL_RE.search(before):
+            continue
+        breaks.append(match.span())
+    return breaks
+
+
+def split_segments(text: str, granularity: str = "sentence") -> list[str]:
+    """Split ``text`` into segments and the separators between them.
+
+    Returns a list alternating segment, separator, segment, ... (like
+    ``re.split`` with a capturing group), so ``"".join(parts) == text``.
+    Leading and trailing whitespace become separators around empty segments.
+    """
+    if granularity not in ("sentence", "paragraph"):
+        raise ValueError(f"Unsupported translation memory segment: {granularity}")
+    stripped = text.strip()
+    if not stripped:
+        return [text]
+    start = text.index(stripped[0])
+    parts = ["", text[:start]] if start else []
+    position = start
+    body_end = start + len(stripped)
+    breaks = [(m.start() + start, m.end() + start) for m in _PARAGRAPH_RE.finditer(stripped)]
+    if granularity == "sentence":
+        paragraph_start = start
+        sentence_breaks: list[tuple[int, int]] = []
+        for brk in [*breaks, (body_end, body_end)]:
+            paragraph = text[paragraph_start : brk[0]]
+            sentence_breaks += [
+                (s + paragraph_start, e + paragraph_start) for s, e in _sentence_breaks(paragraph)
+            ]
+            sentence_breaks.append(brk)
+            paragraph_start = brk[1]
+        breaks = sentence_breaks[:-1]
+    for brk_start, brk_end in breaks:
+        parts += [text[position:brk_start], text[brk_start:brk_end]]
+        position = brk_end
+    parts.append(text[position:body_end])
+    if body_end < len(text):
+        parts += [text[body_end:], ""]
+    return parts
+
+
+def normalize_segment(segment: str) -> str:
+    """Normalise a segment for fuzzy lookups: NFKC, collapsed whitespace, case folded."""
+    return " ".join(unicodedata.normalize("NFKC", segment).split()).casefold()
+
+
+def needs_translation(segment: str) -> bool:
+    """False for segments with no letters (empty, numbers, symbols), copied as they are."""
+    return any(c.isalpha() for c in segment)
+
+
+class TranslationMemory:
+    """Translations of single segments, keyed by language and model."""
+
+    def __init__(self, store: LLMCache) -> None:
+        self.store = store
+
+    @staticmethod
+    def _key(kind: str, segment: str, language: str, model: str) -> str:
+        payload = json.dumps([kind, language, model, segment], ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def lookup(self, segment: str, language: str, model: str) -> str | None:
+        """Return the stored translation of ``segment``, exact or normalised, if any."""
+        found = await self.store.get(self._key("exact", segment, language, model))
+        if found is not None:
+            TRANSLATION_MEMORY_LOOKUPS.labels("exact").inc()
+            return found
+        normalized = normalize_segment(segment)
+        found = await self.store.get(self._key("normalized", normalized, language, model))
+        TRANSLATION_MEMORY_LOOKUPS.labels("miss" if found is None else "normalized").inc()
+        return found
+
+    async def add(self, segment: str, language: str, model: str, translation: str) -> None:
+        """Store the translation of ``segment`` under its exact and normalised forms."""
+        await self.store.set(self._key("exact", segment, language, model), translation)
+        normalized = normalize_segment(segment)
+        await self.store.set(self._key("normalized", normalized, language, model), translation)
+
+
+_memory: TranslationMemory | None = None
+_memory_backend: str = ""
+
+
+def get_translation_memory() -> TranslationMemory | None:
+    """Return the configured translation memory, or None when it is disabled."""
+    global _memory, _memory_backend
+    backend = settings.translation_memory_backend
+    if not backend:
+        return None
+    if _memory is not None and _memory_backend == backend:
+        return _memory
+
+    ttl = settings.translation_memory_ttl_seconds
+    max_entries = settings.translation_memory_max_entries
+    store: LLMCache
+    if backend == "sqlite":
+        store = SQLiteLLMCache(settings.translation_memory_path, ttl, max_entries)
+    elif backend == "redis":
+        url = settings.llm_cache_redis_url or settings.redis_url
+        store = RedisLLMCache(url, ttl, max_entries, prefix="translation-memory:")
+    else:
+        raise ValueError(f"Unsupported translation memory backend: {backend}")
+    _memory = TranslationMemory(store)
+    _memory_backend = backend
+    return _memory
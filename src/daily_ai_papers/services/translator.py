@@ -1,8 +1,37 @@
-"""LLM-based translation service for paper content."""
+"""LLM-based translation service for paper content.
 
+:func:`translate_many` translates one text into several languages with a
+single JSON-mode request, so each extra language costs only its output
+tokens rather than another round trip that re-sends the source.
+
+With ``TRANSLATION_MEMORY_BACKEND`` set, :func:`translate_text` (and
+:func:`translate_many`, one language at a time) translates segment by
+segment through the translation memory: segments seen before are reused
+and only the new ones are sent to the LLM, in one JSON-mode request.
+
+Texts longer than ``TRANSLATION_CHUNK_TOKENS`` are split at paragraph
+boundaries (sentence boundaries for overlong paragraphs) into chunks that
+are translated concurrently under the LLM scheduler and joined with the
+original separators, so a long section takes about as long as its longest
+chunk rather than the sum of all of them.
+"""
+
+import asyncio
+import json
 import logging
+from collections.abc import AsyncIterator, Sequence
 
-from daily_ai_papers.services.llm_client import llm_complete
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import LLM_PACKED_ITEMS
+from daily_ai_papers.services.fingerprint import template_version
+from daily_ai_papers.services.llm_client import llm_complete, llm_stream, parse_json_response
+from daily_ai_papers.services.tokenizer import count_tokens
+from daily_ai_papers.services.translation_memory import (
+    TranslationMemory,
+    get_translation_memory,
+    needs_translation,
+    split_segments,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,21 +46,61 @@ LANGUAGE_NAMES = {
 
 SYSTEM_PROMPT = "You are a professional academic translator."
 
+# The source text goes first as a cacheable context block, so translating the
+# same text into several languages re-uses the provider's prompt cache.
+SOURCE_CONTEXT = """\
+Text to translate:
+---
+{text}
+---
+"""
+
 TRANSLATION_PROMPT = """\
-Translate the following academic paper text into {language_name}.
+Translate the academic paper text above into {language_name}.
 
 Requirements:
 - Preserve all technical terms and proper nouns
 - Maintain an academic tone
 - Keep the original structure (paragraphs, lists)
 - Do NOT add any commentary — output ONLY the translation
+"""
 
-Text to translate:
----
-{text}
----
+MULTI_TRANSLATION_PROMPT = """\
+Translate the academic paper text above into each of these languages:
+{languages}
+
+Requirements:
+- Preserve all technical terms and proper nouns
+- Maintain an academic tone
+- Keep the original structure (paragraphs, lists)
+- Translate the full text for every language; do NOT add any commentary
+
+Return a JSON object with one field per language code listed above, whose
+value is the complete translation into that language. Respond ONLY with
+the JSON object.
+"""
+
+SEGMENTS_PROMPT = """\
+Translate each academic paper segment in this JSON array into {language_name}:
+{segments}
+
+Requirements:
+- Preserve all technical terms and proper nouns
+- Maintain an academic tone
+- Translate every segment on its own; do NOT merge, split or comment on them
+
+Return a JSON object {{"translations": [...]}} with exactly one translation
+per segment, in the same order. Respond ONLY with the JSON object.
 """
 
+# Languages written without spaces between sentences.
+_UNSPACED_LANGUAGES = frozenset({"zh", "ja"})
+
+# Output tokens reserved per language, relative to the source length
+# (translations into CJK languages can take about twice as many tokens).
+_OUTPUT_TOKENS_PER_SOURCE_TOKEN = 2.0
+_OUTPUT_TOKENS_OVERHEAD = 64
+
 
 async def translate_text(text: str, target_language: str) -> str:
     """Translate text into the target language using an LLM.
@@ -43,12 +112,251 @@ async def translate_text(text: str, target_language: str) -> str:
     Returns:
         The translated text.
     """
-    language_name = LANGUAGE_NAMES.get(target_language, target_language)
-    prompt = TRANSLATION_PROMPT.format(language_name=language_name, text=text)
+    memory = get_translation_memory()
+    if memory is not None:
+        return await _translate_with_memory(memory, text, target_language)
+    return await _translate_direct(text, target_language)
+
+
+async def _translate_direct(text: str, target_language: str) -> str:
+    parts = _translation_chunks(text.strip(), settings.translation_chunk_tokens)
+    if len(parts) == 1:
+        return await _translate_chunk(text, target_language)
+    logger.info("Translating %d chars in %d chunks", len(text), len(parts[::2]))
+    parts[::2] = await asyncio.gather(*(_translate_chunk(c, target_language) for c in parts[::2]))
+    if target_language in _UNSPACED_LANGUAGES:
+        parts[1::2] = [sep if "\n" in sep else "" for sep in parts[1::2]]
+    return "".join(parts)
+
+
+def _translation_chunks(text: str, max_tokens: int) -> list[str]:
+    """Split ``text`` into chunks of about ``max_tokens`` tokens and their separators.
+
+    Returns a list alternating chunk, separator, chunk, ... that joins back
+    into ``text``. Chunks end at paragraph breaks, or at sentence breaks
+    inside a paragraph longer than ``max_tokens``; a single overlong
+    sentence becomes a chunk of its own. ``max_tokens`` 0 disables chunking.
+    """
+    if max_tokens <= 0 or count_tokens(text, settings.llm_model) <= max_tokens:
+        return [text]
+    pieces: list[str] = []  # Alternating paragraph-or-sentence, separator
+    paragraphs = split_segments(text, "paragraph")
+    for i, paragraph in enumerate(paragraphs):
+        if i % 2 == 0 and count_tokens(paragraph, settings.llm_model) > max_tokens:
+            pieces += split_segments(paragraph, "sentence")
+        else:
+            pieces.append(paragraph)
+
+    parts: list[str] = []
+    current = pieces[0]
+    used = count_tokens(current, settings.llm_model)
+    for separator, piece in zip(pieces[1::2], pieces[2::2], strict=True):
+        tokens = count_tokens(piece, settings.llm_model)
+        if used + tokens > max_tokens:
+            parts += [current, separator]
+            current, used = piece, tokens
+        else:
+            current += separator + piece
+            used += tokens
+    parts.append(current)
+    return parts
+
+
+async def _translate_chunk(text: str, target_language: str) -> str:
+    language_name, prompt = _build_prompt(target_language)
 
     logger.info("Translating %d chars to %s", len(text), language_name)
-    result = await llm_complete(prompt, system=SYSTEM_PROMPT)
+    result = await llm_complete(
+        prompt,
+        system=SYSTEM_PROMPT,
+        context=SOURCE_CONTEXT.format(text=text),
+        stage="translation",
+    )
     logger.info(
         "Translation complete: %d chars -> %d chars (%s)", len(text), len(result), language_name
     )
     return result.strip()
+
+
+async def translate_text_stream(text: str, target_language: str) -> AsyncIterator[str]:
+    """Translate text like :func:`translate_text`, yielding chunks as they are generated.
+
+    Leading whitespace of the response is dropped so the concatenated
+    chunks match the start of ``translate_text``'s result.
+    """
+    language_name, prompt = _build_prompt(target_language)
+
+    logger.info("Streaming translation of %d chars to %s", len(text), language_name)
+    started = False
+    context = SOURCE_CONTEXT.format(text=text)
+    async for chunk in llm_stream(
+        prompt, system=SYSTEM_PROMPT, context=context, stage="translation"
+    ):
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        yield chunk
+
+
+async def _translate_with_memory(memory: TranslationMemory, text: str, target_language: str) -> str:
+    parts = split_segments(text, settings.translation_memory_segment)
+    segments = list(dict.fromkeys(s for s in parts[::2] if needs_translation(s)))
+    model = _memory_model()
+    try:
+        found = await asyncio.gather(*(memory.lookup(s, target_language, model) for s in segments))
+    except Exception:
+        logger.warning("Translation memory lookup failed; translating directly", exc_info=True)
+        return await _translate_direct(text, target_language)
+    translations = {s: t for s, t in zip(segments, found, strict=True) if t is not None}
+
+    misses = [s for s in segments if s not in translations]
+    if misses:
+        logger.info(
+            "Translation memory: %d of %d segments to translate",
+            len(misses),
+            len(segments),
+        )
+        translated = await _translate_segments(misses, target_language)
+        translations.update(zip(misses, translated, strict=True))
+        try:
+            for segment, translation in zip(misses, translated, strict=True):
+                await memory.add(segment, target_language, model, translation)
+        except Exception:
+            logger.warning("Translation memory write failed", exc_info=True)
+
+    unspaced = target_language in _UNSPACED_LANGUAGES
+    result = []
+    for i, part in enumerate(parts):
+        if i % 2:  # Separator
+            result.append("" if unspaced and "\n" not in part else part)
+        else:
+            result.append(translations.get(part, part))
+    return "".join(result).strip()
+
+
+async def _translate_segments(segments: list[str], target_language: str) -> list[str]:
+    """Translate ``segments`` in JSON-mode calls of about ``TRANSLATION_CHUNK_TOKENS``."""
+    max_tokens = settings.translation_chunk_tokens
+    batches: list[list[str]] = [[]]
+    used = 0
+    for segment in segments:
+        tokens = count_tokens(segment, settings.llm_model)
+        if batches[-1] and max_tokens > 0 and used + tokens > max_tokens:
+            batches.append([])
+            used = 0
+        batches[-1].append(segment)
+        used += tokens
+    translated = await asyncio.gather(
+        *(_translate_segment_batch(b, target_language) for b in batches)
+    )
+    return [t for batch in translated for t in batch]
+
+
+async def _translate_segment_batch(segments: list[str], target_language: str) -> list[str]:
+    """Translate ``segments`` in one JSON-mode call, falling back one by one."""
+    if len(segments) == 1:
+        return [await _translate_direct(segments[0], target_language)]
+    language_name = LANGUAGE_NAMES.get(target_language, target_language)
+    raw = await llm_complete(
+        SEGMENTS_PROMPT.format(
+            language_name=language_name, segments=json.dumps(segments, ensure_ascii=False)
+        ),
+        system=SYSTEM_PROMPT,
+        max_tokens=settings.translation_max_output_tokens,
+        response_json=True,
+        stage="translation",
+    )
+    try:
+        translations = parse_json_response(raw).get("translations")
+    except ValueError:
+        translations = None
+    if (
+        isinstance(translations, list)
+        and len(translations) == len(segments)
+        and all(isinstance(t, str) and t.strip() for t in translations)
+    ):
+        return [t.strip() for t in translations]
+    logger.warning("Segment translation response malformed; translating segments one by one")
+    return list(await asyncio.gather(*(_translate_direct(s, target_language) for s in segments)))
+
+
+def _memory_model() -> str:
+    """Translation memory entries are only reused with the same model and prompts."""
+    version = template_version(SYSTEM_PROMPT, SOURCE_CONTEXT, TRANSLATION_PROMPT, SEGMENTS_PROMPT)
+    return f"{settings.llm_provider}:{settings.llm_model}:{version}"
+
+
+def _language_groups(text: str, languages: list[str]) -> list[list[str]]:
+    """Split ``languages`` into groups whose translations fit one response."""
+    source_tokens = count_tokens(text, settings.llm_model)
+    per_language = int(source_tokens * _OUTPUT_TOKENS_PER_SOURCE_TOKEN) + _OUTPUT_TOKENS_OVERHEAD
+    size = max(1, settings.translation_max_output_tokens // per_language)
+    return [languages[i : i + size] for i in range(0, len(languages), size)]
+
+
+async def _translate_group(text: str, languages: list[str]) -> dict[str, str]:
+    if len(languages) == 1:
+        return {languages[0]: await translate_text(text, languages[0])}
+    listed = "\n".join(f"- {code}: {LANGUAGE_NAMES.get(code, code)}" for code in languages)
+    logger.info("Translating %d chars to %s in one call", len(text), ",".join(languages))
+    raw = await llm_complete(
+        MULTI_TRANSLATION_PROMPT.format(languages=listed),
+        system=SYSTEM_PROMPT,
+        max_tokens=settings.translation_max_output_tokens,
+        response_json=True,
+        context=SOURCE_CONTEXT.format(text=text),
+        stage="translation",
+    )
+    try:
+        data = parse_json_response(raw)
+    except ValueError:
+        data = {}
+    results = {
+        code: data[code].strip()
+        for code in languages
+        if isinstance(data.get(code), str) and data[code].strip()
+    }
+    LLM_PACKED_ITEMS.labels("translation", "packed").inc(len(results))
+
+    missing = [code for code in languages if code not in results]
+    if missing:
+        logger.warning(
+            "Multi-language response lacked %s; translating them individually", ",".join(missing)
+        )
+        LLM_PACKED_ITEMS.labels("translation", "fallback").inc(len(missing))
+        singles = await asyncio.gather(*(translate_text(text, code) for code in missing))
+        results.update(zip(missing, singles, strict=True))
+    return results
+
+
+async def translate_many(text: str, languages: Sequence[str] | None = None) -> dict[str, str]:
+    """Translate ``text`` into several languages, all in one call where possible.
+
+    ``languages`` defaults to ``TRANSLATION_LANGUAGES``. If the translations
+    wouldn't all fit in ``TRANSLATION_MAX_OUTPUT_TOKENS``, the languages are
+    split into groups translated concurrently; languages missing from (or
+    empty in) a JSON response are retried with :func:`translate_text`. With
+    the translation memory enabled, or for texts longer than
+    ``TRANSLATION_CHUNK_TOKENS``, each language is translated separately.
+
+    Returns:
+        The translations keyed by language code, in the requested order.
+    """
+    codes = list(dict.fromkeys(languages or settings.translation_language_list))
+    chunked = 0 < settings.translation_chunk_tokens < count_tokens(text, settings.llm_model)
+    # Per language, so segments can be reused or chunks translated concurrently
+    if get_translation_memory() is not None or chunked:
+        singles = await asyncio.gather(*(translate_text(text, code) for code in codes))
+        return dict(zip(codes, singles, strict=True))
+    results: dict[str, str] = {}
+    groups = _language_groups(text, codes)
+    for translated in await asyncio.gather(*(_translate_group(text, g) for g in groups)):
+        results.update(translated)
+    return {code: results[code] for code in codes}
+
+
+def _build_prompt(target_language: str) -> tuple[str, str]:
+    language_name = LANGUAGE_NAMES.get(target_language, target_language)
+    return language_name, TRANSLATION_PROMPT.format(language_name=language_name)
@@ -22,3 +22,5 @@ app.conf.update(
 )
 
 app.autodiscover_tasks(["daily_ai_papers.tasks"])
+
+from daily_ai_papers.tasks import signals  # noqa: E402, F401  (connects signal handlers)
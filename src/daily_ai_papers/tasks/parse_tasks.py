@@ -1,8 +1,18 @@
 """Celery tasks for paper parsing and analysis."""
 
 import logging
+from contextlib import AbstractAsyncContextManager, nullcontext
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.database import async_session
+from daily_ai_papers.models.paper import Paper
+from daily_ai_papers.services import analysis
+from daily_ai_papers.services.llm_batch import batch_mode
 from daily_ai_papers.tasks.celery_app import app
+from daily_ai_papers.tasks.runner import run_async
 
 logger = logging.getLogger(__name__)
 
@@ -20,3 +30,94 @@ def parse_paper(paper_id: int) -> dict[str, str]:
     """
     logger.info("parse_paper task triggered for paper_id=%d", paper_id)
     return {"paper_id": str(paper_id), "status": "not_implemented"}
+
+
+@app.task(name="daily_ai_papers.tasks.parse_tasks.analyze_paper_abstract")  # type: ignore[untyped-decorator]
+def analyze_paper_abstract(paper_id: int) -> dict[str, str]:
+    """Tier 1: summarize a crawled paper from its abstract.
+
+    Papers in ``ANALYSIS_PRIORITY_CATEGORIES`` are queued for full-text
+    analysis straight away; the rest wait until someone opens them.
+    """
+    return run_async(_analyze_abstract(paper_id))
+
+
+@app.task(name="daily_ai_papers.tasks.parse_tasks.analyze_paper_abstracts")  # type: ignore[untyped-decorator]
+def analyze_paper_abstracts(paper_ids: list[int]) -> dict[str, int]:
+    """Tier 1 for a batch of papers (e.g. a crawl), several abstracts per LLM request.
+
+    With ``LLM_BATCH_ABSTRACTS`` the requests go through the provider's
+    batch API (see ``llm_batch``): cheaper, but the task waits for the batch.
+    """
+    return run_async(_analyze_abstracts(paper_ids))
+
+
+@app.task(name="daily_ai_papers.tasks.parse_tasks.analyze_paper_full_text")  # type: ignore[untyped-decorator]
+def analyze_paper_full_text(paper_id: int) -> dict[str, str]:
+    """Tier 2: download, extract and analyze a paper's full text."""
+    return run_async(_analyze_full_text(paper_id))
+
+
+async def queue_full_analysis(
+    db: AsyncSession, paper_id: int, *, retry_failed: bool = False
+) -> str | None:
+    """Claim and dispatch tier-2 analysis of ``paper_id``; return the task ID.
+
+    Returns None if it is already queued (or can't be). The task is
+    dispatched before the claim is committed, so if the broker is down the
+    claim is rolled back (expiring loaded objects) and the error re-raised.
+    """
+    if not await analysis.claim_full_analysis(db, paper_id, retry_failed=retry_failed):
+        return None
+    try:
+        result = analyze_paper_full_text.delay(paper_id)
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
+    logger.info("Dispatched full-text analysis of paper %d: %s", paper_id, result.id)
+    return str(result.id)
+
+
+async def _analyze_abstract(paper_id: int) -> dict[str, str]:
+    async with async_session() as db:
+        paper = await db.get(Paper, paper_id)
+        if paper is None:
+            return {"paper_id": str(paper_id), "status": "not_found"}
+        await analysis.analyze_abstract(db, paper)
+        await db.commit()
+        status = paper.status
+        if analysis.is_priority(paper) and await queue_full_analysis(db, paper_id):
+            status = "downloading"
+    return {"paper_id": str(paper_id), "status": status}
+
+
+async def _analyze_abstracts(paper_ids: list[int]) -> dict[str, int]:
+    async with async_session() as db:
+        result = await db.execute(select(Paper).where(Paper.id.in_(paper_ids)))
+        papers = list(result.scalars().all())
+        batching: AbstractAsyncContextManager[object] = (
+            batch_mode() if settings.llm_batch_abstracts else nullcontext()
+        )
+        async with batching:
+            analyzed = await analysis.analyze_abstracts(db, papers)
+        await db.commit()
+        queued = 0
+        for paper_id in [p.id for p in papers if analysis.is_priority(p)]:
+            queued += await queue_full_analysis(db, paper_id) is not None
+    return {"papers": len(papers), "analyzed": analyzed, "full_text_queued": queued}
+
+
+async def _analyze_full_text(paper_id: int) -> dict[str, str]:
+    async with async_session() as db:
+        paper = await db.get(Paper, paper_id)
+        if paper is None:
+            return {"paper_id": str(paper_id), "status": "not_found"}
+        try:
+            await analysis.analyze_full_text(db, paper)
+        except Exception:
+            logger.exception("Full-text analysis of paper %d failed", paper_id)
+            await db.rollback()
+            paper.status = "failed"
+        await db.commit()
+        return {"paper_id": str(paper_id), "status": paper.status}
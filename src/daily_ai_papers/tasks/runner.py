@@ -0,0 +1,49 @@
+"""Run coroutines from synchronous Celery tasks on a per-process event loop.
+
+``asyncio.run`` creates and closes a fresh loop on every call, which throws
+away pooled connections (LLM SDK clients, httpx pools) after each task.
+Tasks that talk to the LLM use :func:`run_async` instead, so the pools
+survive between tasks and are closed once on worker shutdown. LLM calls
+made from tasks run in the ``batch`` scheduling lane, behind interactive
+API traffic.
+"""
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` to completion on this process's long-lived event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+
+    from daily_ai_papers.services.llm_scheduler import llm_priority
+
+    with llm_priority("batch"):
+        return _loop.run_until_complete(coro)
+
+
+def shutdown_loop() -> None:
+    """Close pooled LLM clients and the process event loop (idempotent)."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    from daily_ai_papers.services.llm_client import close_llm_clients
+
+    try:
+        _loop.run_until_complete(close_llm_clients())
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+    finally:
+        _loop.close()
+        _loop = None
+        logger.info("Worker event loop closed")
@@ -0,0 +1,76 @@
+"""Celery signal handlers: metrics exporter, task timing and resource cleanup."""
+
+import logging
+import os
+import time
+from typing import Any
+
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import (
+    CELERY_TASK_SECONDS,
+    CeleryQueueCollector,
+    register_collector,
+    start_exporter,
+)
+from daily_ai_papers.services.parser.pdf_pool import shutdown_pdf_pool
+from daily_ai_papers.tasks.runner import shutdown_loop
+
+logger = logging.getLogger(__name__)
+
+# task_id -> perf_counter() at task_prerun
+_task_starts: dict[str, float] = {}
+
+
+@worker_init.connect  # type: ignore[untyped-decorator]
+def _start_metrics_exporter(sender: Any = None, **_: Any) -> None:
+    """Serve worker metrics (task durations, queue depth) from the main worker process."""
+    if not settings.worker_metrics_port:
+        return
+    queue = sender.app.conf.task_default_queue if sender is not None else "celery"
+    register_collector(CeleryQueueCollector(settings.redis_url, [queue]))
+    start_exporter(settings.worker_metrics_port)
+
+
+@task_prerun.connect  # type: ignore[untyped-decorator]
+def _record_task_start(task_id: str | None = None, **_: Any) -> None:
+    if task_id is not None:
+        _task_starts[task_id] = time.perf_counter()
+
+
+@task_postrun.connect  # type: ignore[untyped-decorator]
+def _record_task_duration(
+    task_id: str | None = None, task: Any = None, state: str | None = None, **_: Any
+) -> None:
+    start = _task_starts.pop(task_id, None) if task_id is not None else None
+    if start is None or task is None:
+        return
+    CELERY_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - start)
+
+
+@worker_process_shutdown.connect  # type: ignore[untyped-decorator]
+def _mark_process_dead(pid: int | None = None, **_: Any) -> None:
+    """Drop this child's live gauges from the multi-process metric files."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())  # type: ignore[no-untyped-call]
+
+
+@worker_process_shutdown.connect  # type: ignore[untyped-decorator]
+@worker_shutdown.connect  # type: ignore[untyped-decorator]
+def _close_worker_resources(**_: Any) -> None:
+    """Close pooled LLM clients and PDF extraction workers.
+
+    Runs in prefork children and in the main process; the main-process hook
+    covers the solo/threads pools, which run tasks there.
+    """
+    shutdown_loop()
+    shutdown_pdf_pool()
@@ -0,0 +1,424 @@
+"""Tests for two-tier paper analysis (abstract pass, then full text on demand)."""
+
+import asyncio
+import functools
+import json
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import Update
+from sqlalchemy.dialects import postgresql
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.models.paper import Paper, PaperChunkSummary, PaperStage, PaperText
+from daily_ai_papers.services import analysis
+from daily_ai_papers.services.parser import pdf_cache, pdf_pool
+from daily_ai_papers.services.text_store import load_full_text
+from tests.conftest import SAMPLE_ABSTRACT
+
+fitz = pytest.importorskip("fitz", reason="PyMuPDF not installed")
+
+
+def _db() -> AsyncMock:
+    """A session whose get() returns whatever was last added.
+
+    Every select() returns the stored chunk summaries; adding one replaces
+    the summary at the same index.
+    """
+    rows: dict[tuple[type, Any], Any] = {}
+
+    def add(row: Any) -> None:
+        if isinstance(row, PaperStage):
+            key = (row.paper_id, row.stage)
+        elif isinstance(row, PaperChunkSummary):
+            key = (row.paper_id, row.chunk_index)
+        else:
+            key = row.paper_id
+        rows[type(row), key] = row
+
+    def chunks() -> list[PaperChunkSummary]:
+        found = [row for (model, _), row in rows.items() if model is PaperChunkSummary]
+        return sorted(found, key=lambda row: row.chunk_index)
+
+    result = MagicMock()
+    result.scalars.return_value.all.side_effect = chunks
+    db = AsyncMock()
+    db.get.side_effect = lambda model, key: rows.get((model, key))
+    db.add = MagicMock(side_effect=add)
+    db.execute.return_value = result
+    return db
+
+
+def _paper(**overrides: Any) -> Paper:
+    fields: dict[str, Any] = dict(
+        id=1,
+        source="arxiv",
+        source_id="1706.03762",
+        title="Attention Is All You Need",
+        abstract=SAMPLE_ABSTRACT,
+        pdf_url="https://arxiv.org/pdf/1706.03762",
+        categories=["cs.CL"],
+        status="crawled",
+    )
+    fields.update(overrides)
+    return Paper(**fields)
+
+
+@pytest.fixture(autouse=True)
+def _use_fake_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_api_key", "")
+
+
+@pytest.fixture
+def llm_calls() -> Iterator[AsyncMock]:
+    from daily_ai_papers.services.llm_client import llm_complete
+
+    with patch(
+        "daily_ai_papers.services.parser.metadata_extractor.llm_complete",
+        AsyncMock(wraps=llm_complete),
+    ) as mock:
+        yield mock
+
+
+class TestAbstractTier:
+    @pytest.mark.asyncio
+    async def test_fills_summary_and_keywords_only(self, llm_calls: AsyncMock) -> None:
+        paper = _paper()
+        assert await analysis.analyze_abstract(_db(), paper)
+        assert paper.summary and paper.keywords
+        assert paper.contributions is None
+        assert paper.status == "summarized"
+        assert llm_calls.call_args.kwargs["stage"] == "abstract"
+
+    @pytest.mark.asyncio
+    async def test_uses_abstract_model(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "llm_abstract_model", "cheap-model")
+        await analysis.analyze_abstract(_db(), _paper())
+        assert llm_calls.call_args.kwargs["model"] == "cheap-model"
+
+    @pytest.mark.asyncio
+    async def test_skips_unchanged_and_missing_abstract(self, llm_calls: AsyncMock) -> None:
+        db = _db()
+        paper = _paper()
+        assert await analysis.analyze_abstract(db, paper)
+        assert not await analysis.analyze_abstract(db, paper)
+        assert not await analysis.analyze_abstract(db, _paper(id=2, abstract=None))
+        assert llm_calls.call_count == 1
+
+
+class TestClaimFullAnalysis:
+    @staticmethod
+    async def _claim(rowcount: int = 1, **kwargs: Any) -> tuple[bool, str]:
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(rowcount=rowcount)
+        claimed = await analysis.claim_full_analysis(db, 1, **kwargs)
+        stmt = db.execute.call_args.args[0]
+        sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        return claimed, " ".join(str(sql).split())
+
+    @pytest.mark.asyncio
+    async def test_conditional_update(self) -> None:
+        claimed, sql = await self._claim()
+        assert claimed
+        assert sql.startswith("UPDATE papers SET status='downloading'")
+        assert "papers.pdf_url IS NOT NULL" in sql
+        assert "'failed'" in sql.split("NOT IN")[1].split(")")[0]
+        assert "papers.status = 'downloading' AND papers.updated_at <" in sql  # Lost tasks
+
+    @pytest.mark.asyncio
+    async def test_not_claimed_when_no_row_matches(self) -> None:
+        claimed, _ = await self._claim(rowcount=0)
+        assert not claimed
+
+    @pytest.mark.asyncio
+    async def test_retry_failed(self) -> None:
+        _, sql = await self._claim()
+        assert "papers.status = 'failed'" not in sql
+        _, sql = await self._claim(retry_failed=True)
+        assert "papers.status = 'failed'" in sql
+
+
+class TestPriority:
+    def test_priority_categories(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert not analysis.is_priority(_paper())
+        monkeypatch.setattr(settings, "analysis_priority_categories", "cs.LG, cs.CL")
+        assert analysis.is_priority(_paper())
+        assert not analysis.is_priority(_paper(categories=["cs.CV"]))
+
+
+class TestFullTextTier:
+    @pytest.fixture(autouse=True)
+    def _pdf(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "Attention Is All You Need", fontsize=18)
+        page.insert_text((72, 120), "1 Introduction", fontsize=11)
+        page.insert_text((72, 140), "Recurrent models dominate sequence transduction.")
+        page = doc.new_page()
+        page.insert_text((72, 72), "References", fontsize=11)
+        page.insert_text((72, 92), "[1] A. Vaswani et al. Attention is all you need.")
+        pdf = doc.tobytes()
+        doc.close()
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=pdf))
+        monkeypatch.setattr(
+            httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=transport)
+        )
+        monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path / "pdfs"))
+        monkeypatch.setattr(settings, "full_text_blob_dir", str(tmp_path / "text"))
+        monkeypatch.setattr(settings, "pdf_workers", 1)
+        monkeypatch.setattr(pdf_cache, "_cache", None)
+        yield
+        pdf_pool.shutdown_pdf_pool()
+
+    @pytest.mark.asyncio
+    async def test_fills_full_analysis_and_stores_text(self, llm_calls: AsyncMock) -> None:
+        db = _db()
+        paper = _paper(status="downloading")
+        assert await analysis.analyze_full_text(db, paper)
+        assert paper.status == "analyzed"
+        assert paper.contributions and paper.methodology and paper.results
+        assert llm_calls.call_args.kwargs["stage"] == "extraction"
+        assert isinstance(await db.get(PaperText, 1), PaperText)
+
+    @pytest.mark.asyncio
+    async def test_rerun_skips_extraction_and_llm(self, llm_calls: AsyncMock) -> None:
+        db = _db()
+        await analysis.analyze_full_text(db, _paper())
+        with patch.object(pdf_pool, "extract_partial") as extract:
+            assert not await analysis.analyze_full_text(db, _paper())
+        extract.assert_not_called()
+        assert llm_calls.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_model_change_reanalyzes_from_stored_text(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        db = _db()
+        await analysis.analyze_full_text(db, _paper())
+        monkeypatch.setattr(settings, "llm_model", "another-model")
+        with patch.object(pdf_pool, "extract_partial") as extract:
+            assert await analysis.analyze_full_text(db, _paper())
+        extract.assert_not_called()
+        assert "Recurrent models" in llm_calls.call_args.kwargs["context"]
+
+    @pytest.mark.asyncio
+    async def test_budget_mode_stops_before_references(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        db = _db()
+        extract_partial = AsyncMock(wraps=pdf_pool.extract_partial)
+        monkeypatch.setattr(pdf_pool, "extract_partial", extract_partial)
+        await analysis.analyze_full_text(db, _paper())
+        assert extract_partial.await_count == 1
+        assert "Vaswani" not in (await load_full_text(db, 1) or "")
+
+        monkeypatch.setattr(settings, "llm_extraction_mode", "map_reduce")
+        extract_document = AsyncMock(wraps=pdf_pool.extract_document)
+        monkeypatch.setattr(pdf_pool, "extract_document", extract_document)
+        await analysis.analyze_full_text(db, _paper())  # Extracted again, in full
+        assert extract_document.await_count == 1
+        assert "Vaswani" in (await load_full_text(db, 1) or "")
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_stores_chunk_summaries(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "llm_extraction_mode", "map_reduce")
+        monkeypatch.setattr(settings, "llm_context_budget_tokens", 5)
+        db = _db()
+        await analysis.analyze_full_text(db, _paper())
+        stored = await analysis.load_chunk_summaries(db, 1)
+        assert stored and "28.4 BLEU" in stored[0].summary
+
+        monkeypatch.setattr(settings, "llm_context_budget_tokens", 6)  # Reanalyze
+        calls = llm_calls.call_count
+        assert await analysis.analyze_full_text(db, _paper())
+        assert llm_calls.call_count == calls + 1  # Only the reduce call
+
+
+class TestQueueingEndpoints:
+    @staticmethod
+    def _db(paper: Paper | None) -> AsyncMock:
+        """A session that applies the claim's conditional UPDATE to ``paper``.
+
+        The check and the write happen without an await in between, so like
+        the database only one of several concurrent claims matches the row.
+        A rollback undoes the uncommitted claim.
+        """
+        committed = paper.status if paper else None
+
+        async def execute(stmt: Any) -> MagicMock:
+            result = MagicMock()
+            result.scalar_one.return_value = result.scalar_one_or_none.return_value = paper
+            if isinstance(stmt, Update):
+                claimable = paper is not None and paper.status not in (
+                    *analysis.FULL_TEXT_STATUSES,
+                    "failed",
+                )
+                if claimable and paper is not None:
+                    paper.status = "downloading"
+                result.rowcount = int(claimable)
+            return result
+
+        async def commit() -> None:
+            nonlocal committed
+            committed = paper.status if paper else None
+
+        async def rollback() -> None:
+            if paper is not None and committed is not None:
+                paper.status = committed
+
+        db = AsyncMock()
+        db.execute.side_effect = execute
+        db.commit.side_effect = commit
+        db.rollback.side_effect = rollback
+        return db
+
+    @staticmethod
+    async def _request(
+        api_client: AsyncClient, db: AsyncMock, method: str, path: str
+    ) -> httpx.Response:
+        from daily_ai_papers.database import get_db
+        from daily_ai_papers.main import app
+
+        async def override_get_db():  # type: ignore[no-untyped-def]
+            yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            return await api_client.request(method, path)
+        finally:
+            app.dependency_overrides.clear()
+
+    @staticmethod
+    def _viewable() -> Paper:
+        now = datetime.now(UTC)
+        return _paper(status="summarized", created_at=now, updated_at=now, authors=[])
+
+    @pytest.fixture
+    def task(self) -> Iterator[MagicMock]:
+        with patch("daily_ai_papers.tasks.parse_tasks.analyze_paper_full_text") as task:
+            task.delay.return_value.id = "task-1"
+            yield task
+
+    @pytest.mark.asyncio
+    async def test_dispatches_once(self, api_client: AsyncClient, task: MagicMock) -> None:
+        db = self._db(_paper(status="summarized"))
+        first = await self._request(api_client, db, "POST", "/api/v1/papers/1/analyze")
+        second = await self._request(api_client, db, "POST", "/api/v1/papers/1/analyze")
+        assert first.json() == {"paper_id": "1", "status": "dispatched", "task_id": "task-1"}
+        assert second.json() == {"paper_id": "1", "status": "downloading"}
+        task.delay.assert_called_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_missing_paper_returns_404(self, api_client: AsyncClient) -> None:
+        response = await self._request(
+            api_client, self._db(None), "POST", "/api/v1/papers/1/analyze"
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_concurrent_views_dispatch_once(
+        self, api_client: AsyncClient, task: MagicMock
+    ) -> None:
+        db = self._db(self._viewable())
+        responses = await asyncio.gather(
+            *(self._request(api_client, db, "GET", "/api/v1/papers/1") for _ in range(5))
+        )
+        assert all(r.status_code == 200 for r in responses)
+        task.delay.assert_called_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_broker_failure_leaves_paper_queueable(
+        self, api_client: AsyncClient, task: MagicMock
+    ) -> None:
+        paper = self._viewable()
+        db = self._db(paper)
+        task.delay.side_effect = ConnectionError("broker down")
+
+        view = await self._request(api_client, db, "GET", "/api/v1/papers/1")
+        assert view.status_code == 200
+        assert view.json()["title"] == paper.title
+        analyze = await self._request(api_client, db, "POST", "/api/v1/papers/1/analyze")
+        assert analyze.status_code == 503
+        assert paper.status == "summarized"
+        db.commit.assert_not_awaited()
+
+        task.delay.side_effect = None  # Broker back
+        analyze = await self._request(api_client, db, "POST", "/api/v1/papers/1/analyze")
+        assert analyze.json()["status"] == "dispatched"
+        assert paper.status == "downloading"
+
+
+class TestPackedAbstracts:
+    @staticmethod
+    def _papers(n: int) -> dict[str, tuple[str, str]]:
+        return {f"p{i}": (f"Paper {i}", f"We study problem {i}.") for i in range(n)}
+
+    @pytest.mark.asyncio
+    async def test_packs_requests(self, llm_calls: AsyncMock) -> None:
+        from daily_ai_papers.services.parser.metadata_extractor import (
+            extract_abstract_metadata_many,
+        )
+
+        results = await extract_abstract_metadata_many(self._papers(5), pack_size=2)
+        assert llm_calls.call_count == 3
+        assert set(results) == {f"p{i}" for i in range(5)}
+        assert "Paper 3" in results["p3"].summary
+
+    @pytest.mark.asyncio
+    async def test_falls_back_for_missing_and_malformed_items(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from daily_ai_papers.services.parser import metadata_extractor
+
+        packed = json.dumps(
+            {
+                "papers": [
+                    {"id": "p0", "summary": "Fine.", "keywords": ["a"]},
+                    {"id": "p1", "summary": "", "keywords": ["b"]},
+                    {"id": "unknown", "summary": "Stray.", "keywords": []},
+                ]
+            }
+        )
+        single = '{"summary": "Single.", "keywords": []}'
+        complete = AsyncMock(side_effect=[packed, single, single])
+        monkeypatch.setattr(metadata_extractor, "llm_complete", complete)
+        fallback = REGISTRY.get_sample_value(
+            "llm_packed_items_total", {"kind": "abstract", "result": "fallback"}
+        )
+
+        results = await metadata_extractor.extract_abstract_metadata_many(self._papers(3))
+        assert results["p0"].summary == "Fine."
+        assert results["p1"].summary == results["p2"].summary == "Single."
+        assert complete.call_count == 3
+        after = REGISTRY.get_sample_value(
+            "llm_packed_items_total", {"kind": "abstract", "result": "fallback"}
+        )
+        assert after == (fallback or 0.0) + 2
+
+    def test_fingerprint_covers_packed_prompt(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        from daily_ai_papers.services.parser import metadata_extractor
+
+        base = metadata_extractor.abstract_fingerprint("Paper", SAMPLE_ABSTRACT)
+        monkeypatch.setattr(metadata_extractor, "PACKED_ABSTRACT_PROMPT", "Summarize each paper.")
+        assert metadata_extractor.abstract_fingerprint("Paper", SAMPLE_ABSTRACT) != base
+
+    @pytest.mark.asyncio
+    async def test_analyze_abstracts_skips_unchanged(self, llm_calls: AsyncMock) -> None:
+        db = _db()
+        papers = [_paper(id=i, source_id=str(i)) for i in range(1, 4)]
+        assert await analysis.analyze_abstracts(db, [*papers, _paper(id=9, abstract=None)]) == 3
+        assert all(p.status == "summarized" and p.summary for p in papers)
+        assert await analysis.analyze_abstracts(db, papers) == 0
+        assert llm_calls.call_count == 1
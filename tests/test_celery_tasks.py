@@ -98,3 +98,34 @@ class TestCrawlAllSources:
 
         result = crawl_all_sources()
         assert result == {"new_papers": 0}
+
+
+class TestWorkerEventLoop:
+    """Test the per-process event loop used by LLM-bound tasks."""
+
+    def test_run_async_reuses_loop(self) -> None:
+        import asyncio
+
+        from daily_ai_papers.tasks.runner import run_async, shutdown_loop
+
+        async def current_loop() -> asyncio.AbstractEventLoop:
+            return asyncio.get_running_loop()
+
+        try:
+            assert run_async(current_loop()) is run_async(current_loop())
+        finally:
+            shutdown_loop()
+
+    def test_shutdown_closes_loop_and_is_idempotent(self) -> None:
+        import asyncio
+
+        from daily_ai_papers.tasks import runner
+
+        async def current_loop() -> asyncio.AbstractEventLoop:
+            return asyncio.get_running_loop()
+
+        loop = runner.run_async(current_loop())
+        runner.shutdown_loop()
+        runner.shutdown_loop()
+        assert loop.is_closed()
+        assert runner._loop is None
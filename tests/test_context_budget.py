@@ -0,0 +1,254 @@
+"""Tests for token counting and token-budgeted section selection."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import tokenizer
+from daily_ai_papers.services.parser.context_budget import (
+    Section,
+    chunk_sections,
+    fit_to_budget,
+    split_sections,
+)
+from daily_ai_papers.services.parser.metadata_extractor import (
+    CHUNK_PROMPT,
+    chunk_fingerprint,
+    extract_metadata,
+)
+from daily_ai_papers.services.parser.pdf_structure import PaperDocument
+from daily_ai_papers.services.tokenizer import count_tokens, truncate_to_tokens
+
+MODEL = "test-model"
+
+PAPER = "\n".join(
+    [
+        "Attention Is All You Need",
+        "Ashish Vaswani, Noam Shazeer",
+        "Abstract",
+        "We propose the Transformer. " * 20,
+        "1 Introduction",
+        "Recurrent models dominate sequence modelling. " * 40,
+        "2 Background",
+        "Prior work reduced sequential computation. " * 80,
+        "3 Model Architecture",
+        "The encoder maps an input sequence to representations. " * 80,
+        "4 Results",
+        "The big model reaches 28.4 BLEU on WMT 2014. " * 30,
+        "5 Conclusion",
+        "We presented the first sequence transduction model based on attention. " * 10,
+        "References",
+        "[1] Some cited paper. " * 100,
+    ]
+)
+
+
+@pytest.fixture(autouse=True)
+def _estimate_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use the character estimate so results don't depend on tiktoken being installed."""
+    monkeypatch.setattr(tokenizer, "_encoding", lambda model: None)
+    tokenizer.clear_token_cache()
+
+
+class TestTokenizer:
+    def test_estimate(self) -> None:
+        assert count_tokens("a" * 400, MODEL) == 100
+        assert count_tokens("注意力机制", MODEL) == 5
+
+    def test_truncate_to_tokens(self) -> None:
+        text = "word " * 500
+        cut = truncate_to_tokens(text, 50, MODEL)
+        assert count_tokens(cut, MODEL) <= 50
+        assert text.startswith(cut)
+        assert truncate_to_tokens("short", 50, MODEL) == "short"
+
+    def test_truncate_never_splits_a_character(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        class ByteEncoding:
+            """One token per UTF-8 byte, like a byte-level BPE at its worst."""
+
+            def encode(self, text: str, **kwargs: object) -> list[int]:
+                return list(text.encode())
+
+            def decode_bytes(self, tokens: list[int]) -> bytes:
+                return bytes(tokens)
+
+        monkeypatch.setattr(tokenizer, "_encoding", lambda model: ByteEncoding())
+        text = "注意力机制"  # Three bytes per character
+        for max_tokens in range(1, 16):
+            cut = truncate_to_tokens(text, max_tokens, MODEL)
+            assert text.startswith(cut)
+            assert len(cut) == max_tokens // 3
+
+    def test_count_cache_is_bounded_and_keyed_by_digest(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(tokenizer, "_COUNT_CACHE_SIZE", 2)
+        for text in ("one " * 1000, "two", "three"):
+            count_tokens(text, MODEL)
+        assert len(tokenizer._counts) == 2
+        assert all(len(digest) == 16 for digest, _ in tokenizer._counts)
+
+
+class TestSplitSections:
+    def test_detects_headings(self) -> None:
+        kinds = [s.kind for s in split_sections(PAPER)]
+        assert kinds == [
+            "front",
+            "abstract",
+            "introduction",
+            "related",
+            "method",
+            "results",
+            "conclusion",
+            "references",
+        ]
+
+    def test_wrapped_body_lines_are_not_headings(self) -> None:
+        text = "Intro text\nResults show that the model\nis better.\nModel quality improves"
+        assert [s.kind for s in split_sections(text)] == ["front"]
+
+
+class TestFitToBudget:
+    def test_short_text_unchanged(self) -> None:
+        result = fit_to_budget("A short abstract.", 1000, MODEL)
+        assert result.text == "A short abstract."
+        assert not result.truncated
+
+    def test_keeps_high_value_sections_in_document_order(self) -> None:
+        result = fit_to_budget(PAPER, 1500, MODEL)
+        assert result.truncated
+        assert result.tokens <= 1500
+        assert result.sections[:3] == ["front", "abstract", "introduction"]
+        assert "conclusion" in result.sections
+        assert "results" in result.sections
+        assert "references" not in result.sections
+        assert result.text.index("1 Introduction") < result.text.index("5 Conclusion")
+
+    def test_fills_remainder_with_partial_section(self) -> None:
+        result = fit_to_budget(PAPER, 2500, MODEL)
+        assert result.tokens <= 2500
+        assert result.tokens > 2500 - 64 - 10
+
+
+class TestChunkSections:
+    def test_chunks_cover_all_sections_within_limit(self) -> None:
+        chunks = chunk_sections(PAPER, 600, MODEL)
+        assert len(chunks) > 1
+        assert all(c.tokens <= 600 for c in chunks)
+        kinds = [kind for c in chunks for kind in c.sections]
+        assert kinds[0] == "front" and kinds[-1] == "conclusion"
+        assert "references" not in kinds
+        joined = "\n".join(c.text for c in chunks)
+        assert "28.4 BLEU" in joined and "[1] Some cited paper" not in joined
+
+    def test_packs_small_sections_together(self) -> None:
+        chunks = chunk_sections(PAPER, 100_000, MODEL)
+        assert len(chunks) == 1
+        assert chunks[0].sections == [
+            "front",
+            "abstract",
+            "introduction",
+            "related",
+            "method",
+            "results",
+            "conclusion",
+        ]
+
+
+class TestExtractMetadataBudget:
+    @pytest.mark.asyncio
+    async def test_prompt_respects_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_context_budget_tokens", 1000)
+        with patch(
+            "daily_ai_papers.services.parser.metadata_extractor.llm_complete",
+            new_callable=AsyncMock,
+            return_value='{"summary": "s"}',
+        ) as mock:
+            meta = await extract_metadata(PAPER)
+
+        context = mock.await_args.kwargs["context"]
+        assert meta.summary == "s"
+        assert "5 Conclusion" in context
+        assert "[1] Some cited paper" not in context
+        assert count_tokens(context, MODEL) < 1000 + 200
+
+    @pytest.mark.asyncio
+    async def test_structured_document_never_sends_references(self) -> None:
+        doc = PaperDocument(
+            title="T",
+            sections=[
+                Section("", "front", 0, "Title"),
+                Section("Abstract", "abstract", 0, "Abstract\nWe propose X."),
+                Section("References", "references", -1, "References\n[1] Cited."),
+            ],
+        )
+        with patch(
+            "daily_ai_papers.services.parser.metadata_extractor.llm_complete",
+            new_callable=AsyncMock,
+            return_value='{"summary": "s"}',
+        ) as mock:
+            await extract_metadata(doc)
+
+        context = mock.await_args.kwargs["context"]
+        assert "We propose X." in context
+        assert "[1] Cited." not in context
+
+
+class TestExtractMetadataMapReduce:
+    @pytest.fixture(autouse=True)
+    def _map_reduce(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_extraction_mode", "map_reduce")
+        monkeypatch.setattr(settings, "llm_context_budget_tokens", 1000)
+        monkeypatch.setattr(settings, "llm_chunk_tokens", 600)
+
+    @staticmethod
+    async def _complete(prompt: str, **kwargs: object) -> str:
+        if prompt == CHUNK_PROMPT:
+            return f"notes on {len(str(kwargs['context']))} chars"
+        return '{"summary": "s", "results": "28.4 BLEU"}'
+
+    @pytest.mark.asyncio
+    async def test_long_paper_is_mapped_then_reduced(self) -> None:
+        chunks = chunk_sections(PAPER, 600, MODEL)
+        with patch(
+            "daily_ai_papers.services.parser.metadata_extractor.llm_complete",
+            new=AsyncMock(side_effect=self._complete),
+        ) as mock:
+            meta = await extract_metadata(PAPER)
+
+        assert mock.await_count == len(chunks) + 1
+        reduce_context = mock.await_args.kwargs["context"]
+        assert f"[Part {len(chunks)} of {len(chunks)}: " in reduce_context
+        assert meta.results == "28.4 BLEU"
+        assert len(meta.chunk_summaries) == len(chunks)
+        assert meta.chunk_summaries[-1].sections[-1] == "conclusion"
+
+    @pytest.mark.asyncio
+    async def test_cached_chunks_are_not_resent(self) -> None:
+        chunks = chunk_sections(PAPER, 600, MODEL)
+        cached = {chunk_fingerprint(c.text): "cached notes" for c in chunks[1:]}
+        with patch(
+            "daily_ai_papers.services.parser.metadata_extractor.llm_complete",
+            new=AsyncMock(side_effect=self._complete),
+        ) as mock:
+            meta = await extract_metadata(PAPER, cached_chunks=cached)
+
+        assert mock.await_count == 2
+        assert [s.summary for s in meta.chunk_summaries[1:]] == ["cached notes"] * (len(chunks) - 1)
+
+    @pytest.mark.asyncio
+    async def test_short_paper_uses_single_call(self) -> None:
+        with patch(
+            "daily_ai_papers.services.parser.metadata_extractor.llm_complete",
+            new=AsyncMock(side_effect=self._complete),
+        ) as mock:
+            meta = await extract_metadata("Abstract\nWe propose X.")
+        assert mock.await_count == 1
+        assert meta.chunk_summaries == []
+
+    @pytest.mark.asyncio
+    async def test_unsupported_mode(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_extraction_mode", "refine")
+        with pytest.raises(ValueError, match="Unsupported extraction mode"):
+            await extract_metadata(PAPER)
@@ -11,12 +11,15 @@ This ensures:
 - CI can run all tests without any secrets configured
 """
 
-import os
+import asyncio
+import time
 
 import pytest
 
 from daily_ai_papers.config import settings
+from daily_ai_papers.services import fake_llm, llm_scheduler
 from daily_ai_papers.services.crawler.arxiv import ArxivCrawler
+from daily_ai_papers.services.fake_llm import FakeLLM, FakeLLMError
 from daily_ai_papers.services.llm_client import llm_complete, parse_json_response
 from daily_ai_papers.services.parser.metadata_extractor import extract_metadata
 from daily_ai_papers.services.parser.pdf_extractor import download_pdf, extract_text_from_pdf
@@ -49,6 +52,103 @@ class TestFakeLLMClient:
         print(f"\n  Fake JSON: {data}")
 
 
+class TestFakeProviderSimulation:
+    """Latency, capacity and fault injection of the fake provider."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_state(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(fake_llm, "_fake_llm", None)
+        monkeypatch.setattr(llm_scheduler, "_scheduler", None)
+
+    def test_seeded_latency_is_reproducible(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_seed", 42)
+        monkeypatch.setattr(settings, "fake_llm_first_token_ms", 100.0)
+        monkeypatch.setattr(settings, "fake_llm_latency_distribution", "lognormal")
+
+        def draws(sim: FakeLLM) -> list[float]:
+            return [sim.first_token_delay(sim._rng("same request")) for _ in range(5)]
+
+        first = draws(FakeLLM())
+        assert first == draws(FakeLLM())
+        assert len(set(first)) == 5  # repeats of a request get fresh draws
+
+    def test_send_counts_are_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_seed", 42)
+        monkeypatch.setattr(fake_llm, "_MAX_TRACKED", 2)
+        sim = FakeLLM()
+        for request in ("a", "b", "a", "c"):
+            sim._rng(request)
+        assert list(sim._sent.values()) == [2, 1]  # "b" was least recently sent
+
+    def test_unknown_distribution_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_latency_distribution", "pareto")
+        with pytest.raises(ValueError, match="Unsupported fake LLM latency distribution"):
+            FakeLLM().first_token_delay(FakeLLM()._random)
+
+    @pytest.mark.asyncio
+    async def test_completion_is_paced(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_first_token_ms", 20.0)
+        monkeypatch.setattr(settings, "fake_llm_tokens_per_second", 1000.0)
+        start = time.perf_counter()
+        tokens = await FakeLLM().complete("request", "word " * 50)
+        assert tokens == 50
+        assert time.perf_counter() - start >= 0.02 + 0.049
+
+    @pytest.mark.asyncio
+    async def test_injected_429_is_retried_by_scheduler(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "fake_llm_rate_limit_rate", 1.0)
+        monkeypatch.setattr(settings, "fake_llm_retry_after", 0.0)
+        monkeypatch.setattr(settings, "llm_rate_limit_retries", 2)
+        sent: list[str] = []
+        original = FakeLLM.complete
+
+        async def counting(self: FakeLLM, request: str, text: str) -> int:
+            sent.append(request)
+            return await original(self, request, text)
+
+        monkeypatch.setattr(FakeLLM, "complete", counting)
+        with pytest.raises(FakeLLMError) as info:
+            await llm_complete("hi", use_cache=False)
+        assert info.value.status_code == 429
+        assert len(sent) == 3
+
+    @pytest.mark.asyncio
+    async def test_server_error_raised_after_retries(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_server_error_rate", 1.0)
+        monkeypatch.setattr(llm_scheduler, "_RETRY_BACKOFF", 0.0)
+        with pytest.raises(FakeLLMError, match="500"):
+            await llm_complete("hi", use_cache=False)
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_timeout_rate", 1.0)
+        monkeypatch.setattr(settings, "llm_timeout", 0.01)
+        monkeypatch.setattr(llm_scheduler, "_RETRY_BACKOFF", 0.0)
+        with pytest.raises(TimeoutError):
+            await llm_complete("hi", use_cache=False)
+
+    @pytest.mark.asyncio
+    async def test_capacity_limits(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_first_token_ms", 50.0)
+        monkeypatch.setattr(settings, "fake_llm_max_concurrency", 1)
+        sim = FakeLLM()
+        results = await asyncio.gather(
+            sim.complete("a", "x"), sim.complete("b", "x"), return_exceptions=True
+        )
+        assert results[0] == 1
+        assert isinstance(results[1], FakeLLMError) and results[1].status_code == 529
+
+        monkeypatch.setattr(settings, "fake_llm_max_concurrency", 0)
+        monkeypatch.setattr(settings, "fake_llm_first_token_ms", 0.0)
+        monkeypatch.setattr(settings, "fake_llm_rpm", 1)
+        with pytest.raises(FakeLLMError) as info:
+            await sim.complete("c", "x")
+        assert info.value.status_code == 429
+        assert float(info.value.response.headers["retry-after-ms"]) > 0
+
+
 class TestFakeMetadataExtraction:
     """Test metadata extraction with fake LLM."""
 
@@ -105,12 +205,9 @@ class TestFakeE2EPipeline:
 
         # Step 2: Download & parse PDF (real download)
         pdf_path = await download_pdf(paper.pdf_url)
-        try:
-            text = extract_text_from_pdf(pdf_path)
-            assert len(text) > 1000
-            print(f"  [Step 2] Extracted {len(text):,} chars")
-        finally:
-            os.unlink(pdf_path)
+        text = extract_text_from_pdf(pdf_path)
+        assert len(text) > 1000
+        print(f"  [Step 2] Extracted {len(text):,} chars")
 
         # Step 3: LLM metadata extraction (fake)
         meta = await extract_metadata(text)
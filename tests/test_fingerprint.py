@@ -0,0 +1,80 @@
+"""Tests for per-stage input fingerprints."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from prometheus_client import REGISTRY
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.models.paper import PaperStage
+from daily_ai_papers.services.fingerprint import needs_run, record_run
+from daily_ai_papers.services.parser import metadata_extractor
+from daily_ai_papers.services.parser.metadata_extractor import analysis_fingerprint
+from daily_ai_papers.services.parser.pdf_structure import extraction_fingerprint
+
+SHA = "ab" * 32
+
+
+def _db() -> AsyncMock:
+    """A session whose get() returns whatever was last added."""
+    rows: dict[tuple[int, str], PaperStage] = {}
+    db = AsyncMock()
+    db.get.side_effect = lambda model, key: rows.get(key)
+    db.add = MagicMock(side_effect=lambda row: rows.__setitem__((row.paper_id, row.stage), row))
+    return db
+
+
+def _runs(stage: str, result: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "pipeline_stage_runs_total", {"stage": stage, "result": result}
+    )
+    return value or 0.0
+
+
+class TestStageFingerprints:
+    def test_analysis_changes_with_prompt_and_model(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        base = analysis_fingerprint(SHA)
+        assert analysis_fingerprint(SHA) == base
+        assert analysis_fingerprint("cd" * 32) != base
+        monkeypatch.setattr(metadata_extractor, "EXTRACTION_PROMPT", "Summarize the paper.")
+        edited = analysis_fingerprint(SHA)
+        assert edited != base
+        monkeypatch.setattr(settings, "llm_model", "another-model")
+        assert analysis_fingerprint(SHA) not in (base, edited)
+
+    def test_stages_do_not_collide(self) -> None:
+        assert extraction_fingerprint(SHA) != analysis_fingerprint(SHA)
+
+
+class TestNeedsRun:
+    @pytest.mark.asyncio
+    async def test_skips_unchanged_inputs(self) -> None:
+        db = _db()
+        current = analysis_fingerprint(SHA)
+        assert await needs_run(db, 1, "analyze", current)
+        await record_run(db, 1, "analyze", current)
+
+        skipped = _runs("analyze", "skipped")
+        assert not await needs_run(db, 1, "analyze", current)
+        assert _runs("analyze", "skipped") == skipped + 1
+        assert await needs_run(db, 2, "analyze", current)
+
+    @pytest.mark.asyncio
+    async def test_changed_inputs_rerun_and_update(self) -> None:
+        db = _db()
+        await record_run(db, 1, "analyze", "old")
+        assert await needs_run(db, 1, "analyze", "new")
+        await record_run(db, 1, "analyze", "new")
+        assert db.add.call_count == 1
+        assert not await needs_run(db, 1, "analyze", "new")
+
+    @pytest.mark.asyncio
+    async def test_force_stages(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        db = _db()
+        await record_run(db, 1, "translate:zh", "fp")
+        await record_run(db, 1, "extract", "fp")
+        monkeypatch.setattr(settings, "pipeline_force_stages", "analyze, translate")
+        assert await needs_run(db, 1, "translate:zh", "fp")
+        assert not await needs_run(db, 1, "extract", "fp")
+        monkeypatch.setattr(settings, "pipeline_force_stages", "all")
+        assert await needs_run(db, 1, "extract", "fp")
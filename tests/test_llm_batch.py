@@ -0,0 +1,205 @@
+"""Tests for offline batch mode, run against the local stand-in batch server."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.models.paper import Paper
+from daily_ai_papers.services.llm_batch import (
+    BatchError,
+    BatchRequest,
+    BatchResult,
+    LLMBatcher,
+    LocalBatchServer,
+    OpenAIBatchBackend,
+    batch_mode,
+    build_openai_jsonl,
+    get_batch_backend,
+    parse_openai_output,
+)
+from daily_ai_papers.services.llm_client import llm_complete
+from daily_ai_papers.services.parser.metadata_extractor import extract_metadata
+from daily_ai_papers.services.translator import translate_text
+from daily_ai_papers.tasks import parse_tasks
+
+from .conftest import SAMPLE_ABSTRACT
+
+
+@pytest.fixture(autouse=True)
+def _use_fake_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_api_key", "")
+    monkeypatch.setattr(settings, "llm_batch_linger_seconds", 0.01)
+    monkeypatch.setattr(settings, "llm_batch_poll_interval", 0.01)
+
+
+def _request(custom_id: str, prompt: str = "What is 2+3?") -> BatchRequest:
+    return BatchRequest(custom_id, "m", "sys", prompt, 0.0, 100, False)
+
+
+class TestJsonl:
+    def test_build_openai_jsonl(self) -> None:
+        lines = build_openai_jsonl([_request("a"), _request("b")]).decode().splitlines()
+        first = json.loads(lines[0])
+        assert len(lines) == 2
+        assert first["custom_id"] == "a"
+        assert first["url"] == "/v1/chat/completions"
+        assert first["body"]["messages"][0] == {"role": "system", "content": "sys"}
+
+    def test_parse_output_success_and_error(self) -> None:
+        ok = {
+            "custom_id": "a",
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"content": "hi"}}],
+                    "usage": {"prompt_tokens": 3, "completion_tokens": 1},
+                },
+            },
+            "error": None,
+        }
+        failed = {
+            "custom_id": "b",
+            "response": {"status_code": 400, "body": {"error": {"message": "bad"}}},
+            "error": None,
+        }
+        results = parse_openai_output(json.dumps(ok) + "\n" + json.dumps(failed) + "\n")
+        assert results["a"] == BatchResult(text="hi", prompt_tokens=3, completion_tokens=1)
+        assert results["b"].text is None
+        assert "bad" in (results["b"].error or "")
+
+
+class TestBatchMode:
+    @pytest.mark.asyncio
+    async def test_pipeline_calls_fan_out_from_one_batch(self) -> None:
+        server = LocalBatchServer()
+        submit = AsyncMock(wraps=server.submit)
+        server.submit = submit  # type: ignore[method-assign]
+
+        async with batch_mode(server):
+            meta, zh, ja = await asyncio.gather(
+                extract_metadata(SAMPLE_ABSTRACT),
+                translate_text("Attention is all you need.", "zh"),
+                translate_text("Attention is all you need.", "ja"),
+            )
+
+        assert submit.await_count == 1
+        assert len(submit.await_args.args[0]) == 3
+        assert "Transformer" in meta.summary
+        assert any("一" <= ch <= "鿿" for ch in zh)
+        assert zh != ja
+
+    @pytest.mark.asyncio
+    async def test_max_size_splits_batches(self) -> None:
+        server = LocalBatchServer()
+        batcher = LLMBatcher(server, max_size=2, linger_seconds=0.01, poll_interval=0.01)
+        submit = AsyncMock(wraps=server.submit)
+        server.submit = submit  # type: ignore[method-assign]
+
+        kwargs = dict(system="", model="m", temperature=0.0, max_tokens=10, response_json=False)
+        results = await asyncio.gather(*(batcher.complete(f"q{i}", **kwargs) for i in range(5)))
+
+        assert results == ["5"] * 5
+        assert [len(call.args[0]) for call in submit.await_args_list] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_waits_for_processing(self) -> None:
+        server = LocalBatchServer(processing_seconds=0.05)
+        async with batch_mode(server):
+            assert await llm_complete("What is 2+3?") == "5"
+
+    @pytest.mark.asyncio
+    async def test_missing_result_raises_batch_error(self) -> None:
+        server = LocalBatchServer()
+        server.results = AsyncMock(return_value={})  # type: ignore[method-assign]
+        with pytest.raises(BatchError, match="missing"):
+            async with batch_mode(server):
+                await llm_complete("What is 2+3?")
+
+    @pytest.mark.asyncio
+    async def test_submit_failure_propagates(self) -> None:
+        server = LocalBatchServer()
+        server.submit = AsyncMock(side_effect=ConnectionError("down"))  # type: ignore[method-assign]
+        with pytest.raises(ConnectionError):
+            async with batch_mode(server):
+                await llm_complete("What is 2+3?")
+
+    @pytest.mark.asyncio
+    async def test_calls_outside_block_are_not_batched(self) -> None:
+        server = LocalBatchServer()
+        server.submit = AsyncMock(wraps=server.submit)  # type: ignore[method-assign]
+        async with batch_mode(server):
+            pass
+        assert await llm_complete("What is 2+3?") == "5"
+        server.submit.assert_not_awaited()
+
+
+class TestOpenAIBatchBackend:
+    @pytest.mark.asyncio
+    async def test_submit_poll_results(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        output = {
+            "custom_id": "a",
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "x"}}]}},
+        }
+        client = MagicMock()
+        client.files.create = AsyncMock(return_value=SimpleNamespace(id="file-1"))
+        client.batches.create = AsyncMock(return_value=SimpleNamespace(id="batch-1"))
+        client.batches.retrieve = AsyncMock(
+            return_value=SimpleNamespace(
+                status="completed", output_file_id="file-out", error_file_id=None
+            )
+        )
+        client.files.content = AsyncMock(return_value=SimpleNamespace(text=json.dumps(output)))
+        monkeypatch.setattr("daily_ai_papers.services.llm_client._get_client", lambda *args: client)
+        monkeypatch.setattr(settings, "llm_api_key", "sk-test")
+
+        backend = OpenAIBatchBackend()
+        batch_id = await backend.submit([_request("a")])
+        assert batch_id == "batch-1"
+        assert client.files.create.await_args.kwargs["purpose"] == "batch"
+        assert await backend.is_done(batch_id)
+        assert (await backend.results(batch_id))["a"].text == "x"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("provider", ["openai", "anthropic"])
+    async def test_requires_api_key(self, provider: str) -> None:
+        with pytest.raises(RuntimeError, match="LLM_API_KEY is not set"):
+            get_batch_backend(provider)
+
+
+class TestAbstractTask:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("enabled", [False, True])
+    async def test_abstract_pass_goes_through_batcher(
+        self, monkeypatch: pytest.MonkeyPatch, enabled: bool
+    ) -> None:
+        papers = [
+            Paper(id=i, source="arxiv", source_id=str(i), title=f"Paper {i}", abstract=f"We {i}.")
+            for i in range(1, 4)
+        ]
+        db = AsyncMock()
+        db.get.return_value = None
+        db.add = MagicMock()
+        db.execute.return_value = MagicMock()
+        db.execute.return_value.scalars.return_value.all.return_value = papers
+        session = MagicMock()
+        session.return_value.__aenter__.return_value = db
+        monkeypatch.setattr(parse_tasks, "async_session", session)
+        monkeypatch.setattr(settings, "llm_abstract_pack_size", 2)
+        monkeypatch.setattr(settings, "llm_batch_abstracts", enabled)
+        submit = AsyncMock(side_effect=LocalBatchServer.submit)
+        monkeypatch.setattr(LocalBatchServer, "submit", lambda *args: submit(*args))
+
+        result = await parse_tasks._analyze_abstracts([1, 2, 3])
+
+        assert result == {"papers": 3, "analyzed": 3, "full_text_queued": 0}
+        assert all(p.summary for p in papers)
+        if enabled:
+            assert submit.await_count == 1
+            assert len(submit.await_args.args[1]) == 2  # Both packs in one batch
+        else:
+            submit.assert_not_awaited()
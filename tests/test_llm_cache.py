@@ -0,0 +1,194 @@
+"""Tests for the persistent LLM completion cache."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import llm_cache
+from daily_ai_papers.services.llm_cache import RedisLLMCache, SQLiteLLMCache, cache_key
+from daily_ai_papers.services.llm_client import llm_complete, llm_stream
+
+
+class TestCacheKey:
+    def test_stable(self) -> None:
+        args = ("openai", "gpt", "sys", "prompt", 0.0, 100, False)
+        assert cache_key(*args) == cache_key(*args)
+
+    @pytest.mark.parametrize("index", range(7))
+    def test_every_input_changes_key(self, index: int) -> None:
+        args: list[object] = ["openai", "gpt", "sys", "prompt", 0.0, 100, False]
+        changed = list(args)
+        changed[index] = {0: "x", 1: "y", 2: "z", 3: "w", 4: 0.5, 5: 200, 6: True}[index]
+        assert cache_key(*args) != cache_key(*changed)  # type: ignore[arg-type]
+
+
+class TestSQLiteLLMCache:
+    @pytest.mark.asyncio
+    async def test_roundtrip(self, tmp_path: Path) -> None:
+        cache = SQLiteLLMCache(tmp_path / "c.sqlite3", ttl_seconds=60, max_entries=10)
+        assert await cache.get("k") is None
+        await cache.set("k", "value")
+        assert await cache.get("k") == "value"
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_misses(self, tmp_path: Path) -> None:
+        cache = SQLiteLLMCache(tmp_path / "c.sqlite3", ttl_seconds=60, max_entries=10)
+        with patch("daily_ai_papers.services.llm_cache.time.time", return_value=1000.0):
+            await cache.set("k", "value")
+        with patch("daily_ai_papers.services.llm_cache.time.time", return_value=1061.0):
+            assert await cache.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, tmp_path: Path) -> None:
+        cache = SQLiteLLMCache(tmp_path / "c.sqlite3", ttl_seconds=3600, max_entries=2)
+        clock = iter(float(t) for t in range(1000, 1100))
+        with patch("daily_ai_papers.services.llm_cache.time.time", side_effect=lambda: next(clock)):
+            await cache.set("a", "1")
+            await cache.set("b", "2")
+            assert await cache.get("a") == "1"  # "a" is now more recent than "b"
+            await cache.set("c", "3")
+
+            assert await cache.get("b") is None
+            assert await cache.get("a") == "1"
+            assert await cache.get("c") == "3"
+
+    @pytest.mark.asyncio
+    async def test_size_is_checked_every_n_writes(self, tmp_path: Path) -> None:
+        cache = SQLiteLLMCache(tmp_path / "c.sqlite3", ttl_seconds=3600, max_entries=300)
+        counts: list[str] = []
+        cache._conn.set_trace_callback(
+            lambda sql: counts.append(sql) if sql.startswith("SELECT COUNT") else None
+        )
+        for i in range(302):
+            await cache.set(str(i), "v")
+        assert len(counts) == 100  # every 3rd write
+        (stored,) = cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        assert stored == 302
+
+        await cache.set("302", "v")
+        (stored,) = cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        assert stored == 300
+
+    @pytest.mark.asyncio
+    async def test_clear(self, tmp_path: Path) -> None:
+        cache = SQLiteLLMCache(tmp_path / "c.sqlite3", ttl_seconds=60, max_entries=10)
+        await cache.set("k", "value")
+        await cache.clear()
+        assert await cache.get("k") is None
+
+
+class TestRedisLLMCache:
+    @pytest.fixture
+    def cache(self, monkeypatch: pytest.MonkeyPatch) -> RedisLLMCache:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        cache = RedisLLMCache("redis://localhost:6379/0", ttl_seconds=60, max_entries=2)
+        monkeypatch.setattr(cache, "_connect", lambda: fakeredis.FakeAsyncRedis(server=server))
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_roundtrip(self, cache: RedisLLMCache) -> None:
+        assert await cache.get("k") is None
+        await cache.set("k", "value")
+        assert await cache.get("k") == "value"
+        assert await cache._redis.ttl("llm-cache:k") == 60
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, cache: RedisLLMCache) -> None:
+        clock = iter(float(t) for t in range(1000, 1100))
+        with patch("daily_ai_papers.services.llm_cache.time.time", side_effect=lambda: next(clock)):
+            await cache.set("a", "1")
+            await cache.set("b", "2")
+            assert await cache.get("a") == "1"
+            await cache.set("c", "3")
+
+            assert await cache.get("b") is None
+            assert await cache.get("a") == "1"
+
+    def test_client_per_event_loop(self, cache: RedisLLMCache) -> None:
+        async def roundtrip() -> object:
+            await cache.set("k", "value")
+            assert await cache.get("k") == "value"
+            return cache._redis
+
+        first = asyncio.run(roundtrip())
+        second = asyncio.run(roundtrip())
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_clear(self, cache: RedisLLMCache) -> None:
+        await cache.set("k", "value")
+        await cache.clear()
+        assert await cache.get("k") is None
+
+
+class TestLlmCompleteCaching:
+    @pytest.fixture(autouse=True)
+    def _sqlite_cache(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_provider", "fake")
+        monkeypatch.setattr(settings, "llm_cache_backend", "sqlite")
+        monkeypatch.setattr(settings, "llm_cache_path", str(tmp_path / "llm.sqlite3"))
+        monkeypatch.setattr(llm_cache, "_cache", None)
+
+    @pytest.mark.asyncio
+    async def test_second_call_is_served_from_cache(self) -> None:
+        with patch(
+            "daily_ai_papers.services.llm_client._fake_complete", return_value="answer"
+        ) as fake:
+            assert await llm_complete("What is 2+3?") == "answer"
+            assert await llm_complete("What is 2+3?") == "answer"
+        assert fake.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_bypass_flag(self) -> None:
+        with patch(
+            "daily_ai_papers.services.llm_client._fake_complete", return_value="answer"
+        ) as fake:
+            await llm_complete("What is 2+3?")
+            await llm_complete("What is 2+3?", use_cache=False)
+        assert fake.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_nonzero_temperature_is_not_cached(self) -> None:
+        with patch(
+            "daily_ai_papers.services.llm_client._fake_complete", return_value="answer"
+        ) as fake:
+            await llm_complete("What is 2+3?", temperature=0.7)
+            await llm_complete("What is 2+3?", temperature=0.7)
+        assert fake.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_hit_miss_metrics(self) -> None:
+        from prometheus_client import REGISTRY
+
+        def sample(result: str) -> float:
+            value = REGISTRY.get_sample_value("llm_cache_requests_total", {"result": result})
+            return value or 0.0
+
+        hits, misses = sample("hit"), sample("miss")
+        await llm_complete("metrics prompt")
+        await llm_complete("metrics prompt")
+        assert sample("miss") == misses + 1
+        assert sample("hit") == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_when_cache_fails(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        broken = MagicMock()
+        broken.get = AsyncMock(side_effect=ConnectionError("cache down"))
+        broken.set = AsyncMock(side_effect=ConnectionError("cache down"))
+        monkeypatch.setattr("daily_ai_papers.services.llm_client.get_llm_cache", lambda: broken)
+
+        chunks = [chunk async for chunk in llm_stream("Summarize this abstract.")]
+        assert "".join(chunks) == await llm_complete("Summarize this abstract.")
+        broken.set.assert_awaited()
+
+    def test_unknown_backend_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_cache_backend", "memcached")
+        with pytest.raises(ValueError, match="Unsupported LLM cache backend"):
+            llm_cache.get_llm_cache()
@@ -8,7 +8,14 @@ import json
 import pytest
 
 from daily_ai_papers.config import settings
-from daily_ai_papers.services.llm_client import llm_complete, parse_json_response
+from daily_ai_papers.services import llm_client
+from daily_ai_papers.services.llm_client import (
+    _get_client,
+    close_llm_clients,
+    llm_complete,
+    llm_stream,
+    parse_json_response,
+)
 
 
 class TestParseJsonResponse:
@@ -79,3 +86,150 @@ class TestLlmCompleteProviderValidation:
         monkeypatch.setattr(settings, "llm_api_key", "")
         result = await llm_complete("What is 2+3?")
         assert result == "5"
+
+
+class TestClientRegistry:
+    """Test SDK client pooling and shutdown."""
+
+    @pytest.fixture(autouse=True)
+    async def _clean_registry(self) -> None:
+        await close_llm_clients()
+
+    @pytest.mark.asyncio
+    async def test_same_key_reuses_client(self) -> None:
+        first = _get_client("openai", "key-a", "https://example.test/v1")
+        second = _get_client("openai", "key-a", "https://example.test/v1")
+        assert first is second
+        await close_llm_clients()
+
+    @pytest.mark.asyncio
+    async def test_different_keys_get_different_clients(self) -> None:
+        a = _get_client("openai", "key-a")
+        b = _get_client("openai", "key-b")
+        c = _get_client("anthropic", "key-a")
+        assert a is not b
+        assert a is not c
+        await close_llm_clients()
+
+    @pytest.mark.asyncio
+    async def test_pool_settings_applied(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_timeout", 12.5)
+        client = _get_client("anthropic", "key-a")
+        assert client.timeout == 12.5
+        assert client.max_retries == 0  # The scheduler retries
+        await close_llm_clients()
+
+    @pytest.mark.asyncio
+    async def test_close_clears_registry(self) -> None:
+        client = _get_client("openai", "key-a")
+        await close_llm_clients()
+        assert llm_client._clients == {}
+        assert client.is_closed()
+
+    @pytest.mark.asyncio
+    async def test_unsupported_provider_raises(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported LLM provider"):
+            _get_client("nope", "key")
+
+    def test_clients_are_not_shared_across_event_loops(self) -> None:
+        import asyncio
+
+        async def get() -> object:
+            return _get_client("openai", "key-loop")
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        assert first is not second
+        llm_client._clients.clear()
+
+
+class TestLlmStream:
+    """llm_stream yields incremental chunks that join to the full completion."""
+
+    @pytest.fixture(autouse=True)
+    def _use_fake_provider(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_provider", "fake")
+        monkeypatch.setattr(settings, "llm_api_key", "")
+
+    @pytest.mark.asyncio
+    async def test_chunks_join_to_completion(self) -> None:
+        prompt = "Translate the following academic paper text into Chinese.\n---\nHi\n---"
+        chunks = [chunk async for chunk in llm_stream(prompt)]
+        assert len(chunks) > 1
+        assert "".join(chunks) == await llm_complete(prompt)
+
+    @pytest.mark.asyncio
+    async def test_simulated_timing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        import time
+
+        monkeypatch.setattr(settings, "fake_llm_first_token_ms", 50.0)
+        monkeypatch.setattr(settings, "fake_llm_tokens_per_second", 1000.0)
+        start = time.perf_counter()
+        stream = llm_stream("Summarize this abstract.")
+        await anext(stream)
+        assert time.perf_counter() - start >= 0.05
+        async for _ in stream:
+            pass
+
+    @pytest.mark.asyncio
+    async def test_without_api_key_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_provider", "anthropic")
+        with pytest.raises(RuntimeError, match="LLM_API_KEY is not set"):
+            await anext(llm_stream("hello"))
+
+
+class TestPromptCaching:
+    """Paper context goes first, as a stable prefix the provider can cache."""
+
+    def test_anthropic_context_block_is_cacheable(self) -> None:
+        body = llm_client.anthropic_request_body(
+            "claude", "sys", "Summarize.", 0.1, 100, context="Paper text"
+        )
+        context_block, prompt_block = body["messages"][0]["content"]
+        assert context_block == {
+            "type": "text",
+            "text": "Paper text",
+            "cache_control": {"type": "ephemeral"},
+        }
+        assert prompt_block == {"type": "text", "text": "Summarize."}
+
+    def test_anthropic_caching_disabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_prompt_caching", False)
+        body = llm_client.anthropic_request_body(
+            "claude", "sys", "Summarize.", 0.1, 100, context="Paper text"
+        )
+        assert "cache_control" not in body["messages"][0]["content"][0]
+
+    def test_openai_context_precedes_prompt(self) -> None:
+        body = llm_client.openai_request_body(
+            "gpt", "sys", "Summarize.", 0.1, 100, False, context="Paper text"
+        )
+        assert body["messages"][1]["content"] == "Paper text\n\nSummarize."
+
+    def test_usage_reports_cache_tokens(self) -> None:
+        from types import SimpleNamespace
+
+        anthropic = llm_client._anthropic_usage(
+            SimpleNamespace(
+                input_tokens=10,
+                output_tokens=5,
+                cache_read_input_tokens=900,
+                cache_creation_input_tokens=0,
+            )
+        )
+        assert (anthropic.prompt_tokens, anthropic.cache_read_tokens) == (910, 900)
+        openai = llm_client._openai_usage(
+            SimpleNamespace(
+                prompt_tokens=1200,
+                completion_tokens=5,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+            )
+        )
+        assert (openai.prompt_tokens, openai.cache_read_tokens) == (1200, 1024)
+
+    def test_context_is_part_of_cache_key(self) -> None:
+        from daily_ai_papers.services.llm_cache import cache_key
+
+        args = ("openai", "m", "s", "p", 0.1, 10, False)
+        assert cache_key(*args) == cache_key(*args, "")
+        assert cache_key(*args, "a") != cache_key(*args, "b")
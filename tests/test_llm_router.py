@@ -0,0 +1,214 @@
+"""Tests for hedged requests, failover and circuit breaking across LLM routes."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import llm_router
+from daily_ai_papers.services.llm_client import llm_complete
+from daily_ai_papers.services.llm_router import CircuitBreaker, LatencyTracker, LLMRouter, Route
+from daily_ai_papers.services.llm_scheduler import llm_priority
+
+
+@pytest.fixture(autouse=True)
+def _routes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_model", "primary")
+    monkeypatch.setattr(settings, "llm_fallback_model", "secondary")
+    monkeypatch.setattr(settings, "llm_hedge_min_delay", 0.05)
+    monkeypatch.setattr(settings, "llm_circuit_failure_threshold", 2)
+    monkeypatch.setattr(llm_router, "_router", None)
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _Backend:
+    """Stand-in for llm_client._complete with per-model latency and failures."""
+
+    def __init__(
+        self,
+        delays: dict[str, float],
+        failing: set[str] | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        self.delays = delays
+        self.failing = failing or set()
+        self.error = error
+        self.calls: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def __call__(self, provider: str, model: str, *args: Any, **kwargs: Any) -> str:
+        self.calls.append(model)
+        try:
+            await asyncio.sleep(self.delays.get(model, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if model in self.failing:
+            raise self.error or ConnectionError(f"{model} down")
+        return f"from {model}"
+
+
+def _install(monkeypatch: pytest.MonkeyPatch, backend: _Backend) -> None:
+    monkeypatch.setattr("daily_ai_papers.services.llm_client._complete", backend)
+
+
+class TestRouting:
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        backend = _Backend({"primary": 0.0})
+        _install(monkeypatch, backend)
+        assert await llm_complete("hi", use_cache=False) == "from primary"
+        assert backend.calls == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        backend = _Backend({"primary": 1.0, "secondary": 0.0})
+        _install(monkeypatch, backend)
+        assert await llm_complete("hi", use_cache=False) == "from secondary"
+        assert backend.calls == ["primary", "secondary"]
+        assert backend.cancelled == ["primary"]  # the loser was awaited
+
+    @pytest.mark.asyncio
+    async def test_batch_lane_is_not_hedged(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        backend = _Backend({"primary": 0.1, "secondary": 0.0})
+        _install(monkeypatch, backend)
+        with llm_priority("batch"):
+            assert await llm_complete("hi", use_cache=False) == "from primary"
+        assert backend.calls == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_failover_on_error(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        backend = _Backend({}, failing={"primary"})
+        _install(monkeypatch, backend)
+        assert await llm_complete("hi", use_cache=False) == "from secondary"
+        assert backend.calls == ["primary", "secondary"]
+
+    @pytest.mark.asyncio
+    async def test_failover_on_server_error(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        _install(monkeypatch, _Backend({}, failing={"primary"}, error=_StatusError(503)))
+        assert await llm_complete("hi", use_cache=False) == "from secondary"
+
+    @pytest.mark.asyncio
+    async def test_client_error_is_raised_without_failover(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        backend = _Backend({}, failing={"primary"}, error=_StatusError(400))
+        _install(monkeypatch, backend)
+        for _ in range(3):
+            with pytest.raises(_StatusError, match="HTTP 400"):
+                await llm_complete("hi", use_cache=False)
+        assert backend.calls == ["primary"] * 3
+        breaker = llm_router.get_router().breaker(LLMRouter().routes("fake", "primary")[0])
+        assert breaker.failures == 0
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_all_routes_fail_raises_primary_error(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        _install(monkeypatch, _Backend({}, failing={"primary", "secondary"}))
+        with pytest.raises(ConnectionError, match="primary down"):
+            await llm_complete("hi", use_cache=False)
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_primary(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        backend = _Backend({}, failing={"primary"})
+        _install(monkeypatch, backend)
+        for _ in range(2):
+            await llm_complete("hi", use_cache=False)
+        backend.calls.clear()
+
+        assert await llm_complete("hi", use_cache=False) == "from secondary"
+        assert backend.calls == ["secondary"]
+
+    def test_routes_without_distinct_fallback(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_fallback_model", "primary")
+        assert len(LLMRouter().routes("fake", "primary")) == 1
+
+    def test_fallback_provider_does_not_inherit_key(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_api_key", "openai-key")
+        monkeypatch.setattr(settings, "llm_fallback_provider", "anthropic")
+        monkeypatch.setattr(settings, "llm_fallback_api_key", "anthropic-key")
+        _, fallback = LLMRouter().routes("openai", "gpt")
+        assert fallback == Route("anthropic", "secondary", "anthropic-key", "")
+
+    @pytest.mark.asyncio
+    async def test_anthropic_fallback_uses_its_base_url(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        response = SimpleNamespace(
+            content=[SimpleNamespace(text="from fallback")],
+            usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+        )
+        client = SimpleNamespace(messages=SimpleNamespace(create=AsyncMock(return_value=response)))
+        clients: list[tuple[Any, ...]] = []
+        monkeypatch.setattr(
+            "daily_ai_papers.services.llm_client._get_client",
+            lambda *args: clients.append(args) or client,
+        )
+        monkeypatch.setattr(settings, "llm_fallback_provider", "anthropic")
+        monkeypatch.setattr(settings, "llm_fallback_api_key", "anthropic-key")
+        monkeypatch.setattr(settings, "llm_fallback_base_url", "https://proxy.example/anthropic")
+        fallback = LLMRouter().routes("fake", "primary")[1]
+
+        assert await LLMRouter()._attempt(fallback, "", "hi", 0.0, 10, False, "") == (
+            "from fallback"
+        )
+        assert clients == [("anthropic", "anthropic-key", "https://proxy.example/anthropic")]
+
+
+class TestCircuitBreaker:
+    def test_open_then_half_open_probe(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_circuit_reset_seconds", 0.0)
+        breaker = CircuitBreaker()
+        assert not breaker.record_failure()
+        assert breaker.record_failure()
+        assert breaker.state == "half_open"
+
+        breaker.begin()
+        assert not breaker.available()  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_client_error_releases_probe(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_circuit_reset_seconds", 0.0)
+        _install(monkeypatch, _Backend({}, failing={"primary"}, error=_StatusError(400)))
+        router = LLMRouter()
+        route = router.routes("fake", "primary")[0]
+        breaker = router.breaker(route)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "half_open"
+
+        with pytest.raises(_StatusError):
+            await router._attempt(route, "", "hi", 0.0, 10, False, "")
+        assert breaker.available()
+        assert breaker.state == "half_open"
+
+    def test_failed_probe_reopens(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_circuit_reset_seconds", 60.0)
+        breaker = CircuitBreaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.available()
+
+
+class TestLatencyTracker:
+    def test_hedge_delay_uses_quantile(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_hedge_min_delay", 0.0)
+        tracker = LatencyTracker()
+        assert tracker.hedge_delay() == 0.0
+        for i in range(100):
+            tracker.observe(i / 100)
+        assert tracker.hedge_delay() == pytest.approx(0.95)
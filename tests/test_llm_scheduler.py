@@ -0,0 +1,292 @@
+"""Tests for the rate-limit-aware LLM scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import llm_scheduler
+from daily_ai_papers.services.llm_client import LLMUsage, llm_complete
+from daily_ai_papers.services.llm_scheduler import (
+    AdaptiveConcurrency,
+    LLMScheduler,
+    LocalRateBudget,
+    RedisRateBudget,
+    current_window,
+    llm_priority,
+    parse_rate_limits,
+    rate_limit_delay,
+)
+
+
+class _RateLimitError(Exception):
+    """Shaped like the SDKs' APIStatusError."""
+
+    def __init__(self, status_code: int = 429, headers: dict[str, str] | None = None) -> None:
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class TestHelpers:
+    def test_parse_rate_limits(self) -> None:
+        spec = "openai:gpt-4o-mini=500/200000, anthropic:claude-3-5-haiku=50/0"
+        assert parse_rate_limits(spec) == {
+            ("openai", "gpt-4o-mini"): (500, 200000),
+            ("anthropic", "claude-3-5-haiku"): (50, 0),
+        }
+        assert parse_rate_limits("") == {}
+
+    def test_parse_rate_limits_rejects_malformed(self) -> None:
+        with pytest.raises(ValueError, match="LLM_RATE_LIMITS"):
+            parse_rate_limits("openai=500")
+
+    def test_rate_limit_delay(self) -> None:
+        assert rate_limit_delay(_RateLimitError(headers={"retry-after": "3"})) == 3.0
+        assert rate_limit_delay(_RateLimitError(headers={"retry-after-ms": "250"})) == 0.25
+        assert rate_limit_delay(_RateLimitError(529)) == llm_scheduler._DEFAULT_BACKOFF
+        assert rate_limit_delay(_RateLimitError(400)) is None
+        assert rate_limit_delay(TimeoutError()) is None
+
+
+class TestLocalRateBudget:
+    @pytest.mark.asyncio
+    async def test_rpm_exhausted_waits_for_next_window(self) -> None:
+        budget = LocalRateBudget()
+        assert await budget.reserve("k", rpm=2, tpm=0, tokens=10) == 0
+        assert await budget.reserve("k", rpm=2, tpm=0, tokens=10) == 0
+        assert 0 < await budget.reserve("k", rpm=2, tpm=0, tokens=10) <= 60
+
+    @pytest.mark.asyncio
+    async def test_tpm_and_adjust(self) -> None:
+        budget = LocalRateBudget()
+        assert await budget.reserve("k", rpm=0, tpm=100, tokens=80) == 0
+        assert await budget.reserve("k", rpm=0, tpm=100, tokens=30) > 0
+        await budget.adjust("k", -60, current_window())  # the first call used far fewer tokens
+        assert await budget.reserve("k", rpm=0, tpm=100, tokens=30) == 0
+
+    @pytest.mark.asyncio
+    async def test_adjust_ignores_other_windows(self) -> None:
+        budget = LocalRateBudget()
+        assert await budget.reserve("k", rpm=0, tpm=100, tokens=80) == 0
+        await budget.adjust("k", -80, current_window() - 1)
+        assert await budget.reserve("k", rpm=0, tpm=100, tokens=30) > 0
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_allowed_on_empty_window(self) -> None:
+        assert await LocalRateBudget().reserve("k", rpm=0, tpm=100, tokens=500) == 0
+
+    @pytest.mark.asyncio
+    async def test_block(self) -> None:
+        budget = LocalRateBudget()
+        await budget.block("k", 5)
+        assert 4 < await budget.reserve("k", rpm=0, tpm=0, tokens=1) <= 5
+        assert await budget.reserve("other", rpm=0, tpm=0, tokens=1) == 0
+
+
+class TestRedisRateBudget:
+    @pytest.fixture
+    def server(self) -> object:
+        pytest.importorskip("lupa")
+        import fakeredis
+
+        return fakeredis.FakeServer()
+
+    def _budget(self, server: object) -> RedisRateBudget:
+        import fakeredis
+
+        budget = RedisRateBudget("redis://localhost:6379/0")
+        budget._connect = lambda: fakeredis.FakeAsyncRedis(server=server)  # type: ignore[method-assign]
+        return budget
+
+    @pytest.mark.asyncio
+    async def test_budget_shared_between_processes(self, server: object) -> None:
+        first, second = self._budget(server), self._budget(server)
+        assert await first.reserve("k", rpm=2, tpm=0, tokens=1) == 0
+        assert await second.reserve("k", rpm=2, tpm=0, tokens=1) == 0
+        assert await first.reserve("k", rpm=2, tpm=0, tokens=1) > 0
+
+    @pytest.mark.asyncio
+    async def test_adjust_keeps_ttl_and_never_creates_keys(self, server: object) -> None:
+        budget = self._budget(server)
+        window = current_window()
+        assert await budget.reserve("k", rpm=0, tpm=100, tokens=80) == 0
+        await budget.adjust("k", -500, window)
+        tokens_key = budget._keys("k", window)[1]
+        assert int(await budget._redis.get(tokens_key)) == 0
+        assert await budget._redis.ttl(tokens_key) > 0
+
+        await budget.adjust("k", -10, window - 1)  # Reservation from a past window
+        await budget.adjust("other", -10, window)  # Nothing reserved
+        assert await budget._redis.exists(budget._keys("k", window - 1)[1]) == 0
+        assert await budget._redis.exists(budget._keys("other", window)[1]) == 0
+
+    def test_client_per_event_loop(self, server: object) -> None:
+        budget = self._budget(server)
+
+        async def reserve() -> object:
+            assert await budget.reserve("k", rpm=0, tpm=100, tokens=10) == 0
+            await budget.adjust("k", -5, current_window())
+            return budget._redis
+
+        assert asyncio.run(reserve()) is not asyncio.run(reserve())
+
+    @pytest.mark.asyncio
+    async def test_block_shared(self, server: object) -> None:
+        first, second = self._budget(server), self._budget(server)
+        await first.block("k", 2)
+        assert 1 < await second.reserve("k", rpm=0, tpm=0, tokens=1) <= 2
+
+
+class TestAdaptiveConcurrency:
+    def test_aimd(self) -> None:
+        limiter = AdaptiveConcurrency(initial=4, minimum=1, maximum=6)
+        for _ in range(4):
+            limiter.on_success()
+        assert limiter.limit == pytest.approx(5, abs=0.1)
+        limiter.on_overload()
+        assert limiter.limit == pytest.approx(2.5, abs=0.1)
+        limiter.on_overload()  # within the cooldown: ignored
+        assert limiter.limit == pytest.approx(2.5, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_interactive_waiters_served_first(self) -> None:
+        limiter = AdaptiveConcurrency(initial=1, minimum=1, maximum=1)
+        await limiter.acquire("interactive")
+        order: list[str] = []
+
+        async def waiter(priority: llm_scheduler.Priority) -> None:
+            await limiter.acquire(priority)
+            order.append(priority)
+            limiter.release()
+
+        batch = asyncio.create_task(waiter("batch"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(waiter("interactive"))
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(batch, interactive)
+
+        assert order == ["interactive", "batch"]
+        assert limiter.in_flight == 0
+
+
+class TestLLMScheduler:
+    @pytest.mark.asyncio
+    async def test_caps_in_flight_calls(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_concurrency_initial", 2)
+        monkeypatch.setattr(settings, "llm_concurrency_max", 2)
+        scheduler = LLMScheduler(LocalRateBudget())
+        running = peak = 0
+
+        async def call() -> tuple[str, int]:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok", 0
+
+        results = await asyncio.gather(*(scheduler.run("p", "m", 10, call) for _ in range(6)))
+        assert results == ["ok"] * 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_after_rate_limit(self) -> None:
+        scheduler = LLMScheduler(LocalRateBudget())
+        call = AsyncMock(side_effect=[_RateLimitError(headers={"retry-after-ms": "20"}), ("ok", 0)])
+        before = scheduler.limiter("p", "m").limit
+
+        assert await scheduler.run("p", "m", 10, call) == "ok"
+        assert call.await_count == 2
+        assert scheduler.limiter("p", "m").limit < before
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_rate_limit_retries", 1)
+        scheduler = LLMScheduler(LocalRateBudget())
+        call = AsyncMock(side_effect=_RateLimitError(headers={"retry-after-ms": "1"}))
+        with pytest.raises(_RateLimitError):
+            await scheduler.run("p", "m", 10, call)
+        assert call.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_not_retried(self) -> None:
+        scheduler = LLMScheduler(LocalRateBudget())
+        for error in (ValueError("bad"), _RateLimitError(400)):
+            call = AsyncMock(side_effect=error)
+            with pytest.raises(type(error)):
+                await scheduler.run("p", "m", 10, call)
+            assert call.await_count == 1
+        assert scheduler.limiter("p", "m").in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retried_with_backoff(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "llm_max_retries", 2)
+        monkeypatch.setattr(llm_scheduler, "_RETRY_BACKOFF", 0.01)
+        scheduler = LLMScheduler(LocalRateBudget())
+        call = AsyncMock(side_effect=[TimeoutError(), _RateLimitError(500), ("ok", 0)])
+        assert await scheduler.run("p", "m", 10, call) == "ok"
+
+        call = AsyncMock(side_effect=ConnectionError())
+        with pytest.raises(ConnectionError):
+            await scheduler.run("p", "m", 10, call)
+        assert call.await_count == 3
+
+    def test_is_retryable(self) -> None:
+        assert llm_scheduler.is_retryable(_RateLimitError(429))
+        assert llm_scheduler.is_retryable(_RateLimitError(502))
+        assert llm_scheduler.is_retryable(TimeoutError())
+        assert not llm_scheduler.is_retryable(_RateLimitError(400))
+        assert not llm_scheduler.is_retryable(ValueError())
+
+    @pytest.mark.asyncio
+    async def test_batch_lane_keeps_headroom(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_rate_limits", "p:m=10/0")
+        monkeypatch.setattr(settings, "llm_batch_lane_share", 0.5)
+        scheduler = LLMScheduler(LocalRateBudget())
+        key = "p:m"
+        for _ in range(5):
+            assert (
+                await scheduler.budget.reserve(key, *scheduler._limits("p", "m", "batch"), 1) == 0
+            )
+        assert await scheduler.budget.reserve(key, *scheduler._limits("p", "m", "batch"), 1) > 0
+        assert (
+            await scheduler.budget.reserve(key, *scheduler._limits("p", "m", "interactive"), 1) == 0
+        )
+
+
+class TestIntegration:
+    @pytest.mark.asyncio
+    async def test_llm_complete_retries_provider_429(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_provider", "openai")
+        monkeypatch.setattr(settings, "llm_api_key", "test-key")
+        monkeypatch.setattr(llm_scheduler, "_scheduler", None)
+        with patch(
+            "daily_ai_papers.services.llm_client._openai_complete",
+            new_callable=AsyncMock,
+            side_effect=[
+                _RateLimitError(headers={"retry-after-ms": "10"}),
+                ("ok", LLMUsage(prompt_tokens=5, completion_tokens=1)),
+            ],
+        ) as mock:
+            assert await llm_complete("hi") == "ok"
+        assert mock.await_count == 2
+
+    def test_worker_tasks_run_in_batch_lane(self) -> None:
+        from daily_ai_papers.tasks.runner import run_async, shutdown_loop
+
+        async def current() -> str:
+            return llm_scheduler._priority.get()
+
+        try:
+            assert run_async(current()) == "batch"
+        finally:
+            shutdown_loop()
+        with llm_priority("batch"):
+            assert llm_scheduler._priority.get() == "batch"
+        assert llm_scheduler._priority.get() == "interactive"
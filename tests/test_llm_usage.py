@@ -0,0 +1,146 @@
+"""Tests for the per-call LLM usage ledger."""
+
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import llm_usage
+from daily_ai_papers.services.llm_batch import batch_mode
+from daily_ai_papers.services.llm_client import llm_complete
+from daily_ai_papers.services.llm_usage import (
+    MemoryUsageLedger,
+    Price,
+    SQLiteUsageLedger,
+    UsageRecord,
+    aggregate,
+    estimate_cost,
+    get_usage_ledger,
+    llm_stage,
+    parse_prices,
+)
+from daily_ai_papers.services.parser.metadata_extractor import extract_metadata
+from daily_ai_papers.services.translator import translate_text, translate_text_stream
+
+from .conftest import SAMPLE_ABSTRACT
+
+
+@pytest.fixture(autouse=True)
+def _fresh_ledger(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_api_key", "")
+    monkeypatch.setattr(settings, "llm_usage_backend", "memory")
+    monkeypatch.setattr(settings, "llm_prices", "")
+    monkeypatch.setattr(llm_usage, "_ledger", None)
+
+
+def _record(stage: str, model: str = "m", cost: float = 0.0, latency: float = 10.0) -> UsageRecord:
+    return UsageRecord("fake", model, stage, 100, 20, 50, 0, latency_ms=latency, cost_usd=cost)
+
+
+class TestPrices:
+    def test_parse(self) -> None:
+        prices = parse_prices("gpt-4o-mini=0.15/0.6/0.075, claude-haiku=0.8/4")
+        assert prices["gpt-4o-mini"] == Price(0.15, 0.6, 0.075)
+        assert prices["claude-haiku"] == Price(0.8, 4.0, 0.8)
+
+    @pytest.mark.parametrize("spec", ["gpt=1", "gpt=1/2/3/4", "gpt=a/b", "gpt"])
+    def test_invalid_entry_raises(self, spec: str) -> None:
+        with pytest.raises(ValueError, match="Invalid LLM_PRICES entry"):
+            parse_prices(spec)
+
+    def test_cached_tokens_use_cached_price(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_prices", "m=1/4/0.1")
+        # 600 uncached + 400 cached input, 100 output
+        assert estimate_cost("m", 1000, 100, 400) == pytest.approx((600 + 40 + 400) / 1e6)
+        assert estimate_cost("unpriced", 1000, 100, 0) == 0.0
+
+
+class TestAggregate:
+    def test_groups_and_orders_by_cost(self) -> None:
+        records = [
+            _record("extraction", cost=0.01, latency=100),
+            _record("translation", cost=0.02, latency=10),
+            _record("translation", cost=0.02, latency=30),
+        ]
+        first, second = aggregate(records, ["stage"])
+        assert first.group == {"stage": "translation"}
+        assert (first.calls, first.prompt_tokens, first.cache_read_tokens) == (2, 200, 100)
+        assert first.avg_latency_ms == 20
+        assert first.max_latency_ms == 30
+        assert second.group == {"stage": "extraction"}
+
+    def test_unknown_group_raises(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported usage grouping: user"):
+            aggregate([], ["user"])
+
+
+class TestBackends:
+    @pytest.mark.asyncio
+    async def test_memory_keeps_latest(self) -> None:
+        ledger = MemoryUsageLedger(max_records=2)
+        for stage in ("a", "b", "c"):
+            await ledger.record(_record(stage))
+        assert [r.stage for r in await ledger.recent(10)] == ["c", "b"]
+
+    @pytest.mark.asyncio
+    async def test_sqlite_matches_memory(self, tmp_path: Path) -> None:
+        sqlite = SQLiteUsageLedger(tmp_path / "usage.sqlite3", retention_days=30)
+        memory = MemoryUsageLedger(max_records=100)
+        records = [_record("extraction", "m1", 0.01), _record("translation", "m2", 0.03)]
+        records.append(_record("translation", "m1", 0.02))
+        for record in records:
+            await sqlite.record(record)
+            await memory.record(record)
+
+        for group_by in (["stage"], ["stage", "model"], []):
+            assert await sqlite.summary(0, group_by) == await memory.summary(0, group_by)
+        assert await sqlite.recent(1) == [records[-1]]
+        assert await sqlite.summary(records[-1].created_at + 1, ["stage"]) == []
+
+        await sqlite.clear()
+        assert await sqlite.recent(10) == []
+
+    def test_disabled_and_unknown_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_usage_backend", "")
+        assert get_usage_ledger() is None
+        monkeypatch.setattr(settings, "llm_usage_backend", "postgres")
+        with pytest.raises(ValueError, match="Unsupported LLM usage backend"):
+            get_usage_ledger()
+
+
+class TestRecording:
+    @pytest.mark.asyncio
+    async def test_calls_are_attributed_to_stages(self) -> None:
+        await extract_metadata(SAMPLE_ABSTRACT)
+        await translate_text("Attention is all you need.", "zh")
+        _ = [c async for c in translate_text_stream("Attention is all you need.", "ja")]
+        await llm_complete("What is 2+3?", use_cache=False)
+
+        ledger = get_usage_ledger()
+        assert ledger is not None
+        records = await ledger.recent(10)
+        assert [r.stage for r in records] == ["other", "translation", "translation", "extraction"]
+        assert all(r.provider == "fake" and r.prompt_tokens > 0 for r in records)
+        assert all(r.completion_tokens > 0 for r in records)
+
+    @pytest.mark.asyncio
+    async def test_cost_metric(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_prices", f"{settings.llm_model}=1000/1000")
+        labels = {"provider": "fake", "model": settings.llm_model, "stage": "chat"}
+        before = REGISTRY.get_sample_value("llm_cost_usd_total", labels) or 0.0
+        with llm_stage("chat"):
+            await llm_complete("What is 2+3?", use_cache=False)
+        assert (REGISTRY.get_sample_value("llm_cost_usd_total", labels) or 0.0) > before
+
+    @pytest.mark.asyncio
+    async def test_batched_calls_keep_their_stage(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_batch_linger_seconds", 0.01)
+        monkeypatch.setattr(settings, "llm_batch_poll_interval", 0.01)
+        async with batch_mode():
+            await translate_text("Attention is all you need.", "zh")
+
+        ledger = get_usage_ledger()
+        assert ledger is not None
+        assert [r.stage for r in await ledger.recent(10)] == ["translation"]
@@ -0,0 +1,64 @@
+"""Tests for the offline load-test harness."""
+
+import json
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.loadtest import SyntheticCrawler, main, run_load_test
+from daily_ai_papers.services import fake_llm, llm_scheduler
+from daily_ai_papers.services.parser.context_budget import split_sections
+
+
+@pytest.fixture(autouse=True)
+def _restore_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The harness switches to the fake provider; put the settings back afterwards."""
+    pytest.importorskip("fitz", reason="PyMuPDF not installed")
+    monkeypatch.setattr(settings, "llm_provider", settings.llm_provider)
+    monkeypatch.setattr(settings, "llm_cache_backend", settings.llm_cache_backend)
+    monkeypatch.setattr(settings, "fake_llm_server_error_rate", 0.0)
+    monkeypatch.setattr(settings, "fake_llm_seed", None)
+    monkeypatch.setattr(fake_llm, "_fake_llm", None)
+
+
+class TestSyntheticCrawler:
+    @pytest.mark.asyncio
+    async def test_papers_have_detectable_sections(self) -> None:
+        crawler = SyntheticCrawler(paper_chars=2000, seed=1)
+        papers = await crawler.fetch_recent_papers([], max_results=2)
+        assert [p.source_id for p in papers] == ["load.00000", "load.00001"]
+        kinds = [s.kind for s in split_sections(crawler.texts["load.00000"])]
+        assert kinds[:3] == ["front", "abstract", "introduction"]
+        assert "references" in kinds
+
+
+class TestRunLoadTest:
+    @pytest.mark.asyncio
+    async def test_all_papers_complete(self) -> None:
+        report = await run_load_test(3, 2, ["zh", "ja"], paper_chars=2000)
+        assert report.completed == 3
+        assert len(report.stages["parse"].durations) == 3
+        assert len(report.stages["translate"].durations) == 6
+        assert settings.llm_provider == "fake"
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_by_type(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "fake_llm_server_error_rate", 1.0)
+        monkeypatch.setattr(llm_scheduler, "_RETRY_BACKOFF", 0.0)
+        report = await run_load_test(2, 2, paper_chars=2000)
+        assert report.completed == 0
+        assert report.stages["analyze"].errors == {"FakeLLMError": 2}
+        assert not report.stages["translate"].durations
+
+    @pytest.mark.asyncio
+    async def test_each_run_starts_with_fresh_fake_state(self) -> None:
+        stale = fake_llm.get_fake_llm()
+        stale._sent["digest of an earlier run"] = 1
+        await run_load_test(1, 1, paper_chars=2000)
+        assert fake_llm.get_fake_llm() is not stale
+
+    def test_cli_json_report(self, capsys: pytest.CaptureFixture[str]) -> None:
+        assert main(["--papers", "2", "--paper-chars", "2000", "--seed", "3", "--json"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["completed"] == 2
+        assert settings.fake_llm_seed == 3
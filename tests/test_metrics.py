@@ -0,0 +1,157 @@
+"""Tests for Prometheus instrumentation of the API, workers and LLM client."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.metrics import DbPoolCollector, _task_name
+from daily_ai_papers.services.llm_client import LLMUsage, llm_complete, llm_stream
+
+
+def _sample(name: str, labels: dict[str, str]) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsEndpoint:
+    """GET /metrics exposes route latency labelled by template."""
+
+    @pytest.mark.asyncio
+    async def test_route_template_label(self, api_client: AsyncClient) -> None:
+        labels = {"method": "GET", "route": "/health", "status": "200"}
+        before = _sample("http_request_duration_seconds_count", labels)
+
+        await api_client.get("/health")
+        resp = await api_client.get("/metrics")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds" in resp.text
+        assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+    @pytest.mark.asyncio
+    async def test_unmatched_paths_share_label(self, api_client: AsyncClient) -> None:
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = _sample("http_request_duration_seconds_count", labels)
+        await api_client.get("/no/such/path/123")
+        assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+
+class TestCollectors:
+    def test_db_pool_collector(self) -> None:
+        pool = SimpleNamespace(
+            size=lambda: 5, checkedout=lambda: 2, checkedin=lambda: 3, overflow=lambda: 0
+        )
+        registry = CollectorRegistry()
+        registry.register(DbPoolCollector(SimpleNamespace(pool=pool)))
+        assert registry.get_sample_value("db_pool_size") == 5
+        assert registry.get_sample_value("db_pool_checked_out") == 2
+
+    def test_db_pool_collector_skips_missing_stats(self) -> None:
+        registry = CollectorRegistry()
+        registry.register(DbPoolCollector(SimpleNamespace(pool=object())))
+        assert registry.get_sample_value("db_pool_size") is None
+
+    def test_task_name_from_broker_message(self) -> None:
+        raw = json.dumps({"headers": {"task": "daily_ai_papers.tasks.x"}}).encode()
+        assert _task_name(raw) == "daily_ai_papers.tasks.x"
+        assert _task_name(b"not json") == "unknown"
+
+
+class TestCeleryTaskTiming:
+    def test_prerun_postrun_observes_duration(self) -> None:
+        from daily_ai_papers.tasks.signals import _record_task_duration, _record_task_start
+
+        labels = {"task": "demo.task", "state": "SUCCESS"}
+        before = _sample("celery_task_duration_seconds_count", labels)
+
+        _record_task_start(task_id="abc")
+        _record_task_duration(
+            task_id="abc", task=SimpleNamespace(name="demo.task"), state="SUCCESS"
+        )
+
+        assert _sample("celery_task_duration_seconds_count", labels) == before + 1
+
+
+class TestLlmMetrics:
+    @pytest.fixture(autouse=True)
+    def _openai(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_provider", "openai")
+        monkeypatch.setattr(settings, "llm_api_key", "test-key")
+        monkeypatch.setattr(settings, "llm_model", "metrics-model")
+
+    @pytest.mark.asyncio
+    async def test_tokens_and_latency_recorded(self) -> None:
+        labels = {"provider": "openai", "model": "metrics-model", "kind": "prompt"}
+        before = _sample("llm_tokens_total", labels)
+
+        with patch(
+            "daily_ai_papers.services.llm_client._openai_complete",
+            new_callable=AsyncMock,
+            return_value=("ok", LLMUsage(prompt_tokens=120, completion_tokens=30)),
+        ):
+            assert await llm_complete("hi") == "ok"
+
+        assert _sample("llm_tokens_total", labels) == before + 120
+        assert (
+            _sample(
+                "llm_request_duration_seconds_count",
+                {"provider": "openai", "model": "metrics-model"},
+            )
+            >= 1
+        )
+
+    @pytest.mark.asyncio
+    async def test_cache_tokens_recorded(self) -> None:
+        labels = {"provider": "openai", "model": "metrics-model", "kind": "cache_read"}
+        before = _sample("llm_tokens_total", labels)
+
+        with patch(
+            "daily_ai_papers.services.llm_client._openai_complete",
+            new_callable=AsyncMock,
+            return_value=(
+                "ok",
+                LLMUsage(prompt_tokens=1200, completion_tokens=30, cache_read_tokens=1024),
+            ),
+        ):
+            assert await llm_complete("hi", context="paper", use_cache=False) == "ok"
+
+        assert _sample("llm_tokens_total", labels) == before + 1024
+
+    @pytest.mark.asyncio
+    async def test_errors_counted_by_type(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_max_retries", 0)  # Every attempt is counted
+        labels = {"provider": "openai", "model": "metrics-model", "error": "TimeoutError"}
+        before = _sample("llm_errors_total", labels)
+
+        with (
+            patch(
+                "daily_ai_papers.services.llm_client._openai_complete",
+                new_callable=AsyncMock,
+                side_effect=TimeoutError(),
+            ),
+            pytest.raises(TimeoutError),
+        ):
+            await llm_complete("hi")
+
+        assert _sample("llm_errors_total", labels) == before + 1
+
+
+class TestStreamMetrics:
+    @pytest.mark.asyncio
+    async def test_ttft_and_throughput_recorded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "llm_provider", "fake")
+        monkeypatch.setattr(settings, "llm_model", "stream-model")
+        monkeypatch.setattr(settings, "fake_llm_tokens_per_second", 2000.0)
+        labels = {"provider": "fake", "model": "stream-model"}
+        before = _sample("llm_time_to_first_token_seconds_count", labels)
+
+        async for _ in llm_stream("Summarize this abstract."):
+            pass
+
+        assert _sample("llm_time_to_first_token_seconds_count", labels) == before + 1
+        assert _sample("llm_stream_tokens_per_second_count", labels) >= 1
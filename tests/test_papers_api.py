@@ -222,7 +222,9 @@ class TestSubmitPaperSuccess:
     """POST /api/v1/papers/submit — successful submission path."""
 
     @pytest.mark.asyncio
-    async def test_successful_submit(self, api_client: AsyncClient) -> None:
+    @pytest.mark.parametrize("broker_down", [False, True])
+    async def test_successful_submit(self, api_client: AsyncClient, broker_down: bool) -> None:
+        """The papers are saved, so the response is the same if dispatch fails."""
         from daily_ai_papers.schemas.paper import SubmitPaperResult
 
         mock_results = [
@@ -244,11 +246,16 @@ class TestSubmitPaperSuccess:
 
         app.dependency_overrides[get_db] = override_get_db
         try:
-            with patch(
-                "daily_ai_papers.api.papers.submit_papers",
-                new_callable=AsyncMock,
-                return_value=mock_results,
+            with (
+                patch(
+                    "daily_ai_papers.api.papers.submit_papers",
+                    new_callable=AsyncMock,
+                    return_value=mock_results,
+                ),
+                patch("daily_ai_papers.api.papers.analyze_paper_abstracts") as analyze,
             ):
+                if broker_down:
+                    analyze.delay.side_effect = ConnectionError("broker down")
                 resp = await api_client.post(
                     "/api/v1/papers/submit",
                     json={"source": "arxiv", "paper_ids": ["2401.00001"]},
@@ -256,8 +263,71 @@ class TestSubmitPaperSuccess:
         finally:
             app.dependency_overrides.clear()
 
+        analyze.delay.assert_called_once_with([1])
+
         assert resp.status_code == 200
         data = resp.json()
         assert data["total"] == 1
         assert data["results"][0]["status"] == "queued"
         assert data["results"][0]["source_id"] == "2401.00001"
+
+
+class TestStreamTranslation:
+    """GET /api/v1/papers/{id}/translate/{language} streams plain text."""
+
+    @staticmethod
+    def _override(paper: Paper | None):  # type: ignore[no-untyped-def]
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = paper
+        db = AsyncMock()
+        db.execute.return_value = mock_result
+
+        async def override_get_db():  # type: ignore[no-untyped-def]
+            yield db
+
+        return override_get_db
+
+    @pytest.mark.asyncio
+    async def test_streams_translation(
+        self, api_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from daily_ai_papers.config import settings
+        from daily_ai_papers.database import get_db
+        from daily_ai_papers.main import app
+
+        monkeypatch.setattr(settings, "llm_provider", "fake")
+        app.dependency_overrides[get_db] = self._override(_make_paper())
+        try:
+            resp = await api_client.get("/api/v1/papers/1/translate/zh?field=summary")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "text/plain; charset=utf-8"
+        assert any("\u4e00" <= ch <= "\u9fff" for ch in resp.text)
+
+    @pytest.mark.asyncio
+    async def test_missing_paper_returns_404(self, api_client: AsyncClient) -> None:
+        from daily_ai_papers.database import get_db
+        from daily_ai_papers.main import app
+
+        app.dependency_overrides[get_db] = self._override(None)
+        try:
+            resp = await api_client.get("/api/v1/papers/999/translate/zh")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert resp.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_empty_field_returns_404(self, api_client: AsyncClient) -> None:
+        from daily_ai_papers.database import get_db
+        from daily_ai_papers.main import app
+
+        app.dependency_overrides[get_db] = self._override(_make_paper(summary=None))
+        try:
+            resp = await api_client.get("/api/v1/papers/1/translate/zh?field=summary")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert resp.status_code == 404
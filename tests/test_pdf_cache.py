@@ -0,0 +1,139 @@
+"""Tests for streaming PDF downloads through the content-addressed disk cache."""
+
+import functools
+import hashlib
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services.parser import pdf_cache
+from daily_ai_papers.services.parser.pdf_cache import CacheEntry, PDFCache
+from daily_ai_papers.services.parser.pdf_extractor import download_pdf
+
+URL = "https://example.org/paper.pdf"
+BODY = b"%PDF-1.4 " + b"x" * 200_000
+
+
+class FakeServer:
+    """Serves ``BODY`` with an ETag and answers matching conditional GETs with 304."""
+
+    def __init__(self, body: bytes = BODY) -> None:
+        self.body = body
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        etag = f'"{hashlib.md5(self.body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=self.body, headers={"ETag": etag})
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> FakeServer:
+    server = FakeServer()
+    client = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(server))
+    monkeypatch.setattr(httpx, "AsyncClient", client)
+    monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path / "pdfs"))
+    monkeypatch.setattr(pdf_cache, "_cache", None)
+    return server
+
+
+def _cache_requests(result: str) -> float:
+    return REGISTRY.get_sample_value("pdf_cache_requests_total", {"result": result}) or 0.0
+
+
+class TestDownloadPDF:
+    @pytest.mark.asyncio
+    async def test_stores_content_addressed(self, server: FakeServer) -> None:
+        path = await download_pdf(URL)
+        assert path.read_bytes() == BODY
+        assert path.stem == hashlib.sha256(BODY).hexdigest()
+        assert not list((Path(settings.pdf_cache_dir) / "tmp").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_is_served_without_request(self, server: FakeServer) -> None:
+        first = await download_pdf(URL)
+        hits = _cache_requests("hit")
+        assert await download_pdf(URL) == first
+        assert len(server.requests) == 1
+        assert _cache_requests("hit") == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_revalidated(
+        self, server: FakeServer, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "pdf_cache_revalidate_seconds", 0)
+        first = await download_pdf(URL)
+        revalidated = _cache_requests("revalidated")
+
+        assert await download_pdf(URL) == first
+        assert "If-None-Match" not in server.requests[0].headers
+        assert server.requests[1].headers["If-None-Match"]
+        assert _cache_requests("revalidated") == revalidated + 1
+
+        server.body = b"%PDF-1.4 revised"
+        second = await download_pdf(URL)
+        assert second != first
+        assert second.read_bytes() == b"%PDF-1.4 revised"
+
+    @pytest.mark.asyncio
+    async def test_missing_object_is_a_miss(self, server: FakeServer) -> None:
+        path = await download_pdf(URL)
+        path.unlink()
+        assert (await download_pdf(URL)).read_bytes() == BODY
+        assert len(server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_size_cap(self, server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "pdf_max_bytes", 100_000)
+        with pytest.raises(ValueError, match="PDF exceeds 100000 bytes"):
+            await download_pdf(URL)
+        assert not list((Path(settings.pdf_cache_dir) / "tmp").iterdir())
+        assert await pdf_cache.get_pdf_cache().lookup(URL) is None
+
+
+class TestPDFCache:
+    @staticmethod
+    async def _put(cache: PDFCache, url: str, body: bytes) -> Path:
+        with cache.writer() as writer:
+            writer.write(body)
+            sha256, path = writer.commit()
+        await cache.store(CacheEntry(url, sha256, len(body), "", "", time.time()))
+        return path
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, tmp_path: Path) -> None:
+        cache = PDFCache(tmp_path, max_bytes=250)
+        clock = iter(float(t) for t in range(1000, 1100))
+        with patch(
+            "daily_ai_papers.services.parser.pdf_cache.time.time", side_effect=lambda: next(clock)
+        ):
+            a = await self._put(cache, "a", b"a" * 100)
+            b = await self._put(cache, "b", b"b" * 100)
+            assert await cache.lookup("a") is not None  # "a" is now more recent than "b"
+            c = await self._put(cache, "c", b"c" * 100)
+
+        assert a.exists() and c.exists()
+        assert not b.exists()
+        assert await cache.lookup("b") is None
+        assert await cache.total_bytes() == 200
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, tmp_path: Path) -> None:
+        cache = PDFCache(tmp_path, max_bytes=1000)
+        first = await self._put(cache, "mirror-1", b"same")
+        second = await self._put(cache, "mirror-2", b"same")
+        assert first == second
+        assert await cache.total_bytes() == 4
+
+    @pytest.mark.asyncio
+    async def test_newest_object_is_never_evicted(self, tmp_path: Path) -> None:
+        cache = PDFCache(tmp_path, max_bytes=10)
+        path = await self._put(cache, "big", b"z" * 100)
+        assert path.exists()
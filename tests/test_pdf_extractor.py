@@ -0,0 +1,68 @@
+"""Tests for PDF text extraction from files and in-memory buffers."""
+
+import functools
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services.parser import pdf_cache, pdf_pool
+from daily_ai_papers.services.parser.pdf_extractor import extract_text_from_pdf, iter_pages
+
+fitz = pytest.importorskip("fitz", reason="PyMuPDF not installed")
+
+
+@pytest.fixture
+def pdf_bytes() -> bytes:
+    doc = fitz.open()
+    for i in range(3):
+        doc.new_page().insert_text((72, 72), f"Page marker {i}")
+    data: bytes = doc.tobytes()
+    doc.close()
+    return data
+
+
+class TestExtractTextFromPDF:
+    def test_bytes_and_memoryview_match_file(self, pdf_bytes: bytes, tmp_path: Path) -> None:
+        path = tmp_path / "paper.pdf"
+        path.write_bytes(pdf_bytes)
+        text = extract_text_from_pdf(path)
+        assert "Page marker 2" in text
+        assert extract_text_from_pdf(pdf_bytes) == text
+        assert extract_text_from_pdf(memoryview(pdf_bytes)) == text
+        assert extract_text_from_pdf(str(path)) == text
+
+    def test_max_chars_stops_reading_pages(self, pdf_bytes: bytes) -> None:
+        assert extract_text_from_pdf(pdf_bytes, max_chars=5).strip() == "Page marker 0"
+        assert list(iter_pages(pdf_bytes))[2].strip() == "Page marker 2"
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "empty.pdf"
+        path.touch()
+        with pytest.raises(ValueError, match="Empty PDF file"):
+            extract_text_from_pdf(path)
+
+
+class TestDownloadAndExtract:
+    @pytest.fixture(autouse=True)
+    def _pool(self, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        monkeypatch.setattr(settings, "pdf_workers", 1)
+        yield
+        pdf_pool.shutdown_pdf_pool()
+
+    @pytest.mark.asyncio
+    async def test_streams_into_cache_and_extracts(
+        self, pdf_bytes: bytes, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=pdf_bytes))
+        monkeypatch.setattr(
+            httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=transport)
+        )
+        monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path / "pdfs"))
+        monkeypatch.setattr(pdf_cache, "_cache", None)
+
+        text = await pdf_pool.download_and_extract("https://example.org/paper.pdf")
+        assert text == extract_text_from_pdf(pdf_bytes)
+        assert not list((tmp_path / "pdfs" / "tmp").iterdir())
@@ -1,7 +1,5 @@
 """Integration tests for PDF download and text extraction — real download."""
 
-import os
-
 import pytest
 
 KNOWN_ARXIV_PDF = "https://arxiv.org/pdf/1706.03762"
@@ -20,13 +18,10 @@ async def test_download_pdf() -> None:
     from daily_ai_papers.services.parser.pdf_extractor import download_pdf
 
     path = await download_pdf(KNOWN_ARXIV_PDF)
-    try:
-        assert path.exists()
-        size = path.stat().st_size
-        assert size > 10_000, f"PDF too small ({size} bytes), likely not a real PDF"
-        print(f"\n  Downloaded PDF: {path} ({size:,} bytes)")
-    finally:
-        os.unlink(path)
+    assert path.exists()
+    size = path.stat().st_size
+    assert size > 10_000, f"PDF too small ({size} bytes), likely not a real PDF"
+    print(f"\n  Downloaded PDF: {path} ({size:,} bytes)")
 
 
 @pytest.mark.asyncio
@@ -39,15 +34,12 @@ async def test_download_and_extract_text() -> None:
     )
 
     path = await download_pdf(KNOWN_ARXIV_PDF)
-    try:
-        text = extract_text_from_pdf(path)
-        assert len(text) > 1000, f"Extracted text too short ({len(text)} chars)"
-        # "Attention Is All You Need" paper should contain these words
-        text_lower = text.lower()
-        assert "attention" in text_lower
-        assert "transformer" in text_lower
-
-        print(f"\n  Extracted {len(text):,} characters from PDF")
-        print(f"  First 200 chars: {text[:200]!r}")
-    finally:
-        os.unlink(path)
+    text = extract_text_from_pdf(path)
+    assert len(text) > 1000, f"Extracted text too short ({len(text)} chars)"
+    # "Attention Is All You Need" paper should contain these words
+    text_lower = text.lower()
+    assert "attention" in text_lower
+    assert "transformer" in text_lower
+
+    print(f"\n  Extracted {len(text):,} characters from PDF")
+    print(f"  First 200 chars: {text[:200]!r}")
@@ -0,0 +1,135 @@
+"""Tests for process-pool PDF text extraction."""
+
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Iterator
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services.parser import pdf_pool
+from daily_ai_papers.services.parser.pdf_extractor import extract_text_from_pdf
+from daily_ai_papers.services.parser.pdf_pool import extract_text, get_pdf_pool
+
+fitz = pytest.importorskip("fitz", reason="PyMuPDF not installed")
+
+
+def _render(path: Path, pages: int) -> Path:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page marker {i:03d}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _pool(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(settings, "pdf_workers", 2)
+    yield
+    pdf_pool.shutdown_pdf_pool()
+
+
+class TestExtractText:
+    @pytest.mark.asyncio
+    async def test_matches_in_process_extraction(self, tmp_path: Path) -> None:
+        path = _render(tmp_path / "small.pdf", 3)
+        assert await extract_text(path) == extract_text_from_pdf(path)
+
+    @pytest.mark.asyncio
+    async def test_large_document_is_split_across_workers(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "pdf_parallel_min_pages", 10)
+        path = _render(tmp_path / "large.pdf", 40)
+        text = await extract_text(path)
+        assert text == extract_text_from_pdf(path)
+        positions = [text.index(f"Page marker {i:03d}") for i in range(40)]
+        assert positions == sorted(positions)
+
+    @pytest.mark.asyncio
+    async def test_deadline(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "pdf_extract_timeout", -1.0)
+        with pytest.raises(TimeoutError):
+            await extract_text(_render(tmp_path / "late.pdf", 1))
+
+
+def _extract_in_daemon(path: str, results: "multiprocessing.Queue[str]") -> None:
+    try:
+        document = asyncio.run(pdf_pool.extract_document(Path(path)))
+        results.put(document.text())
+    except BaseException as e:
+        results.put(f"error: {e!r}")
+
+
+class TestWorkerLimits:
+    @pytest.mark.asyncio
+    async def test_parent_kills_workers_past_deadline(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A call the worker's alarm can't interrupt (here: no alarm at all)."""
+        monkeypatch.setattr(pdf_pool, "_DEADLINE_GRACE", 0.2)
+        pool = get_pdf_pool()
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await pool._submit(time.time() + 0.3, time.sleep, 30)
+        assert time.monotonic() - started < 10
+        assert pool._executor is None
+        assert await pool._submit(time.time() + 30, abs, -1) == 1  # Fresh pool
+
+    @pytest.mark.asyncio
+    async def test_broken_calls_leave_a_fresh_pool_alone(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Killing the pool breaks its other calls; they must not shut down its successor."""
+        monkeypatch.setattr(pdf_pool, "_DEADLINE_GRACE", 0.2)
+        pool = get_pdf_pool()
+        other = asyncio.create_task(pool._submit(time.time() + 30, time.sleep, 30))
+        with pytest.raises(TimeoutError):
+            await pool._submit(time.time() + 0.3, time.sleep, 30)
+        fresh = pool._get_executor()
+
+        with pytest.raises(BrokenProcessPool):
+            await other
+        assert pool._executor is fresh
+        assert await pool._submit(time.time() + 30, abs, -1) == 1
+
+    def test_memory_limit_leaves_mapped_files_out(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        resource = pytest.importorskip("resource")
+        calls: list[tuple[int, tuple[int, int]]] = []
+        monkeypatch.setattr(
+            resource, "setrlimit", lambda which, limits: calls.append((which, limits))
+        )
+        pdf_pool._init_worker(100)
+        assert calls == [(resource.RLIMIT_DATA, (100 * 1024 * 1024, 100 * 1024 * 1024))]
+
+
+class TestDaemonicProcess:
+    def test_extracts_in_a_thread(self, tmp_path: Path) -> None:
+        """Like a Celery prefork worker: a daemonic process can't start a pool."""
+        path = _render(tmp_path / "daemon.pdf", 2)
+        ctx = multiprocessing.get_context("spawn")
+        results: multiprocessing.Queue[str] = ctx.Queue()
+        process = ctx.Process(target=_extract_in_daemon, args=(str(path), results), daemon=True)
+        process.start()
+        text = results.get(timeout=60)
+        process.join(timeout=10)
+        assert "Page marker 001" in text
+
+
+class TestGetPDFPool:
+    def test_rebuilt_when_settings_change(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        pool = get_pdf_pool()
+        assert get_pdf_pool() is pool
+        monkeypatch.setattr(settings, "pdf_worker_max_tasks", 7)
+        rebuilt = get_pdf_pool()
+        assert rebuilt is not pool
+        assert rebuilt.max_tasks_per_worker == 7
+
+    def test_defaults_to_one_worker_per_core(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "pdf_workers", 0)
+        monkeypatch.setattr(pdf_pool.os, "cpu_count", lambda: 6)
+        assert get_pdf_pool().workers == 6
@@ -0,0 +1,197 @@
+"""Tests for section-aware structured PDF extraction."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services.parser import pdf_pool
+from daily_ai_papers.services.parser.context_budget import fit_to_budget
+from daily_ai_papers.services.parser.pdf_structure import (
+    PARTIAL_SAMPLE_PAGES,
+    PaperDocument,
+    extract_document,
+    extract_partial,
+)
+
+fitz = pytest.importorskip("fitz", reason="PyMuPDF not installed")
+
+WIDTH, HEIGHT = 612, 792
+COLUMN = 220
+
+
+def _write(
+    page: object, x: float, y: float, text: str, size: float = 10, fontname: str = "helv"
+) -> float:
+    """Write ``text`` wrapped to one column; return the y below it."""
+    words, line = text.split(), ""
+    for word in words:
+        candidate = f"{line} {word}".strip()
+        if fitz.get_text_length(candidate, fontname=fontname, fontsize=size) > COLUMN and line:
+            page.insert_text((x, y), line, fontsize=size, fontname=fontname)  # type: ignore[attr-defined]
+            y += size * 1.3
+            line = word
+        else:
+            line = candidate
+    page.insert_text((x, y), line, fontsize=size, fontname=fontname)  # type: ignore[attr-defined]
+    return y + size * 2
+
+
+def _render(path: Path) -> Path:
+    """A two-page, two-column paper with running heads and page numbers."""
+    doc = fitz.open()
+    columns = [
+        [
+            ("1 Introduction", "Recurrent models dominate sequence trans- duction tasks today."),
+            ("2 Method", "Our model relies entirely on attention to draw global dependencies."),
+        ],
+        [
+            ("3 Results", "The big model reaches a new state of the art on translation."),
+            ("4 Conclusion", "We presented the first model based entirely on attention."),
+        ],
+        [
+            ("References", "[1] Bahdanau et al. Neural machine translation. 2014."),
+            ("A Appendix", "Extra attention visualisations are shown here."),
+        ],
+    ]
+    for number in range(2):
+        page = doc.new_page(width=WIDTH, height=HEIGHT)
+        page.insert_text((72, 30), "Preprint under review at ICLR", fontsize=8)
+        page.insert_text((300, 770), str(number + 1), fontsize=8)
+        y = 90.0
+        if number == 0:
+            page.insert_text((72, y), "Attention Is All You Need", fontsize=18, fontname="hebo")
+            y = _write(page, 72, y + 30, "Abstract", fontname="hebo")
+            y = _write(page, 72, y, "We propose the Transformer, a simple network architecture.")
+        for x, column in zip((72, 330), columns[number * 2 : number * 2 + 2], strict=False):
+            cy = y
+            for heading, body in column:
+                cy = _write(page, x, cy, heading, size=11, fontname="hebo")
+                cy = _write(page, x, cy, body)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _render_long(path: Path, appendix_pages: int = 10) -> Path:
+    """One page of body, one of references, then a long appendix."""
+    doc = fitz.open()
+    page = doc.new_page(width=WIDTH, height=HEIGHT)
+    y = _write(page, 72, 90, "Attention Is All You Need", size=18, fontname="hebo")
+    for heading, body in [
+        ("Abstract", "We propose the Transformer."),
+        ("1 Introduction", "Recurrent models dominate sequence transduction."),
+        ("5 Conclusion", "We presented the first model based entirely on attention."),
+    ]:
+        y = _write(page, 72, y, heading, size=11, fontname="hebo")
+        y = _write(page, 72, y, body)
+    page = doc.new_page(width=WIDTH, height=HEIGHT)
+    y = _write(page, 72, 90, "References", size=11, fontname="hebo")
+    _write(page, 72, y, "[1] Bahdanau et al. Neural machine translation. 2014.")
+    for number in range(appendix_pages):
+        page = doc.new_page(width=WIDTH, height=HEIGHT)
+        y = 90.0
+        if number == 0:
+            y = _write(page, 72, y, "Appendix", size=11, fontname="hebo")
+        _write(page, 72, y, "More ablations of the attention heads. " * 20)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def paper(tmp_path: Path) -> Path:
+    return _render(tmp_path / "paper.pdf")
+
+
+@pytest.fixture
+def long_paper(tmp_path: Path) -> Path:
+    return _render_long(tmp_path / "long.pdf")
+
+
+class TestExtractDocument:
+    def test_sections_in_reading_order(self, paper: Path) -> None:
+        doc = extract_document(paper)
+        assert doc.title == "Attention Is All You Need"
+        assert doc.page_count == 2
+        assert doc.kinds == [
+            "front",
+            "abstract",
+            "introduction",
+            "method",
+            "results",
+            "conclusion",
+            "references",
+            "appendix",
+        ]
+        assert doc.section("references").page == 1  # type: ignore[union-attr]
+
+    def test_strips_running_heads_and_page_numbers(self, paper: Path) -> None:
+        text = extract_document(paper).text()
+        assert "Preprint under review" not in text
+        assert "\n1\n" not in f"\n{text}\n"
+        assert "\n2\n" not in f"\n{text}\n"
+
+    def test_joins_hyphenated_words(self, paper: Path) -> None:
+        intro = extract_document(paper).section("introduction")
+        assert intro is not None
+        assert "sequence transduction tasks" in intro.text
+
+    def test_select_by_kind(self, paper: Path) -> None:
+        text = extract_document(paper).text({"abstract", "conclusion"})
+        assert text.startswith("Abstract\nWe propose the Transformer")
+        assert "first model based entirely on attention" in text
+        assert "Recurrent models" not in text
+
+    def test_budget_drops_references(self, paper: Path) -> None:
+        doc = extract_document(paper)
+        context = fit_to_budget(doc.sections, 10_000, "test-model")
+        assert context.truncated
+        assert "references" not in context.sections
+        assert "Bahdanau" not in context.text
+        assert "attention visualisations" not in context.text
+
+
+class TestExtractPartial:
+    def test_stops_at_references(self, long_paper: Path) -> None:
+        doc = extract_partial(long_paper)
+        assert doc.kinds == ["front", "abstract", "introduction", "conclusion"]
+        assert not doc.complete
+        assert doc.page_count == 12
+        assert doc.pages_read == PARTIAL_SAMPLE_PAGES
+
+    def test_stops_at_character_budget(self, long_paper: Path) -> None:
+        doc = extract_partial(long_paper, stop_at=(), max_chars=2000)
+        assert not doc.complete
+        assert "appendix" in doc.kinds
+        assert PARTIAL_SAMPLE_PAGES < doc.pages_read < doc.page_count
+
+    def test_full_extraction_reads_everything(self, long_paper: Path) -> None:
+        doc = extract_document(long_paper)
+        assert doc.complete
+        assert doc.pages_read == doc.page_count
+        assert doc.kinds[-2:] == ["references", "appendix"]
+
+
+class TestPoolExtractDocument:
+    @pytest.fixture(autouse=True)
+    def _pool(self, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        monkeypatch.setattr(settings, "pdf_workers", 1)
+        yield
+        pdf_pool.shutdown_pdf_pool()
+
+    @pytest.mark.asyncio
+    async def test_matches_in_process(self, paper: Path) -> None:
+        doc = await pdf_pool.extract_document(paper)
+        assert isinstance(doc, PaperDocument)
+        assert doc == extract_document(paper)
+
+    @pytest.mark.asyncio
+    async def test_partial_counts_skipped_pages(self, long_paper: Path) -> None:
+        skipped = REGISTRY.get_sample_value("pdf_pages_total", {"result": "skipped"}) or 0.0
+        doc = await pdf_pool.extract_partial(long_paper)
+        assert doc == extract_partial(long_paper)
+        after = REGISTRY.get_sample_value("pdf_pages_total", {"result": "skipped"})
+        assert after == skipped + doc.page_count - doc.pages_read
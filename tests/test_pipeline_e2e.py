@@ -36,19 +36,16 @@ async def test_crawl_and_parse_pipeline() -> None:
 
     # Step 2: Download PDF
     pdf_path = await download_pdf(paper.pdf_url)
-    try:
-        assert pdf_path.exists()
-        size = pdf_path.stat().st_size
-        assert size > 10_000
-        print(f"  [Step 2] Downloaded PDF: {size:,} bytes")
+    assert pdf_path.exists()
+    size = pdf_path.stat().st_size
+    assert size > 10_000
+    print(f"  [Step 2] Downloaded PDF: {size:,} bytes")
 
-        # Step 3: Extract text
-        text = extract_text_from_pdf(pdf_path)
-        assert len(text) > 1000
-        assert "attention" in text.lower()
-        print(f"  [Step 3] Extracted text: {len(text):,} chars")
-    finally:
-        os.unlink(pdf_path)
+    # Step 3: Extract text
+    text = extract_text_from_pdf(pdf_path)
+    assert len(text) > 1000
+    assert "attention" in text.lower()
+    print(f"  [Step 3] Extracted text: {len(text):,} chars")
 
 
 @pytest.mark.asyncio
@@ -71,11 +68,8 @@ async def test_full_pipeline_with_llm() -> None:
 
     # Step 2: Download & parse PDF
     pdf_path = await download_pdf(paper.pdf_url)
-    try:
-        text = extract_text_from_pdf(pdf_path)
-        print(f"  [Step 2] Extracted {len(text):,} chars from PDF")
-    finally:
-        os.unlink(pdf_path)
+    text = extract_text_from_pdf(pdf_path)
+    print(f"  [Step 2] Extracted {len(text):,} chars from PDF")
 
     # Step 3: LLM metadata extraction
     meta = await extract_metadata(text)
@@ -0,0 +1,169 @@
+"""Tests for Server-Timing headers and on-demand request profiling."""
+
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.profiling import (
+    RequestTimings,
+    SamplingProfiler,
+    _current_timings,
+    instrument_engine,
+    timed_phase,
+)
+
+
+@pytest.fixture
+def _empty_papers_db() -> Iterator[None]:
+    """Override get_db with a session whose queries return no rows."""
+    from daily_ai_papers.database import get_db
+    from daily_ai_papers.main import app
+
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    db = AsyncMock()
+    db.execute.return_value = mock_result
+
+    async def override_get_db():  # type: ignore[no-untyped-def]
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.clear()
+
+
+class TestRequestTimings:
+    """Test phase accumulation and header rendering."""
+
+    def test_phases_accumulate(self) -> None:
+        timings = RequestTimings()
+        timings.add("db", 0.001)
+        timings.add("db", 0.002)
+        assert timings.phases["db"] == pytest.approx(0.003)
+
+    def test_header_value(self) -> None:
+        timings = RequestTimings(phases={"db": 0.0125, "encode": 0.0005}, db_queries=2)
+        assert timings.header_value() == 'db;dur=12.50;desc="2 queries", encode;dur=0.50'
+
+    def test_timed_phase_outside_request_is_noop(self) -> None:
+        with timed_phase("validate"):
+            pass
+        assert _current_timings.get() is None
+
+    def test_timed_phase_records_into_current(self) -> None:
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        try:
+            with timed_phase("validate"):
+                pass
+        finally:
+            _current_timings.reset(token)
+        assert "validate" in timings.phases
+
+
+class TestEngineInstrumentation:
+    """Test SQLAlchemy cursor events feed the db phase."""
+
+    def test_queries_are_counted(self) -> None:
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        instrument_engine(engine)  # idempotent
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        finally:
+            _current_timings.reset(token)
+
+        assert timings.db_queries == 2
+        assert timings.phases["db"] > 0
+
+    def test_failed_query_releases_start_time(self) -> None:
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        try:
+            with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing"))
+                assert conn.info["query_start_times"] == []
+                conn.execute(text("SELECT 1"))
+        finally:
+            _current_timings.reset(token)
+
+        assert timings.db_queries == 2
+
+
+class TestSamplingProfiler:
+    def test_collects_folded_stacks(self) -> None:
+        import time
+
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        profiler.stop()
+
+        folded = profiler.folded()
+        assert folded
+        assert "test_collects_folded_stacks" in folded
+        stack, count = folded.splitlines()[0].rsplit(" ", 1)
+        assert int(count) >= 1
+
+
+@pytest.mark.usefixtures("_empty_papers_db")
+class TestServerTimingMiddleware:
+    """Test the middleware end to end through the API."""
+
+    @pytest.mark.asyncio
+    async def test_header_has_phases(self, api_client: AsyncClient) -> None:
+        resp = await api_client.get("/api/v1/papers")
+        assert resp.status_code == 200
+        header = resp.headers["server-timing"]
+        assert "validate;dur=" in header
+        assert "encode;dur=" in header
+        assert "total;dur=" in header
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, api_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "server_timing_enabled", False)
+        resp = await api_client.get("/api/v1/papers")
+        assert resp.status_code == 200
+        assert "server-timing" not in resp.headers
+
+    @pytest.mark.asyncio
+    async def test_profile_with_valid_token(
+        self, api_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "profile_token", "s3cret")
+        resp = await api_client.get("/api/v1/papers", headers={"X-Profile-Token": "s3cret"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert resp.headers["x-profile-original-status"] == "200"
+        assert "profile.folded" in resp.headers["content-disposition"]
+
+    @pytest.mark.asyncio
+    async def test_profile_with_wrong_token_is_ignored(
+        self, api_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "profile_token", "s3cret")
+        resp = await api_client.get("/api/v1/papers", headers={"X-Profile-Token": "guess"})
+        assert resp.json() == []
+        assert "x-profile-original-status" not in resp.headers
+
+    @pytest.mark.asyncio
+    async def test_profile_disabled_without_configured_token(self, api_client: AsyncClient) -> None:
+        assert settings.profile_token == ""
+        resp = await api_client.get("/api/v1/papers", headers={"X-Profile-Token": ""})
+        assert resp.json() == []
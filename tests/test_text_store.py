@@ -0,0 +1,99 @@
+"""Tests for compressed full-text storage."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.models.paper import PaperText
+from daily_ai_papers.services import text_store
+from daily_ai_papers.services.text_store import (
+    TextCodec,
+    load_full_text,
+    save_full_text,
+    train_dictionary,
+)
+
+TEXT = (
+    "Attention Is All You Need\n"
+    + "The dominant sequence transduction models are based on recurrent networks. " * 200
+)
+
+
+def _db() -> AsyncMock:
+    """A session whose get() returns whatever was last added."""
+    rows: dict[int, PaperText] = {}
+    db = AsyncMock()
+    db.get.side_effect = lambda model, key: rows.get(key)
+    db.add = MagicMock(side_effect=lambda row: rows.__setitem__(row.paper_id, row))
+    return db
+
+
+@pytest.fixture(autouse=True)
+def _reset_codec(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(text_store, "_codec", None)
+
+
+class TestTextCodec:
+    def test_zlib_fallback(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(text_store, "_zstd", lambda: None)
+        codec = TextCodec(level=10)
+        assert codec.codec == "zlib"
+        data = codec.compress(TEXT)
+        assert len(data) < len(TEXT) / 10
+        assert codec.decompress("zlib", data) == TEXT
+
+    def test_zstd_roundtrip(self) -> None:
+        pytest.importorskip("zstandard")
+        codec = TextCodec(level=10)
+        assert codec.codec == "zstd"
+        assert codec.decompress("zstd", codec.compress(TEXT)) == TEXT
+
+    def test_dictionary(self) -> None:
+        pytest.importorskip("zstandard")
+        samples = [f"Paper {i}: we propose a transformer for task {i}. " * 20 for i in range(200)]
+        dictionary = train_dictionary(samples, size=4096)
+        codec = TextCodec(level=10, dictionary=dictionary)
+        plain = TextCodec(level=10)
+        short = "Paper 999: we propose a transformer for task 999."
+        data = codec.compress(short)
+        assert len(data) < len(plain.compress(short))
+        assert codec.decompress("zstd", data, codec.dictionary_id) == short
+        with pytest.raises(RuntimeError, match="dictionary"):
+            plain.decompress("zstd", data, codec.dictionary_id)
+
+
+class TestFullTextStore:
+    @pytest.mark.asyncio
+    async def test_table_backend(self) -> None:
+        db = _db()
+        row = await save_full_text(db, 7, TEXT)
+        assert row.data is not None and row.blob_key is None
+        assert row.stored_size < row.raw_size / 10
+        assert await load_full_text(db, 7) == TEXT
+        assert await load_full_text(db, 8) is None
+
+    @pytest.mark.asyncio
+    async def test_overwrite_keeps_one_row(self) -> None:
+        db = _db()
+        await save_full_text(db, 7, TEXT)
+        await save_full_text(db, 7, "revised")
+        assert db.add.call_count == 1
+        assert await load_full_text(db, 7) == "revised"
+
+    @pytest.mark.asyncio
+    async def test_blob_backend(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "full_text_backend", "blob")
+        monkeypatch.setattr(settings, "full_text_blob_dir", str(tmp_path))
+        db = _db()
+        row = await save_full_text(db, 7, TEXT)
+        assert row.data is None
+        assert (tmp_path / str(row.blob_key)).stat().st_size == row.stored_size
+        assert await load_full_text(db, 7) == TEXT
+
+    @pytest.mark.asyncio
+    async def test_unsupported_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "full_text_backend", "s3")
+        with pytest.raises(ValueError, match="Unsupported full-text backend"):
+            await save_full_text(_db(), 7, TEXT)
@@ -0,0 +1,155 @@
+"""Tests for the segment-level translation memory."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import translation_memory
+from daily_ai_papers.services.llm_client import llm_complete
+from daily_ai_papers.services.translation_memory import normalize_segment, split_segments
+from daily_ai_papers.services.translator import translate_many, translate_text
+
+TEXT = (
+    "We propose the Transformer. It relies on attention, e.g. self-attention.\n\n"
+    "Results are strong."
+)
+
+
+class TestSplitSegments:
+    def test_sentences_and_paragraphs(self) -> None:
+        assert split_segments(TEXT) == [
+            "We propose the Transformer.",
+            " ",
+            "It relies on attention, e.g. self-attention.",
+            "\n\n",
+            "Results are strong.",
+        ]
+        assert split_segments(TEXT, "paragraph")[::2] == [
+            "We propose the Transformer. It relies on attention, e.g. self-attention.",
+            "Results are strong.",
+        ]
+
+    @pytest.mark.parametrize("text", ["", "  \n", "  One. Two by A. Vaswani et al. Three!\n"])
+    def test_parts_rebuild_text(self, text: str) -> None:
+        assert "".join(split_segments(text)) == text
+
+    def test_unsupported_granularity(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported translation memory segment"):
+            split_segments(TEXT, "word")
+
+    def test_normalize(self) -> None:
+        assert normalize_segment("  The Model\n works. ") == "the model works."
+
+
+class TestTranslationMemory:
+    @pytest.fixture(autouse=True)
+    def _memory(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        monkeypatch.setattr(settings, "llm_provider", "fake")
+        monkeypatch.setattr(settings, "llm_api_key", "")
+        monkeypatch.setattr(settings, "translation_memory_backend", "sqlite")
+        monkeypatch.setattr(settings, "translation_memory_path", str(tmp_path / "tm.sqlite3"))
+        monkeypatch.setattr(translation_memory, "_memory", None)
+        yield
+        translation_memory._memory = None
+
+    @pytest.fixture
+    def llm_calls(self) -> Iterator[AsyncMock]:
+        with patch(
+            "daily_ai_papers.services.translator.llm_complete", AsyncMock(wraps=llm_complete)
+        ) as mock:
+            yield mock
+
+    @staticmethod
+    def _lookups(result: str) -> float:
+        value = REGISTRY.get_sample_value("translation_memory_lookups_total", {"result": result})
+        return value or 0.0
+
+    @pytest.mark.asyncio
+    async def test_translates_misses_in_one_call_and_reassembles(
+        self, llm_calls: AsyncMock
+    ) -> None:
+        result = await translate_text(TEXT, "es")
+        assert result == (
+            "[Spanish] We propose the Transformer. "
+            "[Spanish] It relies on attention, e.g. self-attention.\n\n"
+            "[Spanish] Results are strong."
+        )
+        assert llm_calls.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_only_new_segments_reach_the_llm(self, llm_calls: AsyncMock) -> None:
+        await translate_text(TEXT, "es")
+        exact = self._lookups("exact")
+        normalized = self._lookups("normalized")
+
+        result = await translate_text(
+            "We  propose the\ntransformer. Results are strong. A new claim.", "es"
+        )
+        assert result.startswith("[Spanish] We propose the Transformer. [Spanish] Results")
+        assert self._lookups("exact") == exact + 1
+        assert self._lookups("normalized") == normalized + 1
+        assert "A new claim." in llm_calls.call_args.kwargs["context"]  # Single miss
+        assert llm_calls.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_keyed_by_language_and_model(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        await translate_text(TEXT, "es")
+        await translate_text(TEXT, "es")
+        assert llm_calls.call_count == 1
+        await translate_text(TEXT, "fr")
+        monkeypatch.setattr(settings, "llm_model", "another-model")
+        await translate_text(TEXT, "es")
+        assert llm_calls.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unspaced_languages_join_sentences(self) -> None:
+        result = await translate_text("One idea. Two ideas.", "zh")
+        assert result == "[Chinese] One idea.[Chinese] Two ideas."
+
+    @pytest.mark.asyncio
+    async def test_malformed_response_falls_back_per_segment(self) -> None:
+        complete = AsyncMock(side_effect=['{"translations": ["only one"]}', "Uno.", "Dos."])
+        with patch("daily_ai_papers.services.translator.llm_complete", complete):
+            assert await translate_text("One. Two.", "es") == "Uno. Dos."
+        assert complete.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_translate_many_reuses_segments(self, llm_calls: AsyncMock) -> None:
+        await translate_text(TEXT, "es")
+        results = await translate_many(TEXT, ["es", "ja"])
+        assert results["es"].startswith("[Spanish]")
+        assert results["ja"].startswith("[Japanese]")
+        assert llm_calls.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_lookup_failure_translates_directly(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        memory = translation_memory.get_translation_memory()
+        assert memory is not None
+        monkeypatch.setattr(memory.store, "get", AsyncMock(side_effect=ConnectionError("down")))
+        assert await translate_text(TEXT, "es")
+        assert llm_calls.call_count == 1
+        assert "Results are strong." in llm_calls.call_args.kwargs["context"]  # Whole text
+
+    @pytest.mark.asyncio
+    async def test_write_failure_still_returns_translation(
+        self, llm_calls: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        memory = translation_memory.get_translation_memory()
+        assert memory is not None
+        monkeypatch.setattr(memory.store, "set", AsyncMock(side_effect=ConnectionError("down")))
+        result = await translate_text(TEXT, "es")
+        assert result.startswith("[Spanish] We propose the Transformer.")
+        assert llm_calls.call_count == 1
+
+    def test_unsupported_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "translation_memory_backend", "memcached")
+        with pytest.raises(ValueError, match="Unsupported translation memory backend"):
+            translation_memory.get_translation_memory()
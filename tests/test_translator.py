@@ -3,10 +3,19 @@
 Covers language codes not exercised by test_fake_llm.py.
 """
 
+import asyncio
+from unittest.mock import AsyncMock, patch
+
 import pytest
 
 from daily_ai_papers.config import settings
-from daily_ai_papers.services.translator import LANGUAGE_NAMES, translate_text
+from daily_ai_papers.services.translator import (
+    LANGUAGE_NAMES,
+    _translation_chunks,
+    translate_many,
+    translate_text,
+    translate_text_stream,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -37,3 +46,131 @@ class TestTranslateText:
     async def test_result_is_stripped(self) -> None:
         result = await translate_text("Test.", "zh")
         assert result == result.strip()
+
+    @pytest.mark.asyncio
+    async def test_languages_share_source_context(self) -> None:
+        """The source text is a common prefix so the provider can cache it."""
+        with patch(
+            "daily_ai_papers.services.translator.llm_complete",
+            new_callable=AsyncMock,
+            return_value="ok",
+        ) as mock:
+            await translate_text("Attention is all you need.", "zh")
+            await translate_text("Attention is all you need.", "ja")
+
+        first, second = mock.await_args_list
+        assert first.kwargs["context"] == second.kwargs["context"]
+        assert "Attention is all you need." in first.kwargs["context"]
+        assert first.args[0] != second.args[0]
+
+
+class TestTranslateTextStream:
+    @pytest.mark.asyncio
+    async def test_stream_matches_translate_text(self) -> None:
+        text = "Attention is all you need."
+        chunks = [chunk async for chunk in translate_text_stream(text, "ja")]
+        assert len(chunks) > 1
+        assert "".join(chunks).strip() == await translate_text(text, "ja")
+
+
+class TestTranslateMany:
+    @pytest.mark.asyncio
+    async def test_one_call_for_all_languages(self) -> None:
+        from daily_ai_papers.services.llm_client import llm_complete
+
+        with patch(
+            "daily_ai_papers.services.translator.llm_complete", AsyncMock(wraps=llm_complete)
+        ) as mock:
+            result = await translate_many("Attention is all you need.", ["zh", "ja", "es", "zh"])
+
+        assert mock.await_count == 1
+        assert list(result) == ["zh", "ja", "es"]
+        assert result["ja"] == "注意力こそが全てである。"
+        assert "Traducci" in result["es"]
+        assert "- ja: Japanese" in mock.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_defaults_to_configured_languages(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(settings, "translation_languages", "ja,fr")
+        assert list(await translate_many("Hello.")) == ["ja", "fr"]
+
+    @pytest.mark.asyncio
+    async def test_splits_languages_over_output_budget(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "translation_max_output_tokens", 400)
+        with patch(
+            "daily_ai_papers.services.translator.llm_complete",
+            new_callable=AsyncMock,
+            return_value='{"zh": "z", "ja": "j", "es": "e", "fr": "f"}',
+        ) as mock:
+            result = await translate_many("word " * 50, ["zh", "ja", "es", "fr"])
+
+        assert mock.await_count == 2
+        assert result == {"zh": "z", "ja": "j", "es": "e", "fr": "f"}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_per_language(self) -> None:
+        with patch(
+            "daily_ai_papers.services.translator.llm_complete",
+            new_callable=AsyncMock,
+            side_effect=['{"zh": "z", "ja": ""}', "j"],
+        ) as mock:
+            result = await translate_many("Hello.", ["zh", "ja"])
+
+        assert result == {"zh": "z", "ja": "j"}
+        assert mock.await_args.kwargs.get("response_json") is None
+
+    @pytest.mark.asyncio
+    async def test_unparseable_response_falls_back_for_all(self) -> None:
+        with patch(
+            "daily_ai_papers.services.translator.llm_complete",
+            new_callable=AsyncMock,
+            side_effect=["not json", "a", "b"],
+        ):
+            result = await translate_many("Hello.", ["zh", "ja"])
+        assert sorted(result.values()) == ["a", "b"]
+
+
+class TestChunkedTranslation:
+    PARAGRAPHS = [f"Paragraph {i} has several words in it." for i in range(6)]
+
+    def test_chunks_at_paragraph_boundaries(self) -> None:
+        text = "\n\n".join(self.PARAGRAPHS)
+        parts = _translation_chunks(text, 25)
+        assert "".join(parts) == text
+        assert len(parts[::2]) == 3
+        assert set(parts[1::2]) == {"\n\n"}
+        assert _translation_chunks(text, 0) == [text]
+
+    def test_overlong_paragraph_splits_at_sentences(self) -> None:
+        text = " ".join(self.PARAGRAPHS)
+        parts = _translation_chunks(text, 25)
+        assert "".join(parts) == text
+        assert len(parts[::2]) == 3
+        assert parts[2].startswith("Paragraph 2")
+
+    @pytest.mark.asyncio
+    async def test_chunks_translated_concurrently_and_reassembled(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "translation_chunk_tokens", 25)
+        in_flight = peak = 0
+
+        async def complete(prompt: str, **kwargs: object) -> str:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            source = str(kwargs["context"]).split("---\n")[1].strip()
+            return source.upper()
+
+        text = "\n\n".join(self.PARAGRAPHS)
+        with patch("daily_ai_papers.services.translator.llm_complete", side_effect=complete):
+            result = await translate_text(text, "es")
+            assert peak == 3  # All chunks at once
+            many = await translate_many(text, ["es", "fr"])
+            assert peak == 6  # All chunks of both languages at once
+        assert result == text.upper()
+        assert many == {"es": text.upper(), "fr": text.upper()}
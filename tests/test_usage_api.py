@@ -0,0 +1,56 @@
+"""Tests for the LLM usage API endpoints."""
+
+import pytest
+from httpx import AsyncClient
+
+from daily_ai_papers.config import settings
+from daily_ai_papers.services import llm_usage
+from daily_ai_papers.services.llm_client import llm_complete
+from daily_ai_papers.services.llm_usage import llm_stage
+
+
+@pytest.fixture(autouse=True)
+def _fresh_ledger(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_provider", "fake")
+    monkeypatch.setattr(settings, "llm_usage_backend", "memory")
+    monkeypatch.setattr(llm_usage, "_ledger", None)
+
+
+@pytest.mark.asyncio
+async def test_summary_by_stage_and_model(api_client: AsyncClient) -> None:
+    with llm_stage("chat"):
+        await llm_complete("What is 2+3?", use_cache=False)
+    await llm_complete("What is 2+3?", use_cache=False)
+
+    resp = await api_client.get(
+        "/api/v1/usage/summary", params=[("group_by", "stage"), ("group_by", "model")]
+    )
+    assert resp.status_code == 200
+    groups = {g["stage"]: g for g in resp.json()["groups"]}
+    assert set(groups) == {"chat", "other"}
+    assert groups["chat"]["calls"] == 1
+    assert groups["chat"]["model"] == settings.llm_model
+    assert groups["chat"]["provider"] is None
+
+
+@pytest.mark.asyncio
+async def test_recent(api_client: AsyncClient) -> None:
+    await llm_complete("What is 2+3?", use_cache=False)
+    resp = await api_client.get("/api/v1/usage/recent", params={"limit": 5})
+    assert resp.status_code == 200
+    [record] = resp.json()
+    assert record["stage"] == "other"
+    assert record["prompt_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_group_is_rejected(api_client: AsyncClient) -> None:
+    resp = await api_client.get("/api/v1/usage/summary", params={"group_by": "user"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_disabled_ledger(api_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_usage_backend", "")
+    resp = await api_client.get("/api/v1/usage/summary")
+    assert resp.status_code == 404